@@ -0,0 +1,324 @@
+"""
+Contains AsyncBitbucketRequestSender class that provides asynchronous methods
+for sending API requests to web-based hosting service Bitbucket for version control using Git
+"""
+
+from heat_map.request_sender.async_request_sender_base import AsyncRequestSender, \
+    REQUEST_ERRORS
+from heat_map.request_sender.bitbucket_request_sender import BitbucketRequestSenderExc, \
+    parse_commit, merge_branches_commits, collect_contributors
+from heat_map.utils.bitbucket_helper import to_timestamp
+from heat_map.utils.request_status_codes import STATUS_CODE_OK
+
+from general_helper.logger.log_error_decorators import async_try_except_decor
+from general_helper.logger.log_config import LOG
+
+
+class AsyncBitbucketRequestSender(AsyncRequestSender):
+    """
+    Provides asynchronous methods for sending API requests to web-based hosting service
+    Bitbucket for version control using Git.
+    Results are the same as results of BitbucketRequestSender
+    """
+
+    def __init__(self, owner, repo, base_url='https://api.bitbucket.org/2.0', **kwargs):
+        super().__init__(base_url=base_url, owner=owner, repo=repo, **kwargs)
+
+    async def _get_request(self, endpoint, params=None):
+        """
+        Sends GET request to URL
+        :param endpoint: string - endpoint url
+        :param params: dict - of request parameters
+        :return: AsyncResponse
+        """
+
+        # connection errors are retried with backoff by scheduler
+        try:
+            return await self._http_get(self.base_url + endpoint, params)
+        except REQUEST_ERRORS as exc:
+            LOG.error('Failed to connect to BitBucket Cloud...', exc_info=exc)
+            raise
+
+    async def _get_json(self, endpoint, params=None, **exc_params):
+        """
+        Gets deserialized response, raises BitbucketRequestSenderExc if response status is not OK
+
+        :param endpoint: string - endpoint url
+        :param params: dict - of request parameters
+        :param exc_params: - names and values of parameters for exception message
+        :return: dict
+        """
+
+        response = await self._get_request(endpoint, params)
+        # guard condition
+        if response.status_code != STATUS_CODE_OK:
+            details = ''.join(f', {name}: {value}' for name, value in exc_params.items())
+            raise BitbucketRequestSenderExc(
+                f'Invalid parameter(s) in: owner: {self.owner},'
+                f' repo: {self.repo}{details}')
+        return response.json()
+
+    @async_try_except_decor
+    async def get_repo(self):
+        """
+        Gets information about repository, see BitbucketRequestSender.get_repo
+
+        :return: dict
+        """
+
+        repo = await self._get_json(
+            f'/repositories/{self.owner}/{self.repo}',
+            {'fields': 'name,uuid,created_on,owner.username,links.self.href'})
+
+        return {
+            'id': repo['uuid'][1:-1],
+            'repo_name': repo['name'],
+            'creation_date': str(to_timestamp(repo['created_on'])),
+            'owner': repo['owner']['username'],
+            'url': repo['links']['self']['href']
+        }
+
+    @async_try_except_decor
+    async def get_branches(self):
+        """
+        Gets list of branches in a repository, see BitbucketRequestSender.get_branches
+
+        :return: list of dicts
+        """
+
+        branches_page = await self._get_json(
+            f'/repositories/{self.owner}/{self.repo}/refs/branches', {'fields': 'values.name'})
+
+        return [{'name': branch['name']} for branch in branches_page['values']]
+
+    @async_try_except_decor
+    async def get_commits(self):
+        """
+        Gets information about last commits in repository,
+        see BitbucketRequestSender.get_commits
+
+        :return: list of dicts
+        """
+
+        branches = await self.get_branches()
+        if branches is None:
+            raise BitbucketRequestSenderExc('Can\'t get branches for get_commits method')
+        branches_names = [branch['name'] for branch in branches]
+
+        branches_commits = await self._gather(
+            self.get_commits_by_branch(name) for name in branches_names)
+        if None in branches_commits:
+            raise BitbucketRequestSenderExc(
+                'Can\'t get commits by branch for get_commits method')
+
+        repo_commits = merge_branches_commits(branches_names, branches_commits)
+
+        # sorts all commits in repository by date in reverse order
+        sorted_commits = sorted(list(repo_commits.values()), key=lambda x: x['date'], reverse=True)
+
+        return sorted_commits[:30]
+
+    @async_try_except_decor
+    async def get_commits_by_branch(self, branch_name):
+        """
+        Gets information about commits of a specific branch,
+        see BitbucketRequestSender.get_commits_by_branch
+
+        :param branch_name: string
+        :return: list of dicts
+        """
+
+        assert isinstance(branch_name, str), 'Inputted "branch_name" type is not str'
+        commits_page = await self._get_json(
+            f'/repositories/{self.owner}/{self.repo}/commits/{branch_name}',
+            {'fields': 'values.hash,values.author,values.message,values.date'},
+            **{'branch name': branch_name})
+
+        return [parse_commit(commit) for commit in commits_page['values']]
+
+    @async_try_except_decor
+    async def get_commit_by_hash(self, hash_of_commit):
+        """
+        Gets information about the commit by hash,
+        see BitbucketRequestSender.get_commit_by_hash
+
+        :param hash_of_commit: string
+        :return: dict
+        """
+
+        result = {}
+
+        assert isinstance(hash_of_commit, str), 'Inputted "hash_of_commit" type is not str'
+        commit = await self._get_json(
+            f'/repositories/{self.owner}/{self.repo}/commit/{hash_of_commit}',
+            **{'hash of commit': hash_of_commit})
+
+        branches = await self.get_branches()
+        if branches is None:
+            raise BitbucketRequestSenderExc('Can\'t get branches for get_commit_by_hash method')
+        branches_names = [branch['name'] for branch in branches]
+
+        # gets 'hash' field for every commit in every branch in repo concurrently
+        branches_hashes = await self._gather(
+            self._get_json(f'/repositories/{self.owner}/{self.repo}/commits/{branch}',
+                           {'fields': 'values.hash'}, **{'branch name': branch})
+            for branch in branches_names)
+
+        for branch, response in zip(branches_names, branches_hashes):
+            for commit_hash in response['values']:
+                if commit_hash['hash'] == hash_of_commit:
+                    result.setdefault('branches', []).append(branch)
+
+        # forms dict of commit describe
+        result.update(parse_commit(commit))
+
+        return result
+
+    @async_try_except_decor
+    async def get_contributors(self):
+        """
+        Gets information about all contributors to repository,
+        see BitbucketRequestSender.get_contributors
+
+        :return: list of dicts
+        """
+
+        commits_page = await self._get_json(f'/repositories/{self.owner}/{self.repo}/commits')
+
+        return collect_contributors(commits_page['values'])
+
+    @async_try_except_decor
+    async def get_all_commits_by_branch(self, branch_name):
+        """
+            Gets list of all commits by given branch,
+            see BitbucketRequestSender.get_all_commits_by_branch
+
+        :param branch_name: str
+        :return: list - list of all commits
+        """
+
+        assert isinstance(branch_name, str), 'Inputted "branch_name" type is not str'
+        parsed_full_response = []
+        # declare response dict with kay 'next' to enable first iteration
+        response = {'next': 'eny text'}
+        page = 1
+
+        while 'next' in response:
+            response = await self._get_json(
+                f'/repositories/{self.owner}/{self.repo}/commits/{branch_name}',
+                {'fields': 'values.hash,values.author,values.message,values.date,next',
+                 'page': str(page)},
+                **{'branch name': branch_name, 'page': page})
+            parsed_full_response.extend(parse_commit(commit) for commit in response['values'])
+            page += 1
+
+        return parsed_full_response
+
+    @async_try_except_decor
+    async def get_all_commits(self):
+        """
+        Gets information about all commits in repository,
+        see BitbucketRequestSender.get_all_commits.
+        Commits of all branches are requested concurrently
+
+        :return: dict of list of commits and metadata
+        """
+
+        branches = await self.get_branches()
+        if branches is None:
+            return None
+        branches_names = [branch['name'] for branch in branches]
+
+        branches_commits = await self._gather(
+            self.get_all_commits_by_branch(name) for name in branches_names)
+        if None in branches_commits:
+            return None
+
+        repo_commits = merge_branches_commits(branches_names, branches_commits)
+
+        # add metadata to method response for further updates by get_updated_all_commits
+        metadata = {
+            branch_name: list_of_branch_commits[0]
+            for branch_name, list_of_branch_commits in zip(branches_names, branches_commits)
+        }
+
+        # sorts all commits in repository by date in reverse order
+        sorted_commits = sorted(list(repo_commits.values()), key=lambda x: x['date'], reverse=True)
+
+        return {'data': sorted_commits, 'metadata': metadata}
+
+    @async_try_except_decor
+    async def get_by_branch_since_hash(self, branch_name, hash_of_commit=None):
+        """
+            Gets list of commits by branch name newer than given commit,
+            see BitbucketRequestSender.get_by_branch_since_hash
+
+        :param branch_name: str
+        :param hash_of_commit: str - pages are requested until commit with this hash
+        :return: list - list of commits newer than given one
+        """
+
+        assert isinstance(branch_name, str), 'Inputted "branch_name" type is not str'
+        parsed_full_response = []
+        # declare response dict with kay 'next' to enable first iteration
+        response = {'next': 'eny text'}
+        page = 1
+
+        while 'next' in response:
+            response = await self._get_json(
+                f'/repositories/{self.owner}/{self.repo}/commits/{branch_name}',
+                {'fields': 'values.hash,values.author,values.message,values.date,next',
+                 'page': str(page)},
+                **{'branch name': branch_name, 'page': page})
+            for commit in response['values']:
+                if commit['hash'] == hash_of_commit:
+                    return parsed_full_response
+                parsed_full_response.append(parse_commit(commit))
+            page += 1
+
+        return parsed_full_response
+
+    @async_try_except_decor
+    async def get_updated_all_commits(self, old_commits):
+        """
+        Updates given list of commits by newer list of branches,
+        see BitbucketRequestSender.get_updated_all_commits.
+        New commits of all branches are requested concurrently
+
+        :param old_commits: dict - list of commits to update and metadata
+        :return: dict - updated list of commits and metadata
+        """
+
+        branches = await self.get_branches()
+        if branches is None:
+            return None
+        branches_names = [branch['name'] for branch in branches]
+
+        # newest known commits of existing branches, None for new branches
+        metadata = {branch_name: newest_commit
+                    for branch_name, newest_commit in old_commits['metadata'].items()
+                    if branch_name in branches_names}
+        metadata.update((branch_name, None) for branch_name in branches_names
+                        if branch_name not in metadata)
+
+        updated_branches_names = list(metadata)
+        updated_branches_commits = await self._gather(
+            self.get_by_branch_since_hash(branch_name,
+                                          newest_commit['hash'] if newest_commit else None)
+            for branch_name, newest_commit in metadata.items())
+        if None in updated_branches_commits:
+            return None
+
+        for branch_name, list_of_branch_commits in zip(updated_branches_names,
+                                                       updated_branches_commits):
+            if list_of_branch_commits:
+                metadata[branch_name] = list_of_branch_commits[0]
+
+        # maps new commits by branch to old commits with key - hash of commit
+        repo_commits = merge_branches_commits(updated_branches_names, updated_branches_commits,
+                                              old_commits['data'])
+
+        # sorts all commits in repository by date in reverse order
+        sorted_commits = sorted(list(repo_commits.values()), key=lambda x: x['date'], reverse=True)
+
+        return {'data': sorted_commits, 'metadata': metadata}
@@ -0,0 +1,191 @@
+"""
+Contains AsyncGithubRequestSender class that provides asynchronous implementation of
+interface for sending API requests
+to web-based hosting services for version control using GitHub
+"""
+from heat_map.request_sender.async_request_sender_base import AsyncRequestSender
+from heat_map.request_sender.github_request_sender import match_branch_to_commit, \
+    parse_repo, parse_commit, parse_contributor, get_branches_from_pull_requests, \
+    complete_commit_branch_map
+from heat_map.utils.commit_branch_index import CommitBranchIndex
+from heat_map.utils.commit_sync import async_sync_all_commits
+from heat_map.utils.pagination import PER_PAGE, PaginationError, aiter_pages, \
+    github_next_page
+from heat_map.utils.request_status_codes import STATUS_CODE_OK
+
+
+class AsyncGithubRequestSender(AsyncRequestSender):
+    """
+    Class that provides asynchronous implementation of interface for sending API requests
+    to web-based hosting services for version control using GitHub.
+    Results are the same as results of GithubRequestSender
+    """
+
+    def __init__(self, owner, repo, token='token ...',
+                 base_url="https://api.github.com", **kwargs):
+        super().__init__(base_url=base_url, owner=owner, repo=repo, **kwargs)
+        self.repos_api_url = f'/repos/{self.owner}/{self.repo}'
+        self.token = token
+
+    async def _request(self, endpoint=''):
+        headers = 'Authorization'
+        url = self.base_url + self.repos_api_url + endpoint
+        response = await self._http_get(url, headers={headers: self.token})
+        if response.status_code != STATUS_CODE_OK:
+            return None
+        return response.json()
+
+    # returns items of all pages of list endpoint or None if any page fails
+    async def _request_all(self, endpoint, params=None):
+        url = self.base_url + self.repos_api_url + endpoint
+        items = []
+        try:
+            async for response in aiter_pages(self._http_get, url,
+                                              dict(params or {}, per_page=PER_PAGE),
+                                              github_next_page,
+                                              headers={'Authorization': self.token}):
+                items.extend(response.json())
+        except PaginationError:
+            return None
+        return items
+
+    # returns dict of branch name to sha of its head commit
+    async def _get_branch_heads(self):
+        response = await self._request_all('/branches')
+        if response is None:
+            return None
+        return {branch['name']: branch['commit']['sha'] for branch in response}
+
+    # returns index of commits sha to existing branches they belong to
+    async def _get_existing_commit_branch_map(self, list_of_branches):
+        if not list_of_branches:
+            return None
+        branches_commits = await self._gather(
+            self.get_commits_by_branch(branch) for branch in list_of_branches)
+        if None in branches_commits:
+            return None
+        index = CommitBranchIndex()
+        for branch, commits in zip(list_of_branches, branches_commits):
+            index.add_commits(branch, (item['hash'] for item in commits))
+        return index
+
+    # returns index of commits sha to branches
+    # from both pull requests and existing branches with commits
+    async def _get_complete_commit_branch_map(self):
+        branches, pull_requests = await self._gather([
+            self.get_branches(), self._request_all('/pulls', {'state': 'all'})])
+        list_of_branches = [branch['name'] for branch in branches or []]
+        existing_branches = await self._get_existing_commit_branch_map(list_of_branches)
+        pull_request_branches = get_branches_from_pull_requests(pull_requests, self.owner)
+        return complete_commit_branch_map(existing_branches, pull_request_branches)
+
+    async def get_repo(self):
+        """
+        Gets information about repository, see GithubRequestSender.get_repo
+
+        :return: dict
+        """
+        response = await self._request()
+        return parse_repo(response) if response is not None else None
+
+    async def get_branches(self):
+        """
+        Gets list of branches in a repository, see GithubRequestSender.get_branches
+
+        :return: list of dicts
+        """
+        response = await self._request_all('/branches')
+        if response is None:
+            return None
+        return [{'name': branch['name']} for branch in response]
+
+    async def get_commits(self):
+        """
+        Gets information about all commits in repository, see GithubRequestSender.get_commits
+
+        :return: list of dicts
+        """
+        response, branches = await self._gather([self._request_all('/commits'),
+                                                 self._get_complete_commit_branch_map()])
+        if response is None or branches is None:
+            return None
+        return [
+            dict(parse_commit(commit), branch=match_branch_to_commit(branches, commit['sha']))
+            for commit in response]
+
+    async def get_commits_by_branch(self, branch_name):
+        """
+        Gets information about commits of a specific branch,
+        see GithubRequestSender.get_commits_by_branch
+
+        :param branch_name: string
+        :return: list of dicts
+        """
+        assert isinstance(branch_name, str), "Branch name must be str, received other"
+        response = await self._request_all('/commits', {'sha': branch_name})
+        return [parse_commit(commit) for commit in response] if response is not None else None
+
+    async def get_commit_by_hash(self, hash_of_commit):
+        """
+        Gets information about the commit by hash, see GithubRequestSender.get_commit_by_hash
+
+        :param hash_of_commit: string
+        :return: dict
+        """
+        assert isinstance(hash_of_commit, str), "Hash of commit must be str, received other"
+        response, branches = await self._gather([self._request(f'/commits/{hash_of_commit}'),
+                                                 self._get_complete_commit_branch_map()])
+        if response is None or branches is None:
+            return None
+        return dict(parse_commit(response),
+                    branch=match_branch_to_commit(branches, response['sha']))
+
+    async def get_contributors(self):
+        """
+        Gets information about all contributors to repository,
+        see GithubRequestSender.get_contributors
+
+        :return: list of dicts
+        """
+        response = await self._request_all('/contributors')
+        return [parse_contributor(contributor)
+                for contributor in response] if response is not None else None
+
+    async def get_new_commits_by_branch(self, branch_name, newest_commit=None):
+        """
+        Gets commits of branch which are not reachable from its newest known commit,
+        see GithubRequestSender.get_new_commits_by_branch
+
+        :param branch_name: string
+        :param newest_commit: dict - parsed newest known commit of branch or None to get all
+        :return: list of dicts or None if request failed
+        """
+        if newest_commit is not None:
+            response = await self._request(f'/compare/{newest_commit["hash"]}...{branch_name}')
+            if response is not None and response['total_commits'] <= len(response['commits']):
+                # compared commits are listed from the oldest one
+                return [parse_commit(item) for item in reversed(response['commits'])]
+        return await self.get_commits_by_branch(branch_name)
+
+    async def get_all_commits(self):
+        """
+        Gets information about all commits of all branches in repository,
+        see GithubRequestSender.get_all_commits
+
+        :return: dict of list of commits and metadata
+        """
+        return await self.get_updated_all_commits(None)
+
+    async def get_updated_all_commits(self, old_commits):
+        """
+        Updates commits got by get_all_commits, commits of branches which heads moved
+        are requested concurrently, see GithubRequestSender.get_updated_all_commits
+
+        :param old_commits: dict - commits and metadata to update
+        :return: dict - updated commits and metadata or None if request failed
+        """
+        branch_heads = await self._get_branch_heads()
+        if branch_heads is None:
+            return None
+        return await async_sync_all_commits(branch_heads, self.get_new_commits_by_branch,
+                                            old_commits)
@@ -0,0 +1,252 @@
+"""
+Contains AsyncGitLabRequestSender class that provides asynchronous realisation
+for sending API requests to web-based hosting services for version control using Git
+"""
+
+from heat_map.request_sender.async_request_sender_base import AsyncRequestSender
+from heat_map.request_sender.gitlab_request_sender import TOKEN, BRANCH_ATTRIBUTION, \
+    parse_repo, parse_commit, parse_commit_by_hash, parse_contributor
+from heat_map.utils.commit_branch_index import CommitBranchIndex
+from heat_map.utils.commit_sync import async_sync_all_commits
+from heat_map.utils.pagination import PER_PAGE, PaginationError, aiter_pages, \
+    gitlab_next_page
+from heat_map.utils.request_status_codes import STATUS_CODE_OK
+
+
+class AsyncGitLabRequestSender(AsyncRequestSender):
+    """
+        GitLab class that provides asynchronous realisation for sending API requests
+        to web-based hosting services for version control using Git.
+        Results are the same as results of GitLabRequestSender
+    """
+
+    def __init__(self, owner, repo, base_url="https://gitlab.com/api/v4/projects/",
+                 branch_attribution=BRANCH_ATTRIBUTION, **kwargs):
+        assert branch_attribution in ("walk", "refs"), \
+            'Inputted "branch_attribution" is not "walk" or "refs"'
+        super().__init__(base_url=base_url, owner=owner, repo=repo, **kwargs)
+        self.token = TOKEN
+        self.project_url = self.base_url + self.owner + "%2F" + self.repo
+        self.branch_attribution = branch_attribution
+        # branch of commit with key - hash of commit, filled by refs requests
+        self._branch_for_commit = {}
+
+    async def _get_json(self, url):
+        """
+        Gets deserialized response or None if response status is not OK
+
+        :param url: string
+        :return: dict or list or None
+        """
+        response = await self._http_get(url)
+        if not response.status_code == STATUS_CODE_OK:
+            return None
+        return response.json()
+
+    async def _get_all(self, url):
+        """
+        Gets items of all pages of list url, see GitLabRequestSender._get_all
+
+        :param url: string
+        :return: list or None if any page failed
+        """
+        items = []
+        try:
+            async for response in aiter_pages(self._http_get, url, {'per_page': PER_PAGE},
+                                              gitlab_next_page):
+                items.extend(response.json())
+        except PaginationError:
+            return None
+        return items
+
+    async def _get_branch_for_commit(self, commit_hash):
+        """
+        function that gets branch for particular commit
+        :param commit_hash: string
+        :return: string
+        """
+        response = await self._http_get(
+            self.project_url + "/repository/commits/" + commit_hash + "/refs")
+        return response.json()[0]['name']
+
+    async def _get_cached_branch_for_commit(self, commit_hash):
+        """
+        Gets branch for particular commit, refs of every commit are requested once
+        :param commit_hash: string
+        :return: string
+        """
+        if commit_hash not in self._branch_for_commit:
+            self._branch_for_commit[commit_hash] = await self._get_branch_for_commit(commit_hash)
+        return self._branch_for_commit[commit_hash]
+
+    async def _get_commit_branch_index(self):
+        """
+        Walks commits of all branches concurrently and indexes branches of every commit,
+        see GitLabRequestSender._get_commit_branch_index
+        :return: CommitBranchIndex or None
+        """
+        branches = await self.get_branches()
+        if branches is None:
+            return None
+        names = [branch["name"] for branch in branches]
+        branches_commits = await self._gather(
+            self._get_all(self.project_url + "/repository/commits?ref_name=" + name)
+            for name in names)
+        if None in branches_commits:
+            return None
+        index = CommitBranchIndex()
+        for name, commits in zip(names, branches_commits):
+            index.add_commits(name, (commit["id"] for commit in commits))
+        return index
+
+    async def _get_branches_for_commits(self, hashes):
+        """
+        Gets branch for every commit, see GitLabRequestSender._get_branches_for_commits
+        :param hashes: list - of commits hashes
+        :return: list - of branches names in order of hashes
+        """
+        branches = [None] * len(hashes)
+        if self.branch_attribution == "walk":
+            index = await self._get_commit_branch_index()
+            if index is not None:
+                branches = [(index.branches_of(commit_hash) or [None])[0]
+                            for commit_hash in hashes]
+
+        missing = [i for i, branch in enumerate(branches) if branch is None]
+        found = await self._gather(self._get_cached_branch_for_commit(hashes[i])
+                                   for i in missing)
+        for i, branch in zip(missing, found):
+            branches[i] = branch
+        return branches
+
+    async def get_repo(self):
+        """
+        Gets information about repository, see GitLabRequestSender.get_repo
+
+        :return: dictionary
+        """
+        repo_info = await self._get_json(self.project_url + self.token)
+        return parse_repo(repo_info) if repo_info is not None else None
+
+    async def get_branches(self):
+        """
+        Gets branches of given repository, see GitLabRequestSender.get_branches
+
+        :return: list of dictionaries
+        """
+        branches_info = await self._get_all(
+            self.project_url + "/repository/branches" + self.token)
+        if branches_info is None:
+            return None
+        return [{"name": branch["name"]} for branch in branches_info]
+
+    async def get_commits(self):
+        """
+        Gets information about commits, see GitLabRequestSender.get_commits.
+        Commits of all branches are requested concurrently
+
+        :return: list of dictionaries
+        """
+        commits_info = await self._get_all(
+            self.project_url + "/repository/commits" + self.token)
+        if commits_info is None:
+            return None
+
+        branches = await self._get_branches_for_commits([commit["id"] for commit in commits_info])
+        return [dict(parse_commit(commit), branch=branch)
+                for commit, branch in zip(commits_info, branches)]
+
+    async def get_contributors(self):
+        """
+        Gets information about contributors, see GitLabRequestSender.get_contributors
+
+        :return: list of dictionaries
+        """
+        contributors_info = await self._get_all(
+            self.project_url + "/repository/contributors" + self.token)
+        if contributors_info is None:
+            return None
+        return [parse_contributor(contributor) for contributor in contributors_info]
+
+    async def get_commit_by_hash(self, hash_of_commit):
+        """
+        Gets information about commit by hash, see GitLabRequestSender.get_commit_by_hash
+
+        :param hash_of_commit: string
+        :return: dictionary
+        """
+        commit_info = await self._get_json(
+            self.project_url + "/repository/commits/" + hash_of_commit)
+        if commit_info is None:
+            return None
+        branch = await self._get_cached_branch_for_commit(hash_of_commit)
+        return dict(parse_commit_by_hash(commit_info), branch=branch)
+
+    async def get_commits_by_branch(self, branch_name):
+        """
+        Gets information about commits of branch, see GitLabRequestSender.get_commits_by_branch
+
+        :param branch_name: string
+        :return: list of dictionaries
+        """
+        commits_json = await self._get_all(
+            self.project_url + "/repository/commits?ref_name=" + branch_name)
+        if not commits_json:
+            return None
+        return [parse_commit(commit) for commit in commits_json]
+
+    async def _get_branch_heads(self):
+        """
+        Gets hash of head commit of every branch, see GitLabRequestSender._get_branch_heads
+
+        :return: dict - branch name to hash of its head commit or None if request failed
+        """
+        branches_info = await self._get_all(self.project_url + "/repository/branches")
+        if branches_info is None:
+            return None
+        return {branch["name"]: branch["commit"]["id"] for branch in branches_info}
+
+    async def get_new_commits_by_branch(self, branch_name, newest_commit=None):
+        """
+        Gets commits of branch which are not reachable from its newest known commit,
+        see GitLabRequestSender.get_new_commits_by_branch
+
+        :param branch_name: string
+        :param newest_commit: dict - parsed newest known commit of branch or None to get all
+        :return: list of dictionaries or None if request failed
+        """
+        if newest_commit is not None:
+            compared = await self._get_json(
+                self.project_url + "/repository/compare?from=" + newest_commit["hash"] +
+                "&to=" + branch_name)
+            if compared is not None and not compared.get("compare_timeout"):
+                # compared commits are listed from the oldest one
+                return [parse_commit(item) for item in reversed(compared["commits"])]
+        commits_json = await self._get_all(
+            self.project_url + "/repository/commits?ref_name=" + branch_name)
+        if commits_json is None:
+            return None
+        return [parse_commit(commit) for commit in commits_json]
+
+    async def get_all_commits(self):
+        """
+        Gets commits of all branches with branches they belong to,
+        see GitLabRequestSender.get_all_commits
+
+        :return: dictionary of list of commits and metadata
+        """
+        return await self.get_updated_all_commits(None)
+
+    async def get_updated_all_commits(self, old_commits):
+        """
+        Updates commits got by get_all_commits, commits of branches which heads moved
+        are requested concurrently, see GitLabRequestSender.get_updated_all_commits
+
+        :param old_commits: dictionary - commits and metadata to update
+        :return: dictionary - updated commits and metadata or None if request failed
+        """
+        branch_heads = await self._get_branch_heads()
+        if branch_heads is None:
+            return None
+        return await async_sync_all_commits(branch_heads, self.get_new_commits_by_branch,
+                                            old_commits)
@@ -0,0 +1,277 @@
+"""
+Contains AsyncRequestSender class that provides asynchronous interface for sending API requests
+to web-based hosting services for version control using Git
+"""
+
+import asyncio
+import json
+import threading
+
+import aiohttp
+
+from heat_map.utils.http_transport import SHARED_TRANSPORT, get_limit_key
+from heat_map.utils.request_scheduler import INTERACTIVE
+
+# max number of API requests in flight at once per sender
+MAX_IN_FLIGHT = 100
+# connection errors of requests retried by scheduler
+REQUEST_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError)
+
+
+class AsyncResponse:
+    """
+    Already read response of AsyncRequestSender,
+    provides the same attributes as requests.Response used by parsers
+    """
+
+    def __init__(self, status_code, headers, content):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    def json(self):
+        """
+        Deserializes response body
+
+        :return: dict or list
+        """
+        return json.loads(self.content.decode('utf-8'))
+
+
+class AsyncRequestSender:
+    """
+    Base class that provides asynchronous interface for sending API requests
+    to web-based hosting services for version control using Git.
+    Every method of RequestSender is a coroutine here which returns the same result
+    """
+
+    def __init__(self, base_url, owner, repo, session=None, max_in_flight=MAX_IN_FLIGHT,
+                 scheduler=SHARED_TRANSPORT.scheduler):
+        assert isinstance(base_url, str), 'Inputted "base_url" type is not str'
+        assert isinstance(owner, str), 'Inputted "owner" type is not str'
+        assert isinstance(repo, str), 'Inputted "repo" type is not str'
+        assert isinstance(max_in_flight, int) and max_in_flight > 0, \
+            'Inputted "max_in_flight" is not positive int'
+        self.base_url = base_url
+        self.owner = owner
+        self.repo = repo
+        self.max_in_flight = max_in_flight
+        # session is created lazily to be bound to the running event loop
+        self._session = session
+        self._own_session = session is None
+        # requests are paced by the same scheduler as requests of synchronous senders
+        self.scheduler = scheduler
+        self.priority = INTERACTIVE
+
+    def _get_session(self):
+        """
+        Gets aiohttp session of the sender, creates pooled keep-alive session
+        limited to max_in_flight connections if it was not given
+
+        :return: aiohttp.ClientSession
+        """
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=self.max_in_flight)
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    async def _http_get(self, url, params=None, headers=None):
+        """
+        Sends GET request to URL through scheduler and reads response body,
+        connection errors, rate limit and server error responses are retried by scheduler
+
+        :param url: string - full url
+        :param params: dict - of request parameters
+        :param headers: dict - of request headers
+        :return: AsyncResponse
+        """
+
+        async def send():
+            async with self._get_session().get(url, params=params, headers=headers) as response:
+                content = await response.read()
+                return AsyncResponse(response.status, response.headers, content)
+
+        if self.scheduler is None:
+            return await send()
+        return await self.scheduler.async_request(get_limit_key(url, headers), send,
+                                                  self.priority, REQUEST_ERRORS)
+
+    async def _gather(self, coroutines):
+        """
+        Runs coroutines concurrently
+
+        :param coroutines: iterable - of coroutines
+        :return: list - of results in order of coroutines
+        """
+        return list(await asyncio.gather(*coroutines))
+
+    async def close(self):
+        """
+        Closes session of the sender if it was created by the sender
+        """
+        if self._own_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def get_repo(self):
+        """
+        Gets information about repository, see RequestSender.get_repo
+
+        :return: dict
+        :raise NotImplementedError
+        """
+        raise NotImplementedError
+
+    async def get_branches(self):
+        """
+        Gets list of branches in a repository, see RequestSender.get_branches
+
+        :return: list of dicts
+        :raise NotImplementedError
+        """
+        raise NotImplementedError
+
+    async def get_commits(self):
+        """
+        Gets information about all commits in repository, see RequestSender.get_commits
+
+        :return: list of dicts
+        :raise NotImplementedError
+        """
+        raise NotImplementedError
+
+    async def get_commits_by_branch(self, branch_name):
+        """
+        Gets information about commits of a specific branch,
+        see RequestSender.get_commits_by_branch
+
+        :param branch_name: string
+        :return: list of dicts
+        :raise NotImplementedError
+        """
+        raise NotImplementedError
+
+    async def get_commit_by_hash(self, hash_of_commit):
+        """
+        Gets information about the commit by hash, see RequestSender.get_commit_by_hash
+
+        :param hash_of_commit: string
+        :return: dict
+        :raise NotImplementedError
+        """
+        raise NotImplementedError
+
+    async def get_contributors(self):
+        """
+        Gets information about all contributors to repository,
+        see RequestSender.get_contributors
+
+        :return: list of dicts
+        :raise NotImplementedError
+        """
+        raise NotImplementedError
+
+
+class EventLoopThread:
+    """
+    Long-lived event loop running in daemon thread with aiohttp session shared by async senders,
+    so messages of all consumer threads reuse one loop and pool of keep-alive connections.
+    Loop and session are created lazily by the first call
+    """
+
+    def __init__(self, max_in_flight=MAX_IN_FLIGHT):
+        assert isinstance(max_in_flight, int) and max_in_flight > 0, \
+            'Inputted "max_in_flight" is not positive int'
+        self.max_in_flight = max_in_flight
+        self._lock = threading.Lock()
+        self._loop = None
+        self._session = None
+
+    @staticmethod
+    def _run_forever(loop):
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    async def _create_session(self):
+        connector = aiohttp.TCPConnector(limit=self.max_in_flight)
+        return aiohttp.ClientSession(connector=connector)
+
+    def _get_loop(self):
+        """
+        Gets running loop, starts loop thread and creates session if they were not started
+
+        :return: asyncio event loop
+        """
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=self._run_forever, args=(loop,),
+                                 name='async-request-senders', daemon=True).start()
+                self._session = asyncio.run_coroutine_threadsafe(
+                    self._create_session(), loop).result()
+                self._loop = loop
+            return self._loop
+
+    @property
+    def session(self):
+        """
+        Gets aiohttp session bound to the loop, it is closed by close() only
+
+        :return: aiohttp.ClientSession
+        """
+        self._get_loop()
+        return self._session
+
+    def run(self, coroutine):
+        """
+        Runs coroutine on the loop and waits for its result in the calling thread
+
+        :param coroutine: coroutine
+        :return: result of coroutine
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self._get_loop()).result()
+
+    def close(self):
+        """
+        Closes shared session and stops the loop, the next call starts new ones
+        """
+        with self._lock:
+            loop, self._loop = self._loop, None
+            session, self._session = self._session, None
+        if loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(session.close(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+
+
+# event loop shared by async senders of all consumer threads
+SHARED_LOOP = EventLoopThread()
+
+
+def run_until_complete(sender, coroutine, loop_thread=SHARED_LOOP):
+    """
+    Runs coroutine of async sender on the shared event loop thread, waits for its result
+    and closes session of the sender afterwards if it is not the shared one
+
+    :param sender: AsyncRequestSender
+    :param coroutine: coroutine - result of sender method call
+    :param loop_thread: EventLoopThread
+    :return: result of coroutine
+    """
+
+    async def run():
+        try:
+            return await coroutine
+        finally:
+            await sender.close()
+
+    return loop_thread.run(run())
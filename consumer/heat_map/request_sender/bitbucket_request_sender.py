@@ -5,17 +5,79 @@ BitbucketServerRequestSender class hat provides the same methods for sending API
 to Bitbucket Server.
 """
 
-import time
-import requests
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from requests.exceptions import RequestException
 
 from heat_map.request_sender.request_sender_base import RequestSender
+from heat_map.utils.commit_sync import merge_branches_commits
 from heat_map.utils.bitbucket_helper import to_timestamp, get_gitname, get_email
 from heat_map.utils.request_status_codes import STATUS_CODE_OK
 
 from general_helper.logger.log_error_decorators import try_except_decor
 from general_helper.logger.log_config import LOG
 
+# max number of requests to Bitbucket Cloud in flight at once per sender,
+# keeps concurrent fetching under Bitbucket rate limits
+MAX_IN_FLIGHT = 4
+
+
+def parse_commit(commit):
+    """
+    Parses commit of Bitbucket Cloud API response
+
+    :param commit: dict - commit in response
+    :return: dict
+    :Example:
+    {
+        "hash": "commit hash",
+        "author": "commit author",
+        "message": "commit message",
+        "date": "date when committed converted to int"
+    }
+    """
+    return {
+        'hash': commit['hash'],
+        'author': get_gitname(commit),
+        'message': commit['message'],
+        'date': str(to_timestamp(commit['date']))
+    }
+
+
+def collect_contributors(commits):
+    """
+    Collects contributors with number of their commits from list of not parsed commits
+
+    :param commits: list - of commits in response
+    :return: list of dicts
+    """
+
+    contributors = {}
+
+    # for each commit
+    for commit in commits:
+
+        # commit['author']['raw'] - unique string 'user_gitname <user_email>'
+        # if we haven't tracked commit author yet
+        if commit['author']['raw'] not in contributors:
+            # check if author has key 'user' means check if author has bitbucket account,
+            #  if doesn't return  None
+            user = commit['author'].get('user')
+
+            # start tracking commit author
+            contributors[commit['author']['raw']] = {
+                # if has account assign account's username else author's gitname
+                'name': get_gitname(commit),
+                'number_of_commits': 1,  # count number of commits
+                'email': get_email(commit['author']['raw']),
+                'url': user['links']['html']['href'] if user else None
+            }
+        else:
+            # if author is already being tracked increment number of commits by one
+            contributors[commit['author']['raw']]['number_of_commits'] += 1
+
+    return list(contributors.values())
+
 
 class BitbucketRequestSenderExc(Exception):
     """
@@ -38,9 +100,17 @@ class BitbucketRequestSender(RequestSender):
     """
 
     @try_except_decor
-    def __init__(self, owner, repo, base_url='https://api.bitbucket.org/2.0'):
+    def __init__(self, owner, repo, base_url='https://api.bitbucket.org/2.0',
+                 max_in_flight=MAX_IN_FLIGHT):
+        assert isinstance(max_in_flight, int) and max_in_flight > 0, \
+            'Inputted "max_in_flight" is not positive int'
+
         super().__init__(base_url=base_url, owner=owner, repo=repo)
 
+        # max_in_flight=1 keeps strictly sequential fetching
+        self.max_in_flight = max_in_flight
+        self._in_flight = threading.BoundedSemaphore(max_in_flight)
+
     @try_except_decor
     def _get_request(self, endpoint, params=None, **kwargs):
         """
@@ -51,20 +121,17 @@ class BitbucketRequestSender(RequestSender):
         :return: json - response object
         """
 
-        retries = 30
-        while True:
-            try:
-                LOG.debug('Try to connect to BitBucket Cloud!')
-                response = requests.get(self.base_url + endpoint, params, **kwargs)
-                LOG.debug('Successfully connected BitBucket Cloud!')
-                return response
+        # retries with backoff and rate limits are handled by scheduler of transport
+        try:
+            LOG.debug('Try to connect to BitBucket Cloud!')
+            with self._in_flight:
+                response = self._http_get(self.base_url + endpoint, params, **kwargs)
+            LOG.debug('Successfully connected BitBucket Cloud!')
+            return response
 
-            except RequestException as exc:
-                if retries == 0:
-                    LOG.error('Failed to connect to BitBucket Cloud...', exc_info=exc)
-                    raise RequestException
-                retries -= 1
-                time.sleep(1)
+        except RequestException as exc:
+            LOG.error('Failed to connect to BitBucket Cloud...', exc_info=exc)
+            raise
 
     @try_except_decor
     def _get_page_of_commits_by_branch(self, branch_name='master', page=1):
@@ -98,6 +165,59 @@ class BitbucketRequestSender(RequestSender):
 
         return commits_page
 
+    def _iter_pages_of_commits_by_branch(self, branch_name):
+        """
+            Yields deserialized pages of not parsed commits by branch name.
+            In concurrent mode request of the next page is sent
+            before the current page is handed to the caller.
+
+        :param branch_name: str
+        :return: generator - of commits pages
+        """
+
+        if self.max_in_flight == 1:
+            page = 1
+            response = {'next': 'eny text'}
+            while 'next' in response:
+                response = self._get_page_of_commits_by_branch(branch_name, page)
+                if response is None:
+                    raise BitbucketRequestSenderExc(
+                        f'Can\'t get page {page} of commits by branch {branch_name}')
+                yield response
+                page += 1
+            return
+
+        with ThreadPoolExecutor(max_workers=1) as prefetcher:
+            page = 1
+            future = prefetcher.submit(self._get_page_of_commits_by_branch, branch_name, page)
+            while future is not None:
+                response = future.result()
+                if response is None:
+                    raise BitbucketRequestSenderExc(
+                        f'Can\'t get page {page} of commits by branch {branch_name}')
+                page += 1
+                # prefetch next page while the current one is parsed
+                future = prefetcher.submit(self._get_page_of_commits_by_branch,
+                                           branch_name, page) if 'next' in response else None
+                yield response
+
+    def _map_branches(self, func, branches_names):
+        """
+            Calls func for every branch name, fans out across branches
+            with at most max_in_flight branches fetched at once.
+
+        :param func: function - takes branch name
+        :param branches_names: list - of str
+        :return: list - of func results in order of branches_names
+        """
+
+        if self.max_in_flight == 1 or len(branches_names) < 2:
+            return [func(branch_name) for branch_name in branches_names]
+
+        workers = min(self.max_in_flight, len(branches_names))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(func, branches_names))
+
     @try_except_decor
     def get_repo(self):
         """
@@ -190,30 +310,19 @@ class BitbucketRequestSender(RequestSender):
         ]
         """
 
-        repo_commits = {}
-
         # gets all branches in repository
         branches = self.get_branches()
         if branches is None:
             raise BitbucketRequestSenderExc('Can\'t get branches for get_commits method')
+        branches_names = [branch['name'] for branch in branches]
 
         # get list of commits pages from all branches in repository
-        for branch in branches:
-            list_of_branch_commits = self.get_commits_by_branch(branch['name'])
-            if list_of_branch_commits is None:
-                raise BitbucketRequestSenderExc(
-                    'Can\'t get commits by branch for get_commits method')
+        branches_commits = [self.get_commits_by_branch(name) for name in branches_names]
+        if None in branches_commits:
+            raise BitbucketRequestSenderExc(
+                'Can\'t get commits by branch for get_commits method')
 
-            # adds key 'branches' with branch name in list to every commit in branch,
-            #  or if key 'branches' is existing add branch name to existing branches list
-            for commit_in_branch in list_of_branch_commits:
-                commit = repo_commits.get(commit_in_branch['hash'])
-                if commit:
-                    commit['branches'].append(branch['name'])
-                else:
-                    commit_in_branch['branches'] = [branch['name']]
-                    repo_commits[commit_in_branch['hash']] = commit_in_branch
-            list_of_branch_commits.clear()
+        repo_commits = merge_branches_commits(branches_names, branches_commits)
 
         # sorts all commits in repository by date in reverse order
         sorted_commits = sorted(list(repo_commits.values()), key=lambda x: x['date'], reverse=True)
@@ -257,14 +366,7 @@ class BitbucketRequestSender(RequestSender):
         # deserialize commit
         commits_page = response.json()
 
-        return [
-            {
-                'hash': commit['hash'],
-                'author': get_gitname(commit),
-                'message': commit['message'],
-                'date': str(to_timestamp(commit['date']))
-            } for commit in commits_page['values']
-            ]
+        return [parse_commit(commit) for commit in commits_page['values']]
 
     @try_except_decor
     def get_commit_by_hash(self, hash_of_commit):
@@ -330,10 +432,7 @@ class BitbucketRequestSender(RequestSender):
                         result['branches'] = [branch]
 
         # forms dict of commit describe
-        result['hash'] = commit['hash']
-        result['author'] = get_gitname(commit)
-        result['message'] = commit['message']
-        result['date'] = str(to_timestamp(commit['date']))
+        result.update(parse_commit(commit))
 
         return result
 
@@ -357,8 +456,6 @@ class BitbucketRequestSender(RequestSender):
         ]
         """
 
-        contributors = {}
-
         # gets all commits in repo to find all contributors
         commits_endpoint = f'/repositories/{self.owner}/{self.repo}/commits'
         response = self._get_request(commits_endpoint)
@@ -369,29 +466,7 @@ class BitbucketRequestSender(RequestSender):
         # deserialize commits
         commits_page = response.json()
 
-        # for each commit
-        for commit in commits_page['values']:
-
-            # commit['author']['raw'] - unique string 'user_gitname <user_email>'
-            # if we haven't tracked commit author yet
-            if commit['author']['raw'] not in contributors:
-                # check if author has key 'user' means check if author has bitbucket account,
-                #  if doesn't return  None
-                user = commit['author'].get('user')
-
-                # start tracking commit author
-                contributors[commit['author']['raw']] = {
-                    # if has account assign account's username else author's gitname
-                    'name': get_gitname(commit),
-                    'number_of_commits': 1,  # count number of commits
-                    'email': get_email(commit['author']['raw']),
-                    'url': user['links']['html']['href'] if user else None
-                }
-            else:
-                # if author is already being tracked increment number of commits by one
-                contributors[commit['author']['raw']]['number_of_commits'] += 1
-
-        return list(contributors.values())
+        return collect_contributors(commits_page['values'])
 
     ########################################################################################
 
@@ -405,25 +480,11 @@ class BitbucketRequestSender(RequestSender):
         :return: list - list of all commits
         """
 
-        full_response = []
-        # declare response dict with kay 'next' to enable first iteration
-        response = {'next': 'eny text'}
-        page = 1
-
-        while 'next' in response.keys():
-            response = self._get_page_of_commits_by_branch(branch_name, page)
-            full_response.extend(response['values'])
-            page += 1
+        parsed_full_response = []
 
-        # parser
-        parsed_full_response = [
-            {
-                'hash': commit['hash'],
-                'author': get_gitname(commit),
-                'message': commit['message'],
-                'date': str(to_timestamp(commit['date']))
-            } for commit in full_response
-            ]
+        for response in self._iter_pages_of_commits_by_branch(branch_name):
+            # parser
+            parsed_full_response.extend(parse_commit(commit) for commit in response['values'])
 
         return parsed_full_response
 
@@ -464,14 +525,7 @@ class BitbucketRequestSender(RequestSender):
             page += 1
 
         # parser
-        parsed_full_response = [
-            {
-                'hash': commit['hash'],
-                'author': get_gitname(commit),
-                'message': commit['message'],
-                'date': str(to_timestamp(commit['date']))
-            } for commit in full_response
-            ]
+        parsed_full_response = [parse_commit(commit) for commit in full_response]
 
         return parsed_full_response
 
@@ -534,35 +588,25 @@ class BitbucketRequestSender(RequestSender):
         }
         """
 
-        repo_commits = {}
-        metadata = {}
-
         # gets all branches in repository
         branches = self.get_branches()
         if branches is None:
             return None
+        branches_names = [branch['name'] for branch in branches]
 
-        # get list of commits pages from all branches in repository
-        for branch in branches:
-            list_of_branch_commits = self.get_all_commits_by_branch(branch['name'])
-
-            if list_of_branch_commits is None:
-                return None
-
-            # adds key 'branches' with branch name in list to every commit in branch,
-            #  or if key 'branches' is existing add branch name to existing branches list
-            for commit_in_branch in list_of_branch_commits:
-                commit = repo_commits.get(commit_in_branch['hash'])
-                if commit:
-                    commit['branches'].append(branch['name'])
-                else:
-                    commit_in_branch['branches'] = [branch['name']]
-                    repo_commits[commit_in_branch['hash']] = commit_in_branch
+        # get list of commits from all branches in repository, branches are
+        # fetched concurrently and merged in order to keep the result stable
+        branches_commits = self._map_branches(self.get_all_commits_by_branch, branches_names)
+        if None in branches_commits:
+            return None
 
-            # add metadata to method response for further updates by get_updated_all_commits
-            metadata[branch['name']] = list_of_branch_commits[0]
+        repo_commits = merge_branches_commits(branches_names, branches_commits)
 
-            list_of_branch_commits.clear()
+        # add metadata to method response for further updates by get_updated_all_commits
+        metadata = {
+            branch_name: list_of_branch_commits[0]
+            for branch_name, list_of_branch_commits in zip(branches_names, branches_commits)
+        }
 
         # sorts all commits in repository by date in reverse order
         sorted_commits = sorted(list(repo_commits.values()), key=lambda x: x['date'], reverse=True)
@@ -603,34 +647,29 @@ class BitbucketRequestSender(RequestSender):
             if not old_branches_names.count(branch):
                 checked_commits_metadata[branch] = None
 
-        # get dict of old commits with key - hash of commit for further mapping by branch
-        repo_commits = {commit['hash']: commit for commit in old_commits['data']}
+        updated_branches_names = []
+        updated_branches_commits = []
 
         # get list of new commits from all branches in repository
         for branch_name, newest_commit in checked_commits_metadata.copy().items():
-            updated_list_of_branch_commits = \
-                self.get_updated_commits_by_branch(branch_name, newest_commit, only_new=True)
+            updated_list_of_branch_commits = self.get_updated_commits_by_branch(
+                branch_name, [newest_commit] if newest_commit else [], only_new=True)
             if updated_list_of_branch_commits is None:
                 return None
 
-            # adds key 'branches' with branch name in list to every commit in branch,
-            #  or if key 'branches' is existing add branch name to existing branches list
-            for commit_in_branch in updated_list_of_branch_commits:
-                commit = repo_commits.get(commit_in_branch['hash'])
-                if commit:
-                    commit['branches'].append(branch_name)
-                else:
-                    commit_in_branch['branches'] = [branch_name]
-                    repo_commits[commit_in_branch['hash']] = commit_in_branch
+            updated_branches_names.append(branch_name)
+            updated_branches_commits.append(updated_list_of_branch_commits)
 
             # add new metadata to method response for further updates by get_updated_all_commits
             if updated_list_of_branch_commits:
                 checked_commits_metadata[branch_name] = updated_list_of_branch_commits[0]
             else:
-                # if given old commit is the newest - add it to new metadata. P.S unnecessary ???
-                checked_commits_metadata[branch_name] = newest_commit[0]
+                # if given old commit is the newest - keep it in new metadata
+                checked_commits_metadata[branch_name] = newest_commit
 
-            updated_list_of_branch_commits.clear()
+        # maps new commits by branch to old commits with key - hash of commit
+        repo_commits = merge_branches_commits(updated_branches_names, updated_branches_commits,
+                                              old_commits['data'])
 
         # sorts all commits in repository by date in reverse order
         updated_sorted_commits = sorted(list(repo_commits.values()), key=lambda x: x['date'],
@@ -669,7 +708,7 @@ class BitbucketServerRequestSender(RequestSender):
         :return: json - response object
         """
 
-        return requests.get(self.base_url + endpoint, params, **kwargs)
+        return self._http_get(self.base_url + endpoint, params, **kwargs)
 
     @try_except_decor
     def get_repo(self):
@@ -0,0 +1,411 @@
+"""
+Contains GithubGraphQLRequestSender class that provides implementation of
+interface for sending API requests to GitHub GraphQL API, which gets
+repository, all branches and their commit histories in batched queries
+with cursor pagination
+"""
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from heat_map.request_sender.github_request_sender import GithubRequestSender, \
+    GITHUB_TIME_FORMAT, match_branch_to_commit, get_branches_from_pull_requests, \
+    complete_commit_branch_map
+from heat_map.utils.commit_sync import merge_branches_commits
+from heat_map.utils.commit_branch_index import CommitBranchIndex
+from heat_map.utils.helper import format_date_to_int
+from heat_map.utils.request_status_codes import STATUS_CODE_OK
+
+from general_helper.logger.log_config import LOG
+
+# max number of nodes in one page of GraphQL connection
+PAGE_SIZE = 100
+# max number of branches which histories are continued by one query
+BATCH_SIZE = 10
+
+COMMIT_FIELDS = '''
+fragment commitFields on Commit {
+  oid
+  message
+  authoredDate
+  author { name }
+}
+'''
+
+HISTORY_FIELDS = '''
+pageInfo { hasNextPage endCursor }
+nodes { ...commitFields }
+'''
+
+REPO_QUERY = '''
+query($owner: String!, $name: String!) {
+  repository(owner: $owner, name: $name) {
+    databaseId
+    name
+    createdAt
+    owner { login }
+  }
+}
+'''
+
+REFS_QUERY = '''
+query($owner: String!, $name: String!, $after: String, $withHistory: Boolean!) {
+  repository(owner: $owner, name: $name) {
+    defaultBranchRef { name }
+    refs(refPrefix: "refs/heads/", first: %(page_size)d, after: $after,
+         orderBy: {field: ALPHABETICAL, direction: ASC}) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        name
+        target @include(if: $withHistory) {
+          ... on Commit {
+            history(first: %(page_size)d) { %(history_fields)s }
+          }
+        }
+      }
+    }
+  }
+}
+%(commit_fields)s
+''' % {'page_size': PAGE_SIZE, 'history_fields': HISTORY_FIELDS, 'commit_fields': COMMIT_FIELDS}
+
+PULL_REQUESTS_QUERY = '''
+query($owner: String!, $name: String!, $after: String) {
+  repository(owner: $owner, name: $name) {
+    pullRequests(first: %(page_size)d, after: $after) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        headRefName
+        headRefOid
+        headRepositoryOwner { login }
+      }
+    }
+  }
+}
+''' % {'page_size': PAGE_SIZE}
+
+COMMIT_QUERY = '''
+query($owner: String!, $name: String!, $oid: GitObjectID!) {
+  repository(owner: $owner, name: $name) {
+    object(oid: $oid) { ...commitFields }
+  }
+}
+%(commit_fields)s
+''' % {'commit_fields': COMMIT_FIELDS}
+
+
+def build_histories_query(count):
+    """
+    Builds query which continues histories of given number of branches at once,
+    branch of every alias refN is given by variables $refN and $afterN
+
+    :param count: int - number of branches
+    :return: string
+    """
+    assert isinstance(count, int), 'Inputted "count" type is not int'
+    declarations = ''.join(f', $ref{i}: String!, $after{i}: String' for i in range(count))
+    aliases = ''.join(
+        f'ref{i}: ref(qualifiedName: $ref{i}) {{ target {{ ... on Commit {{ '
+        f'history(first: {PAGE_SIZE}, after: $after{i}) {{ {HISTORY_FIELDS} }} }} }} }}\n'
+        for i in range(count))
+    return (f'query($owner: String!, $name: String!{declarations}) {{\n'
+            f'  repository(owner: $owner, name: $name) {{\n{aliases}  }}\n}}\n'
+            f'{COMMIT_FIELDS}')
+
+
+def format_git_timestamp(timestamp):
+    """
+    Converts GitTimestamp of GraphQL API, which keeps offset of committer,
+    to UTC date in GITHUB_TIME_FORMAT of REST API
+
+    :param timestamp: string - ISO-8601 date, e.g. "2018-07-03T09:32:41+03:00"
+    :return: string
+    """
+    if timestamp.endswith('Z'):
+        return timestamp
+    date, sign, hours, minutes = timestamp[:-6], timestamp[-6], timestamp[-5:-3], timestamp[-2:]
+    offset = timedelta(hours=int(hours), minutes=int(minutes))
+    utc_date = datetime.strptime(date, '%Y-%m-%dT%H:%M:%S')
+    utc_date = utc_date - offset if sign == '+' else utc_date + offset
+    return utc_date.strftime(GITHUB_TIME_FORMAT)
+
+
+def parse_commit(commit):
+    """
+    Parses commit of GitHub GraphQL API response, result is the same
+    as result of parsing the commit of REST API response
+
+    :param commit: dict - commit node in response
+    :return: dict
+    """
+    return {
+        'hash': commit['oid'],
+        'author': commit['author']['name'],
+        'message': commit['message'],
+        'date': format_date_to_int(format_git_timestamp(commit['authoredDate']),
+                                   GITHUB_TIME_FORMAT)
+    }
+
+
+def to_rest_pull_request(pull_request, owner):
+    """
+    Converts pull request of GraphQL API response to head of pull request
+    of REST API response, so it may be used by get_branches_from_pull_requests
+
+    :param pull_request: dict - pull request node in response
+    :param owner: str - owner of repository
+    :return: dict
+    """
+    head_owner = pull_request['headRepositoryOwner']
+    login = head_owner['login'] if head_owner is not None else owner
+    return {
+        'head': {
+            'label': f"{login}:{pull_request['headRefName']}",
+            'sha': pull_request['headRefOid']
+        }
+    }
+
+
+class GithubGraphQLRequestSender(GithubRequestSender):
+    """
+    Class that provides implementation of interface for sending API requests
+    to GitHub GraphQL API. Branches and histories of all branches are got
+    by a few batched queries instead of one REST request per branch and page.
+    Contributors are got by REST API which has no GraphQL counterpart
+    """
+
+    def __init__(self, owner, repo, token='token ...',
+                 base_url="https://api.github.com"):
+        GithubRequestSender.__init__(self, owner, repo, token=token, base_url=base_url)
+        self.graphql_url = self.base_url + '/graphql'
+
+    def _graphql(self, query, variables=None):
+        """
+        Sends GraphQL query of repository of the sender
+
+        :param query: string
+        :param variables: dict - query variables besides owner and name of repository
+        :return: dict - data of response or None if query failed
+        """
+        body = {
+            'query': query,
+            'variables': dict(variables or {}, owner=self.owner, name=self.repo)
+        }
+        response = self._http_post(self.graphql_url, json=body,
+                                   headers={'Authorization': self.token})
+        if response.status_code != STATUS_CODE_OK:
+            return None
+        response = response.json()
+        if response.get('errors') or not response.get('data'):
+            LOG.error('GitHub GraphQL query failed: %s', response.get('errors'))
+            return None
+        return response['data']
+
+    def _get_connection(self, query, connection, variables=None):
+        """
+        Gets all nodes of repository connection following its cursor,
+        with the first page of result of query
+
+        :param query: string - query with $after variable
+        :param connection: string - name of connection field of repository
+        :param variables: dict - other query variables
+        :return: tuple - (repository of first page, list of nodes) or None
+        """
+        first_page, nodes, after = None, [], None
+        while True:
+            data = self._graphql(query, dict(variables or {}, after=after))
+            if data is None or data['repository'] is None:
+                return None
+            first_page = first_page or data['repository']
+            page = data['repository'][connection]
+            nodes.extend(page['nodes'])
+            if not page['pageInfo']['hasNextPage']:
+                return first_page, nodes
+            after = page['pageInfo']['endCursor']
+
+    def _continue_histories(self, histories, pending):
+        """
+        Gets remaining pages of histories of branches, BATCH_SIZE branches per query
+
+        :param histories: OrderedDict - branch name to list of parsed commits got yet
+        :param pending: list - of tuples (branch name, cursor) of unfinished histories
+        :return: OrderedDict - branch name to list of parsed commits or None
+        """
+        while pending:
+            batch, pending = pending[:BATCH_SIZE], pending[BATCH_SIZE:]
+            variables = {}
+            for i, (branch, after) in enumerate(batch):
+                variables[f'ref{i}'] = 'refs/heads/' + branch
+                variables[f'after{i}'] = after
+            data = self._graphql(build_histories_query(len(batch)), variables)
+            if data is None or data['repository'] is None:
+                return None
+            for i, (branch, _) in enumerate(batch):
+                ref = data['repository'][f'ref{i}']
+                if ref is None:
+                    return None
+                history = ref['target']['history']
+                histories[branch].extend(map(parse_commit, history['nodes']))
+                if history['pageInfo']['hasNextPage']:
+                    pending.append((branch, history['pageInfo']['endCursor']))
+        return histories
+
+    def _get_branches_histories(self):
+        """
+        Gets name of default branch and full histories of all branches,
+        first pages of histories come with branches
+
+        :return: tuple - (default branch name, OrderedDict of branch name
+        to list of parsed commits) or None
+        """
+        result = self._get_connection(REFS_QUERY, 'refs', {'withHistory': True})
+        if result is None:
+            return None
+        repository, refs = result
+        histories, pending = OrderedDict(), []
+        for ref in refs:
+            history = ref['target']['history']
+            histories[ref['name']] = list(map(parse_commit, history['nodes']))
+            if history['pageInfo']['hasNextPage']:
+                pending.append((ref['name'], history['pageInfo']['endCursor']))
+        histories = self._continue_histories(histories, pending)
+        if histories is None:
+            return None
+        default_branch = repository['defaultBranchRef']
+        return default_branch['name'] if default_branch else None, histories
+
+    def _get_pull_requests(self):
+        result = self._get_connection(PULL_REQUESTS_QUERY, 'pullRequests')
+        if result is None:
+            return None
+        return [to_rest_pull_request(pull_request, self.owner) for pull_request in result[1]]
+
+    def _get_commit_branch_map(self, histories):
+        """
+        Gets index of commits hashes to branches
+        from both histories of branches and pull requests
+
+        :param histories: OrderedDict - branch name to list of parsed commits
+        :return: CommitBranchIndex
+        """
+        existing_branches = CommitBranchIndex()
+        for branch, commits in histories.items():
+            existing_branches.add_commits(branch, (commit['hash'] for commit in commits))
+        pull_request_branches = self._get_branches_from_pull_request(self._get_pull_requests())
+        return complete_commit_branch_map(existing_branches, pull_request_branches)
+
+    def _get_complete_commit_branch_map(self):
+        result = self._get_branches_histories()
+        return self._get_commit_branch_map(result[1]) if result is not None else None
+
+    def get_repo(self):
+        """
+        Gets information about repository, see GithubRequestSender.get_repo
+
+        :return: dict
+        """
+        data = self._graphql(REPO_QUERY)
+        if data is None or data['repository'] is None:
+            return None
+        repo = data['repository']
+        return {
+            'id': repo['databaseId'],
+            'repo_name': repo['name'],
+            'creation_date': format_date_to_int(repo['createdAt'], GITHUB_TIME_FORMAT),
+            'owner': repo['owner']['login'],
+            'url': f"{self.base_url}/repos/{repo['owner']['login']}/{repo['name']}"
+        }
+
+    def get_branches(self):
+        """
+        Gets list of all branches in a repository, see GithubRequestSender.get_branches
+
+        :return: list of dicts
+        """
+        result = self._get_connection(REFS_QUERY, 'refs', {'withHistory': False})
+        if result is None:
+            return None
+        return [{'name': ref['name']} for ref in result[1]]
+
+    def get_commits(self):
+        """
+        Gets information about all commits of default branch with branches
+        they belong to, see GithubRequestSender.get_commits
+
+        :return: list of dicts
+        """
+        result = self._get_branches_histories()
+        if result is None:
+            return None
+        default_branch, histories = result
+        branches = self._get_commit_branch_map(histories)
+        return [
+            dict(commit, branch=match_branch_to_commit(branches, commit['hash']))
+            for commit in histories.get(default_branch, [])]
+
+    def get_commits_by_branch(self, branch_name):
+        """
+        Gets information about all commits of a specific branch,
+        see GithubRequestSender.get_commits_by_branch
+
+        :param branch_name: string
+        :return: list of dicts
+        """
+        assert isinstance(branch_name, str), "Branch name must be str, received other"
+        histories = self._continue_histories(OrderedDict([(branch_name, [])]),
+                                             [(branch_name, None)])
+        return histories[branch_name] if histories is not None else None
+
+    def get_commit_by_hash(self, hash_of_commit):
+        """
+        Gets information about the commit by hash, see GithubRequestSender.get_commit_by_hash
+
+        :param hash_of_commit: string
+        :return: dict
+        """
+        assert isinstance(hash_of_commit, str), "Hash of commit must be str, received other"
+        data = self._graphql(COMMIT_QUERY, {'oid': hash_of_commit})
+        if data is None or data['repository'] is None or not data['repository']['object']:
+            return None
+        commit = parse_commit(data['repository']['object'])
+        branches = self._get_complete_commit_branch_map()
+        if branches is None:
+            return None
+        return dict(commit, branch=match_branch_to_commit(branches, commit['hash']))
+
+    def get_all_commits(self):
+        """
+        Gets information about all commits of all branches in repository
+
+        :return: dict of list of commits and metadata
+        :Example:
+        {
+            "data": [
+                {
+                    "hash": "commit hash",
+                    "author": "commit author",
+                    "message": "commit message",
+                    "date": "date when committed converted to int",
+                    "branches": ["branch name", ...]
+                },
+                ...
+            ],
+            "metadata": {
+                "branch name": {newest commit of branch},
+                ...
+            }
+        }
+        """
+        result = self._get_branches_histories()
+        if result is None:
+            return None
+        histories = result[1]
+
+        repo_commits = merge_branches_commits(list(histories), list(histories.values()))
+
+        # add metadata to method response for further updates by get_updated_all_commits
+        metadata = {branch: commits[0] for branch, commits in histories.items() if commits}
+
+        # sorts all commits in repository by date in reverse order
+        sorted_commits = sorted(list(repo_commits.values()), key=lambda x: x['date'], reverse=True)
+
+        return {'data': sorted_commits, 'metadata': metadata}
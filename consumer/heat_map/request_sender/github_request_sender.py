@@ -3,28 +3,117 @@ Contains GithubRequestSender class that provides implementation of
 interface for sending API requests
 to web-based hosting services for version control using GitHub
 """
-import requests
 from heat_map.request_sender.request_sender_base \
     import RequestSender  # pylint: disable=import-error
+from heat_map.utils.commit_branch_index import CommitBranchIndex
+from heat_map.utils.commit_sync import sync_all_commits
 from heat_map.utils.helper import format_date_to_int
+from heat_map.utils.pagination import PER_PAGE, PaginationError, iter_pages, github_next_page
 from heat_map.utils.request_status_codes import STATUS_CODE_OK
 
 GITHUB_TIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
 
 
-def match_branch_to_commit(branch_list, sha):
+def match_branch_to_commit(branch_index, sha):
     """
     Gets all branches which commit belongs to in a list
-    :param branch_list:
+    :param branch_index: CommitBranchIndex
     :param sha:
     :return:
     """
-    matched_branches = [k for k in branch_list if sha in branch_list[k]]
+    matched_branches = branch_index.branches_of(sha)
     if matched_branches:
         return matched_branches
     return "unknown"
 
 
+def parse_repo(response):
+    """
+    Parses repository of GitHub API response
+
+    :param response: dict - repository in response
+    :return: dict
+    """
+    return {
+        'id': response['id'],
+        'repo_name': response['name'],
+        'creation_date': format_date_to_int(response['created_at'],
+                                            GITHUB_TIME_FORMAT),
+        'owner': response['owner']['login'],
+        'url': response['url']
+    }
+
+
+def parse_commit(commit):
+    """
+    Parses commit of GitHub API response
+
+    :param commit: dict - commit in response
+    :return: dict
+    """
+    return {
+        'hash': commit['sha'],
+        'author': commit['commit']['author']['name'],
+        'message': commit['commit']['message'],
+        'date': format_date_to_int(commit['commit']['author']['date'],
+                                   GITHUB_TIME_FORMAT)
+    }
+
+
+def parse_contributor(contributor):
+    """
+    Parses contributor of GitHub API response
+
+    :param contributor: dict - contributor in response
+    :return: dict
+    """
+    return {
+        'name': contributor['login'],
+        'number_of_commits': contributor['contributions'],
+        'email': contributor['login'],
+        'url': contributor['url']
+    }
+
+
+def get_branches_from_pull_requests(pull_requests, owner):
+    """
+    Gets dict with key - branch name parsed from head label of pull request
+    and value - set of head commits of branch pull requests
+
+    :param pull_requests: list - of pull requests in response
+    :param owner: str - owner of repository
+    :return: dict
+    """
+    if pull_requests is None:
+        return None
+    commits_and_branches = {}
+    for item in pull_requests:
+        commits_and_branches.setdefault(item['head']['label']
+                                        .replace(owner + ':', ''),
+                                        set([])).add(item['head']['sha'])
+    return commits_and_branches
+
+
+def complete_commit_branch_map(existing_branches, pull_request_branches):
+    """
+    Completes index of existing branches with branches from pull requests,
+    commits of pull requests are moved to their branches
+
+    :param existing_branches: CommitBranchIndex - of existing branches or None
+    :param pull_request_branches: dict - branch name to set of commits hashes
+    :return: CommitBranchIndex or None
+    """
+    if existing_branches is None:
+        return None
+    pull_request_branches = pull_request_branches or {}
+    for hashes in pull_request_branches.values():
+        for item in hashes:
+            existing_branches.discard(item)
+    for key, hashes in pull_request_branches.items():
+        existing_branches.add_commits(key, hashes)
+    return existing_branches
+
+
 class GithubRequestSender(RequestSender):
     """
     Class that provides implementation of interface for sending API requests
@@ -40,24 +129,24 @@ class GithubRequestSender(RequestSender):
         self.repos_api_url = f'/repos/{self.owner}/{self.repo}'
         self.token = token
 
-    # returns a dict in which the key is sha of commit
-    # and the value is existing branch it belongs to
+    # returns index of commits sha to existing branches they belong to,
+    # commits of every branch are streamed into index page by page
     def _get_existing_commit_branch_map(self, list_of_branches):
-        result = {}
-        if list_of_branches.__len__() == 0:
+        if not list_of_branches:
             return None
-        if self.get_commits_by_branch(list_of_branches[0]) is None:
+        index = CommitBranchIndex()
+        try:
+            for branch in list_of_branches:
+                index.add_commits(branch, (commit['hash'] for commit
+                                           in self.iter_commits_by_branch(branch)))
+        except PaginationError:
             return None
-        for branch in list_of_branches:
-            for item in self.get_commits_by_branch(branch):
-                result.setdefault(branch, set([])).add(item['hash'])
-        return result
+        return index
 
     # returns plain list of all branches of a repository
     def _get_list_of_branches(self):
-        return [d[k] for d in
-                (self.get_branches() if self.get_branches() is not None else []) for k in
-                (d if d is not None else [])]
+        branches = self.get_branches()
+        return [branch['name'] for branch in branches] if branches is not None else []
 
     # returns dict of all commits with key as 'sha' and value as master
     def _get_dict_of_commits(self):
@@ -71,44 +160,68 @@ class GithubRequestSender(RequestSender):
 
     # gets all pull requests of repository
     def _get_pull_requests(self):
-        endpoint = '/pulls?state=all'
-        return self._request(endpoint)
+        endpoint = '/pulls'
+        return self._request_all(endpoint, {'state': 'all'})
 
     # gets all pull requests of a repository and
     # returns a dict from parsed branch and a matching commit
     def _get_branches_from_pull_request(self, pull_requests):
-        if pull_requests is None:
-            return None
-        commits_and_branches = {}
-        for item in pull_requests:
-            commits_and_branches.setdefault(item['head']['label']
-                                            .replace(self.owner + ':', ''),
-                                            set([])).add(item['head']['sha'])
-        return commits_and_branches
-
-    # returns concatenated dict of branches
+        return get_branches_from_pull_requests(pull_requests, self.owner)
+
+    # returns index of commits sha to branches
     # from both pull requests and existing branches with commits
     def _get_complete_commit_branch_map(self):
         existing_branches = self._get_existing_commit_branch_map(self._get_list_of_branches())
         pull_request_branches = self._get_branches_from_pull_request(self._get_pull_requests())
-        for key in pull_request_branches:
-            for item in pull_request_branches[key]:
-                for value in existing_branches.values():
-                    if item in value:
-                        value.remove(item)
-        for key in pull_request_branches:
-            for item in pull_request_branches[key]:
-                existing_branches.setdefault(key, set([])).add(item)
-        return existing_branches
+        return complete_commit_branch_map(existing_branches, pull_request_branches)
 
     def _request(self, endpoint=''):
         headers = 'Authorization'
         url = self.base_url + self.repos_api_url + endpoint
-        response = requests.get(url, headers={headers: self.token})
+        response = self._http_get(url, headers={headers: self.token})
         if response.status_code != STATUS_CODE_OK:
             return None
         return response.json()
 
+    # yields deserialized pages of list endpoint following Link header,
+    # raises PaginationError if any page fails
+    def _iter_pages(self, endpoint, params=None):
+        url = self.base_url + self.repos_api_url + endpoint
+        for response in iter_pages(self._http_get, url, dict(params or {}, per_page=PER_PAGE),
+                                   github_next_page, headers={'Authorization': self.token}):
+            yield response.json()
+
+    # returns items of all pages of list endpoint or None if any page fails
+    def _request_all(self, endpoint, params=None):
+        try:
+            return [item for page in self._iter_pages(endpoint, params) for item in page]
+        except PaginationError:
+            return None
+
+    # returns dict of branch name to sha of its head commit
+    def _get_branch_heads(self):
+        response = self._request_all('/branches')
+        if response is None:
+            return None
+        return {branch['name']: branch['commit']['sha'] for branch in response}
+
+    def iter_commits_by_branch(self, branch_name, since=None):
+        """
+        Streams parsed commits of a specific branch page by page,
+        the next page is requested while the current one is consumed
+
+        :param branch_name: string
+        :param since: string - ISO 8601 date, only commits after it are requested
+        :return: generator - of dicts, see get_commits_by_branch
+        :raise PaginationError
+        """
+        assert isinstance(branch_name, str), "Branch name must be str, received other"
+        params = {'sha': branch_name}
+        if since is not None:
+            params['since'] = since
+        for page in self._iter_pages('/commits', params):
+            yield from map(parse_commit, page)
+
     def get_repo(self):
         """
         Gets information about repository
@@ -127,14 +240,7 @@ class GithubRequestSender(RequestSender):
         """
 
         response = self._request()
-        repo = {
-            'id': response['id'],
-            'repo_name': response['name'],
-            'creation_date': format_date_to_int(response['created_at'],
-                                                GITHUB_TIME_FORMAT),
-            'owner': response['owner']['login'],
-            'url': response['url']
-        } if response is not None else None
+        repo = parse_repo(response) if response is not None else None
         return repo
 
     def get_branches(self):
@@ -153,7 +259,7 @@ class GithubRequestSender(RequestSender):
         ]
         """
         endpoint = '/branches'
-        response = self._request(endpoint)
+        response = self._request_all(endpoint)
         if response is None:
             return None
         return list(map(lambda x: {'name': x['name']}, response))
@@ -178,16 +284,15 @@ class GithubRequestSender(RequestSender):
         ]
         """
         endpoint = '/commits'
-        response = self._request(endpoint)
+        response = self._request_all(endpoint)
+        if response is None:
+            return None
         branches = self._get_complete_commit_branch_map()
-        return [{
-            'hash': commit['sha'],
-            'author': commit['commit']['author']['name'],
-            'message': commit['commit']['message'],
-            'date': format_date_to_int(commit['commit']['author']['date'],
-                                       GITHUB_TIME_FORMAT),
-            'branch': match_branch_to_commit(branches, commit['sha'])
-        } for commit in response] if response is not None else None
+        if branches is None:
+            return None
+        return [
+            dict(parse_commit(commit), branch=match_branch_to_commit(branches, commit['sha']))
+            for commit in response]
 
     def get_commits_by_branch(self, branch_name):
         """
@@ -209,16 +314,10 @@ class GithubRequestSender(RequestSender):
             ...
         ]
         """
-        assert isinstance(branch_name, str), "Branch name must be str, received other"
-        endpoint = f'/commits?sha={branch_name}'
-        response = self._request(endpoint)
-        return list(map(lambda x: {
-            'hash': x['sha'],
-            'author': x['commit']['author']['name'],
-            'message': x['commit']['message'],
-            'date': format_date_to_int(x['commit']['author']['date'],
-                                       GITHUB_TIME_FORMAT)
-        }, response)) if response is not None else None
+        try:
+            return list(self.iter_commits_by_branch(branch_name))
+        except PaginationError:
+            return None
 
     def get_commit_by_hash(self, hash_of_commit):
         """
@@ -240,15 +339,13 @@ class GithubRequestSender(RequestSender):
         assert isinstance(hash_of_commit, str), "Hash of commit must be str, received other"
         endpoint = f'/commits/{hash_of_commit}'
         response = self._request(endpoint)
+        if response is None:
+            return None
         branches = self._get_complete_commit_branch_map()
-        return {
-            'hash': response['sha'],
-            'author': response['commit']['author']['name'],
-            'message': response['commit']['message'],
-            'date': format_date_to_int(response['commit']['author']['date'],
-                                       GITHUB_TIME_FORMAT),
-            'branch': match_branch_to_commit(branches, response['sha'])
-        } if response is not None else None
+        if branches is None:
+            return None
+        return dict(parse_commit(response),
+                    branch=match_branch_to_commit(branches, response['sha']))
 
     def get_contributors(self):
         """
@@ -269,10 +366,63 @@ class GithubRequestSender(RequestSender):
         ]
         """
         endpoint = '/contributors'
-        response = self._request(endpoint)
-        return list(map(lambda x: {
-            'name': x['login'],
-            'number_of_commits': x['contributions'],
-            'email': x['login'],
-            'url': x['url']
-        }, response)) if response is not None else None
+        response = self._request_all(endpoint)
+        return list(map(parse_contributor, response)) if response is not None else None
+
+    def get_new_commits_by_branch(self, branch_name, newest_commit=None):
+        """
+        Gets commits of branch which are not reachable from its newest known commit,
+        including commits of merged branches dated before it. They are got by compare
+        request, all commits of branch are requested if comparison failed or was truncated
+
+        :param branch_name: string
+        :param newest_commit: dict - parsed newest known commit of branch or None to get all
+        :return: list - of dicts, see get_commits_by_branch, or None if request failed
+        """
+        if newest_commit is not None:
+            response = self._request(f'/compare/{newest_commit["hash"]}...{branch_name}')
+            if response is not None and response['total_commits'] <= len(response['commits']):
+                # compared commits are listed from the oldest one
+                return [parse_commit(item) for item in reversed(response['commits'])]
+        try:
+            return list(self.iter_commits_by_branch(branch_name))
+        except PaginationError:
+            return None
+
+    def get_all_commits(self):
+        """
+        Gets information about all commits of all branches in repository
+
+        :return: dict of list of commits and metadata
+        :Example:
+        {
+            "data": [
+                {
+                    "hash": "commit hash",
+                    "author": "commit author",
+                    "message": "commit message",
+                    "date": "date when committed converted to int",
+                    "branches": ["branch name", ...]
+                },
+                ...
+            ],
+            "metadata": {
+                "branch name": {newest commit of branch},
+                ...
+            }
+        }
+        """
+        return self.get_updated_all_commits(None)
+
+    def get_updated_all_commits(self, old_commits):
+        """
+        Updates commits got by get_all_commits, only branches which heads moved
+        are requested and only for commits not reachable from their known heads
+
+        :param old_commits: dict - commits and metadata to update, see get_all_commits
+        :return: dict - updated commits and metadata or None if request failed
+        """
+        branch_heads = self._get_branch_heads()
+        if branch_heads is None:
+            return None
+        return sync_all_commits(branch_heads, self.get_new_commits_by_branch, old_commits)
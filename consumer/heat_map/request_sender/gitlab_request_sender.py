@@ -3,13 +3,83 @@ Contains GitLabRequestSender class that provides realisation for sending API req
 to web-based hosting services for version control using Git
 """
 
-import requests
+from concurrent.futures import ThreadPoolExecutor
+
 from heat_map.request_sender.request_sender_base import \
     RequestSender  # pylint: disable=import-error
+from heat_map.utils.commit_branch_index import CommitBranchIndex
+from heat_map.utils.commit_sync import sync_all_commits
 from heat_map.utils.gitlab_helper import get_time_utc
+from heat_map.utils.pagination import PER_PAGE, PaginationError, iter_pages, gitlab_next_page
 from heat_map.utils.request_status_codes import STATUS_CODE_OK
 
 TOKEN = ""
+# "walk" derives branches of commits from commits of every branch,
+# "refs" requests refs of every commit concurrently
+BRANCH_ATTRIBUTION = "walk"
+# max number of concurrent refs requests in "refs" mode
+MAX_IN_FLIGHT = 8
+
+
+def parse_repo(repo_info):
+    """
+    Parses repository of GitLab API response
+
+    :param repo_info: dict - repository in response
+    :return: dict
+    """
+    return {
+        "id": repo_info["id"],
+        "repo_name": repo_info["name"],
+        "creation_date": get_time_utc(repo_info["created_at"]),
+        "owner": repo_info["path_with_namespace"].split("/")[0],
+        "url": repo_info["web_url"]
+    }
+
+
+def parse_commit(commit):
+    """
+    Parses commit of GitLab API commits list response
+
+    :param commit: dict - commit in response
+    :return: dict
+    """
+    return {
+        "hash": commit["id"],
+        "author": commit["committer_name"],
+        "message": commit["message"],
+        "date": get_time_utc(commit["created_at"])
+    }
+
+
+def parse_commit_by_hash(commit_info):
+    """
+    Parses single commit of GitLab API response
+
+    :param commit_info: dict - commit in response
+    :return: dict
+    """
+    return {
+        "hash": commit_info["id"],
+        "author": commit_info["author_name"],
+        "message": commit_info["message"],
+        "date": get_time_utc(commit_info["committed_date"])
+    }
+
+
+def parse_contributor(contributor):
+    """
+    Parses contributor of GitLab API response
+
+    :param contributor: dict - contributor in response
+    :return: dict
+    """
+    return {
+        "name": contributor["name"],
+        "number_of_commits": contributor["commits"],
+        "email": contributor["email"],
+        "url": "None"  # to be continued...
+    }
 
 
 class GitLabRequestSender(RequestSender):
@@ -18,9 +88,56 @@ class GitLabRequestSender(RequestSender):
         to web-based hosting services for version control using Git
     """
 
-    def __init__(self, owner, repo, base_url="https://gitlab.com/api/v4/projects/"):
+    def __init__(self, owner, repo, base_url="https://gitlab.com/api/v4/projects/",
+                 branch_attribution=BRANCH_ATTRIBUTION):
+        assert branch_attribution in ("walk", "refs"), \
+            'Inputted "branch_attribution" is not "walk" or "refs"'
         super().__init__(base_url=base_url, owner=owner, repo=repo)
         self.token = TOKEN
+        self.branch_attribution = branch_attribution
+        # branch of commit with key - hash of commit, filled by refs requests
+        self._branch_for_commit = {}
+
+    def _iter_pages(self, url, params=None):
+        """
+        Yields deserialized pages of list url following X-Next-Page header
+
+        :param url: string
+        :param params: dict - of request parameters
+        :return: generator - of lists
+        :raise PaginationError
+        """
+        for response in iter_pages(self._http_get, url, dict(params or {}, per_page=PER_PAGE),
+                                   gitlab_next_page):
+            yield response.json()
+
+    def _get_all(self, url):
+        """
+        Gets items of all pages of list url
+
+        :param url: string
+        :return: list or None if any page failed
+        """
+        try:
+            return [item for page in self._iter_pages(url) for item in page]
+        except PaginationError:
+            return None
+
+    def iter_commits_by_branch(self, branch_name, since=None):
+        """
+        Streams parsed commits of branch page by page,
+        the next page is requested while the current one is consumed
+
+        :param branch_name: string
+        :param since: string - ISO 8601 date, only commits after it are requested
+        :return: generator - of dicts, see get_commits_by_branch
+        :raise PaginationError
+        """
+        url_commits_by_branch = (self.base_url + self.owner + "%2F" + self.repo +
+                                 "/repository/commits?ref_name=" + branch_name)
+        params = {"since": since} if since is not None else None
+        for page in self._iter_pages(url_commits_by_branch, params):
+            yield from map(parse_commit, page)
 
     def get_repo(self):
         # get url of remote repository given as input
@@ -41,7 +158,7 @@ class GitLabRequestSender(RequestSender):
         url_repo = self.base_url + self.owner + "%2F" + self.repo + self.token
 
         # get response and check it's validation
-        response = requests.get(url_repo)
+        response = self._http_get(url_repo)
         if not response.status_code == STATUS_CODE_OK:
             return None
 
@@ -49,13 +166,7 @@ class GitLabRequestSender(RequestSender):
         repo_info = response.json()
 
         # retrieve only info about repository
-        repo = {
-            "id": repo_info["id"],
-            "repo_name": repo_info["name"],
-            "creation_date": get_time_utc(repo_info["created_at"]),
-            "owner": repo_info["path_with_namespace"].split("/")[0],
-            "url": repo_info["web_url"]
-        }
+        repo = parse_repo(repo_info)
         return repo
 
     def get_branches(self):
@@ -75,20 +186,32 @@ class GitLabRequestSender(RequestSender):
         # get url of remote repository given as input
         url_branches = (self.base_url + self.owner + "%2F" + self.repo + "/repository/branches" +
                         self.token)
-        # get response and check it's validation
-        response = requests.get(url_branches)
+        # get json of branches of all pages
+        branches_info = self._get_all(url_branches)
 
-        if not response.status_code == STATUS_CODE_OK:
+        if branches_info is None:
             return None
 
-        # get json of branches
-        branches_info = response.json()
-
         # retrieve only info about name of the branches
         branches = [{"name": branch["name"]} for branch in branches_info]
 
         return branches
 
+    def _get_branch_heads(self):
+        """
+        Gets hash of head commit of every branch
+
+        :return: dict - branch name to hash of its head commit or None if request failed
+        """
+        url_branches = (self.base_url + self.owner + "%2F" + self.repo + "/repository/branches" +
+                        self.token)
+        branches_info = self._get_all(url_branches)
+
+        if branches_info is None:
+            return None
+
+        return {branch["name"]: branch["commit"]["id"] for branch in branches_info}
+
     def _get_branch_for_commit(self, commit_hash):
         """
         function that gets branch for particular commit
@@ -98,10 +221,60 @@ class GitLabRequestSender(RequestSender):
         api_gitlab = (self.base_url + self.owner + "%2F" + self.repo + "/repository/commits/" +
                       commit_hash + "/refs")
 
-        branch_info = requests.get(api_gitlab).json()
+        branch_info = self._http_get(api_gitlab).json()
 
         return branch_info[0]['name']
 
+    def _get_cached_branch_for_commit(self, commit_hash):
+        """
+        Gets branch for particular commit, refs of every commit are requested once
+        :param commit_hash: string
+        :return: string
+        """
+        if commit_hash not in self._branch_for_commit:
+            self._branch_for_commit[commit_hash] = self._get_branch_for_commit(commit_hash)
+        return self._branch_for_commit[commit_hash]
+
+    def _get_commit_branch_index(self):
+        """
+        Walks commits of every branch and indexes branches of every commit
+        :return: CommitBranchIndex or None if branches or commits can't be got
+        """
+        branches = self.get_branches()
+        if branches is None:
+            return None
+        index = CommitBranchIndex()
+        try:
+            for branch in branches:
+                index.add_commits(branch["name"], (commit["hash"] for commit in
+                                                   self.iter_commits_by_branch(branch["name"])))
+        except PaginationError:
+            return None
+        return index
+
+    def _get_branches_for_commits(self, hashes):
+        """
+        Gets branch for every commit, in "walk" mode commits which are not found
+        in any branch are looked up by refs requests
+        :param hashes: list - of commits hashes
+        :return: list - of branches names in order of hashes
+        """
+        branches = [None] * len(hashes)
+        if self.branch_attribution == "walk":
+            index = self._get_commit_branch_index()
+            if index is not None:
+                branches = [(index.branches_of(commit_hash) or [None])[0]
+                            for commit_hash in hashes]
+
+        missing = [i for i, branch in enumerate(branches) if branch is None]
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(MAX_IN_FLIGHT, len(missing))) as executor:
+                found = executor.map(self._get_cached_branch_for_commit,
+                                     [hashes[i] for i in missing])
+                for i, branch in zip(missing, found):
+                    branches[i] = branch
+        return branches
+
     def get_commits(self):
         """
         Takes repository name and owner as parameters and
@@ -123,22 +296,15 @@ class GitLabRequestSender(RequestSender):
         # get url of remote repository given as input
         url_commits = (self.base_url + self.owner + "%2F" + self.repo + "/repository/commits" +
                        self.token)
-        print(url_commits)
-        response = requests.get(url_commits)
+        # get JSON about commits of all pages
+        commits_info = self._get_all(url_commits)
 
-        if not response.status_code == STATUS_CODE_OK:
+        if commits_info is None:
             return None
-
-        # get JSON about commits
-        commits_info = requests.get(url_commits).json()
         # retrieve only info about commits
-        commits = [{
-            "hash": commit["id"],
-            "author": commit["committer_name"],
-            "message": commit["message"],
-            "date": get_time_utc(commit["created_at"]),
-            "branch": self._get_branch_for_commit(commit["id"])
-        } for commit in commits_info]
+        branches = self._get_branches_for_commits([commit["id"] for commit in commits_info])
+        commits = [dict(parse_commit(commit), branch=branch)
+                   for commit, branch in zip(commits_info, branches)]
 
         return commits
 
@@ -163,22 +329,14 @@ class GitLabRequestSender(RequestSender):
         url_contributors = (self.base_url + self.owner + "%2F" + self.repo +
                             "/repository/contributors" + self.token)
 
-        # get response and check it's validation
-        response = requests.get(url_contributors)
+        # get json of contributors of all pages
+        contributors_info = self._get_all(url_contributors)
 
-        if not response.status_code == STATUS_CODE_OK:
+        if contributors_info is None:
             return None
 
-        # get json of contributors
-        contributors_info = response.json()
-
         # retrieve only info about contributors
-        contributors = [{
-            "name": contributors_info[i]["name"],
-            "number_of_commits": contributors_info[i]["commits"],
-            "email": contributors_info[i]["email"],
-            "url": "None"  # to be continued...
-        } for i in range(len(contributors_info))]
+        contributors = [parse_contributor(contributor) for contributor in contributors_info]
 
         return contributors
 
@@ -201,21 +359,16 @@ class GitLabRequestSender(RequestSender):
         url_commit = (self.base_url + self.owner + "%2F" + self.repo +
                       "/repository/commits/" + hash_of_commit)
 
-        response = requests.get(url_commit)
+        response = self._http_get(url_commit)
 
         if not response.status_code == STATUS_CODE_OK:
             return None
 
         # get JSON about one commit
-        commit_info = requests.get(url_commit).json()
-
-        commit = {
-            "hash": commit_info["id"],
-            "author": commit_info["author_name"],
-            "message": commit_info["message"],
-            "date": get_time_utc(commit_info["committed_date"]),
-            "branch": self._get_branch_for_commit(hash_of_commit)
-        }
+        commit_info = response.json()
+
+        commit = dict(parse_commit_by_hash(commit_info),
+                      branch=self._get_cached_branch_for_commit(hash_of_commit))
         # retrieve only info about one commit
 
         return commit
@@ -223,7 +376,7 @@ class GitLabRequestSender(RequestSender):
     def get_commits_by_branch(self, branch_name):
         """
         Takes repository branches as parameters and
-        returns information about last 20 commits per branch
+        returns information about all commits of branch
         in dictionary
 
         :return: list of dictionaries.
@@ -239,27 +392,79 @@ class GitLabRequestSender(RequestSender):
             ...]
         """
 
-        api_commits_by_branch = (self.base_url + self.owner + "%2F" + self.repo +
-                                 "/repository/commits?ref_name=" + branch_name)
-
-        # get response and check it's validation
-        response = requests.get(api_commits_by_branch)
+        # make a list of dicts concerning commits per branch of all pages
+        try:
+            commits = list(self.iter_commits_by_branch(branch_name))
+        except PaginationError:
+            return None
 
-        if not response.status_code == STATUS_CODE_OK:
+        if not commits:
             return None
 
-        # get json of commits
-        commits_json = response.json()
+        return commits
 
-        if not commits_json:
+    def get_new_commits_by_branch(self, branch_name, newest_commit=None):
+        """
+        Takes branch name and its newest known commit and returns commits of branch
+        which are not reachable from it, including commits of merged branches dated before it.
+        They are got by compare request, all commits of branch are requested
+        if comparison failed or timed out
+
+        :param branch_name: string
+        :param newest_commit: dict - parsed newest known commit of branch or None to get all
+        :return: list of dictionaries, see get_commits_by_branch, or None if request failed
+        """
+        if newest_commit is not None:
+            url_compare = (self.base_url + self.owner + "%2F" + self.repo +
+                           "/repository/compare")
+            response = self._http_get(url_compare,
+                                      params={"from": newest_commit["hash"], "to": branch_name})
+            if response.status_code == STATUS_CODE_OK:
+                compared = response.json()
+                if not compared.get("compare_timeout"):
+                    # compared commits are listed from the oldest one
+                    return [parse_commit(item) for item in reversed(compared["commits"])]
+        try:
+            return list(self.iter_commits_by_branch(branch_name))
+        except PaginationError:
             return None
 
-        # make a list of dicts concerning commits per branch
-        commits = [{
-            "hash": commit["id"],
-            "author": commit["committer_name"],
-            "message": commit["message"],
-            "date": get_time_utc(commit["created_at"])
-        } for commit in commits_json]
+    def get_all_commits(self):
+        """
+        Takes repository name and owner as parameters and returns
+        commits of all branches with branches they belong to
+
+        :return: dictionary.
+        Example:
+        {
+            "data": [
+                {
+                    "hash": "commit hash",
+                    "author": "commit author",
+                    "message": "commit message",
+                    "date": "date when committed",
+                    "branches": ["branch name", ...]
+                },
+                ...
+            ],
+            "metadata": {
+                "branch name": {newest commit of branch},
+                ...
+            }
+        }
+        """
+        return self.get_updated_all_commits(None)
 
-        return commits
+    def get_updated_all_commits(self, old_commits):
+        """
+        Takes commits got by get_all_commits and returns them updated,
+        only branches which heads moved are requested and only for commits
+        not reachable from their known heads
+
+        :param old_commits: dictionary - commits and metadata to update, see get_all_commits
+        :return: dictionary - updated commits and metadata or None if request failed
+        """
+        branch_heads = self._get_branch_heads()
+        if branch_heads is None:
+            return None
+        return sync_all_commits(branch_heads, self.get_new_commits_by_branch, old_commits)
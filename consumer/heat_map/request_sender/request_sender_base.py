@@ -3,6 +3,9 @@ Contains RequestSender class that provides interface for sending API requests
 to web-based hosting services for version control using Git
 """
 
+from heat_map.utils.http_transport import SHARED_TRANSPORT
+from heat_map.utils.request_scheduler import INTERACTIVE
+
 
 class RequestSender:
     """
@@ -10,13 +13,39 @@ class RequestSender:
     to web-based hosting services for version control using Git
     """
 
-    def __init__(self, base_url, owner, repo):
+    def __init__(self, base_url, owner, repo, transport=None):
         assert isinstance(base_url, str), 'Inputted "base_url" type is not str'
         assert isinstance(owner, str), 'Inputted "owner" type is not str'
         assert isinstance(repo, str), 'Inputted "repo" type is not str'
         self.base_url = base_url
         self.owner = owner
         self.repo = repo
+        # pooled keep-alive transport, shared by all senders unless given
+        self.transport = transport or SHARED_TRANSPORT
+        # priority of requests of the sender in scheduler of transport
+        self.priority = INTERACTIVE
+
+    def _http_get(self, url, params=None, **kwargs):
+        """
+        Sends GET request to URL through pooled transport of the sender
+
+        :param url: string - full url
+        :param params: dict - of request parameters
+        :param kwargs: - other optional parameters
+        :return: requests.Response
+        """
+        return self.transport.get(url, params=params, priority=self.priority, **kwargs)
+
+    def _http_post(self, url, json=None, **kwargs):
+        """
+        Sends POST request to URL through pooled transport of the sender
+
+        :param url: string - full url
+        :param json: - body of request serialized to JSON
+        :param kwargs: - other optional parameters
+        :return: requests.Response
+        """
+        return self.transport.post(url, json=json, priority=self.priority, **kwargs)
 
     def get_repo(self):
         """
@@ -0,0 +1,215 @@
+"""
+Contains functions for testing that async request senders
+produce the same output as sync request senders
+"""
+import asyncio
+import copy
+import json
+import threading
+from unittest import mock
+from urllib.parse import urlencode
+
+import pytest
+
+from heat_map.request_sender.async_request_sender_base import AsyncResponse, \
+    EventLoopThread, run_until_complete
+from heat_map.request_sender.async_bitbucket_request_sender import AsyncBitbucketRequestSender
+from heat_map.request_sender.async_github_request_sender import AsyncGithubRequestSender
+from heat_map.request_sender.async_gitlab_request_sender import AsyncGitLabRequestSender
+from heat_map.request_sender import bitbucket_request_sender, github_request_sender, \
+    gitlab_request_sender
+from heat_map.request_sender.bitbucket_request_sender import BitbucketRequestSender
+from heat_map.request_sender.github_request_sender import GithubRequestSender
+from heat_map.request_sender.gitlab_request_sender import GitLabRequestSender
+from heat_map.utils.request_status_codes import STATUS_CODE_OK, STATUS_CODE_NOT_FOUND
+from heat_map.tests import github_mock_data, bitbucket_mock_data
+
+GITHUB_URL = 'https://api.github.com/repos/BoartK/test1'
+GITHUB_ROUTES = {
+    GITHUB_URL: github_mock_data.REPO_DATA,
+    GITHUB_URL + '/contributors': github_mock_data.CONT_DATA,
+    GITHUB_URL + '/branches': github_mock_data.BRANCHES_DATA,
+    GITHUB_URL + '/commits?sha=master': github_mock_data.CMTS_BY_BR_DATA,
+    GITHUB_URL + '/commits?sha=new_branch': github_mock_data.CMTS_BY_BR_DATA[:2],
+    GITHUB_URL + '/commits': github_mock_data.CMTS_DATA,
+    GITHUB_URL + '/pulls?state=all': [],
+    GITHUB_URL + '/commits/fb21f75ab1dc63aec48a738091abda9f97a73e07':
+        github_mock_data.CMT_BY_HASH_DATA,
+    GITHUB_URL + '/compare/' + github_mock_data.CMTS_BY_BR_DATA[2]['sha'] + '...master': {
+        'total_commits': 2, 'commits': github_mock_data.CMTS_BY_BR_DATA[1::-1]}
+}
+# commits stored before the last two commits of master
+GITHUB_OLD_COMMITS = {
+    'data': [dict(github_request_sender.parse_commit(commit), branches=['master'])
+             for commit in github_mock_data.CMTS_BY_BR_DATA[2:]],
+    'metadata': {'master': github_request_sender.parse_commit(github_mock_data.CMTS_BY_BR_DATA[2])}
+}
+
+BITBUCKET_URL = 'https://api.bitbucket.org/2.0/repositories/partsey/publicbitbucketrepo'
+BITBUCKET_ROUTES = {
+    BITBUCKET_URL: bitbucket_mock_data.REPO_DATA,
+    BITBUCKET_URL + '/commits': bitbucket_mock_data.COMMITS_DATA,
+    BITBUCKET_URL + '/refs/branches': bitbucket_mock_data.BRANCHES_DATA,
+    BITBUCKET_URL + '/commits/awesome-feature': bitbucket_mock_data.COMMIT_BY_AWESOME_BRANCH,
+    BITBUCKET_URL + '/commits/beautiful-feature': bitbucket_mock_data.COMMIT_BY_BEAUTIFUL_BRANCH,
+    BITBUCKET_URL + '/commits/master': bitbucket_mock_data.COMMIT_BY_MASTER,
+    BITBUCKET_URL + '/commit/35a363addc596e1f3a0580d3dec1b78689be991d':
+        bitbucket_mock_data.COMMIT_BY_HASH_35a363
+}
+# commits stored before the last commit of master and awesome-feature
+# and before beautiful-feature was created
+BITBUCKET_OLD_COMMITS = {
+    'data': [dict(bitbucket_request_sender.parse_commit(commit),
+                  branches=['awesome-feature', 'master'])
+             for commit in bitbucket_mock_data.COMMIT_BY_MASTER['values'][1:]],
+    'metadata': {
+        branch_name: bitbucket_request_sender.parse_commit(
+            bitbucket_mock_data.COMMIT_BY_MASTER['values'][1])
+        for branch_name in ('awesome-feature', 'master')}
+}
+
+GITLAB_URL = 'https://gitlab.com/api/v4/projects/partsey%2Fproject'
+GITLAB_COMMITS = [
+    {'id': 'a1', 'committer_name': 'partsey', 'author_name': 'partsey', 'message': 'second',
+     'created_at': '2018-07-23T07:05:05.000+00:00',
+     'committed_date': '2018-07-23T07:05:05.000+00:00'},
+    {'id': 'b2', 'committer_name': 'fake_user', 'author_name': 'fake_user', 'message': 'first',
+     'created_at': '2018-07-03T06:32:41.364Z', 'committed_date': '2018-07-03T06:32:41.364Z'}
+]
+GITLAB_ROUTES = {
+    GITLAB_URL: {'id': 7335647, 'name': 'project', 'created_at': '2018-07-03T06:32:41.364Z',
+                 'path_with_namespace': 'partsey/project',
+                 'web_url': 'https://gitlab.com/partsey/project'},
+    GITLAB_URL + '/repository/branches': [{'name': 'master', 'commit': {'id': 'a1'}},
+                                          {'name': 'feature', 'commit': {'id': 'a1'}}],
+    GITLAB_URL + '/repository/commits': GITLAB_COMMITS,
+    GITLAB_URL + '/repository/commits?ref_name=master': GITLAB_COMMITS,
+    GITLAB_URL + '/repository/commits?ref_name=feature': GITLAB_COMMITS[:1],
+    GITLAB_URL + '/repository/commits/a1': GITLAB_COMMITS[0],
+    GITLAB_URL + '/repository/commits/a1/refs': [{'name': 'feature'}, {'name': 'master'}],
+    GITLAB_URL + '/repository/commits/b2/refs': [{'name': 'master'}],
+    GITLAB_URL + '/repository/contributors': [
+        {'name': 'partsey', 'commits': 1, 'email': 'partsey@example.com'}],
+    GITLAB_URL + '/repository/compare?from=b2&to=master': {
+        'compare_timeout': False, 'commits': GITLAB_COMMITS[:1]}
+}
+# commits stored before the last commit of master and before feature was created
+GITLAB_OLD_COMMITS = {
+    'data': [dict(gitlab_request_sender.parse_commit(GITLAB_COMMITS[1]), branches=['master'])],
+    'metadata': {'master': gitlab_request_sender.parse_commit(GITLAB_COMMITS[1])}
+}
+
+
+def route(routes, url, params=None):
+    query = {name: value for name, value in (params or {}).items()
+             if name not in ('per_page', 'page')}
+    # routes of GitHub and GitLab are matched by query, of Bitbucket - by url only
+    payload = routes.get(url + ('?' + urlencode(query) if query else ''), routes.get(url))
+    status_code = STATUS_CODE_OK if payload is not None else STATUS_CODE_NOT_FOUND
+    return status_code, json.dumps(payload).encode('utf-8')
+
+
+def run_sync(sender, routes, method, *args):
+    def http_get(url, params=None, **kwargs):  # pylint: disable=unused-argument
+        status_code, content = route(routes, url, params)
+        response = mock.Mock(status_code=status_code, headers={})
+        response.json.return_value = json.loads(content.decode('utf-8'))
+        return response
+
+    with mock.patch.object(sender, '_http_get', side_effect=http_get):
+        return getattr(sender, method)(*args)
+
+
+def run_async(sender, routes, method, *args):
+    async def http_get(url, params=None, headers=None):  # pylint: disable=unused-argument
+        status_code, content = route(routes, url, params)
+        return AsyncResponse(status_code, {}, content)
+
+    with mock.patch.object(sender, '_http_get', side_effect=http_get):
+        return run_until_complete(sender, getattr(sender, method)(*args))
+
+
+@pytest.mark.parametrize('method, args', [
+    ('get_repo', ()),
+    ('get_branches', ()),
+    ('get_commits', ()),
+    ('get_commits_by_branch', ('master',)),
+    ('get_commit_by_hash', ('fb21f75ab1dc63aec48a738091abda9f97a73e07',)),
+    ('get_contributors', ()),
+    ('get_all_commits', ()),
+    ('get_updated_all_commits', (GITHUB_OLD_COMMITS,))
+])
+def test_async_github_matches_sync(method, args):
+    expected = run_sync(GithubRequestSender('BoartK', 'test1'), GITHUB_ROUTES, method,
+                        *copy.deepcopy(args))
+    result = run_async(AsyncGithubRequestSender('BoartK', 'test1'), GITHUB_ROUTES, method,
+                       *copy.deepcopy(args))
+
+    assert expected is not None
+    assert json.dumps(result) == json.dumps(expected)
+
+
+@pytest.mark.parametrize('method, args', [
+    ('get_repo', ()),
+    ('get_branches', ()),
+    ('get_commits', ()),
+    ('get_commits_by_branch', ('feature',)),
+    ('get_commit_by_hash', ('a1',)),
+    ('get_contributors', ()),
+    ('get_all_commits', ()),
+    ('get_updated_all_commits', (GITLAB_OLD_COMMITS,))
+])
+def test_async_gitlab_matches_sync(method, args):
+    expected = run_sync(GitLabRequestSender('partsey', 'project'), GITLAB_ROUTES, method,
+                        *copy.deepcopy(args))
+    result = run_async(AsyncGitLabRequestSender('partsey', 'project'), GITLAB_ROUTES,
+                       method, *copy.deepcopy(args))
+
+    assert expected is not None
+    assert json.dumps(result) == json.dumps(expected)
+
+
+@pytest.mark.parametrize('method, args', [
+    ('get_repo', ()),
+    ('get_branches', ()),
+    ('get_commits', ()),
+    ('get_commits_by_branch', ('master',)),
+    ('get_commit_by_hash', ('35a363addc596e1f3a0580d3dec1b78689be991d',)),
+    ('get_contributors', ()),
+    ('get_all_commits', ()),
+    ('get_updated_all_commits', (BITBUCKET_OLD_COMMITS,))
+])
+def test_async_bitbucket_matches_sync(method, args):
+    # sync sender modifies metadata of given old commits
+    expected = run_sync(BitbucketRequestSender('partsey', 'publicbitbucketrepo'),
+                        BITBUCKET_ROUTES, method, *copy.deepcopy(args))
+    result = run_async(AsyncBitbucketRequestSender('partsey', 'publicbitbucketrepo'),
+                       BITBUCKET_ROUTES, method, *copy.deepcopy(args))
+
+    assert expected is not None
+    assert json.dumps(result) == json.dumps(expected)
+
+
+def test_async_sender_returns_none_on_not_found():
+    sender = AsyncGithubRequestSender('BoartK', 'missing')
+    assert run_async(sender, GITHUB_ROUTES, 'get_repo') is None
+
+
+def test_senders_run_on_one_loop_thread_with_shared_session():
+    loop_thread = EventLoopThread()
+    session = loop_thread.session
+    loops = []
+
+    async def get_loop():
+        loops.append((threading.current_thread(), asyncio.get_event_loop()))
+
+    try:
+        for _ in range(2):
+            sender = AsyncGithubRequestSender('BoartK', 'test1', session=session)
+            run_until_complete(sender, get_loop(), loop_thread)
+        assert loops[0] == loops[1]
+        assert loops[0][0] is not threading.current_thread()
+        assert not session.closed
+    finally:
+        loop_thread.close()
+    assert session.closed
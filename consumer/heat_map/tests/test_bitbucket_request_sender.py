@@ -205,3 +205,34 @@ def test_get_contributors_success(mocker):
 @mock.patch('heat_map_training.request_sender.bitbucket_request_sender.requests.get', side_effect=mocked_requests_get)
 def test_get_contributors_fail(mocker):
     assert create_non_existing_repo_data().get_contributors() is None, "Bad data request"
+
+
+def mocked_page_of_commits_by_branch(branch_name, page):
+    pages_by_branch = {
+        'awesome-feature': COMMIT_BY_AWESOME_BRANCH,
+        'beautiful-feature': COMMIT_BY_BEAUTIFUL_BRANCH,
+        'master': COMMIT_BY_MASTER
+    }
+    values = pages_by_branch[branch_name]['values']
+    # splits every branch into pages of two commits
+    result = {'values': values[(page - 1) * 2:page * 2]}
+    if page * 2 < len(values):
+        result['next'] = f'page={page + 1}'
+    return result
+
+
+@pytest.mark.parametrize('max_in_flight', [2, 4])
+def test_get_all_commits_concurrent_matches_sequential(max_in_flight):
+    def get_all_commits(sender):
+        with mock.patch.object(sender, 'get_branches', return_value=BRANCHES_DATA['values']), \
+             mock.patch.object(sender, '_get_page_of_commits_by_branch',
+                               side_effect=mocked_page_of_commits_by_branch):
+            return sender.get_all_commits()
+
+    sequential = get_all_commits(BitbucketRequestSender(USER, REPO, max_in_flight=1))
+    concurrent = get_all_commits(BitbucketRequestSender(USER, REPO, max_in_flight=max_in_flight))
+
+    assert sequential is not None
+    assert len(sequential['data']) == 6
+    assert sorted(sequential['metadata']) == ['awesome-feature', 'beautiful-feature', 'master']
+    assert concurrent == sequential, "Concurrent fetching does not match sequential fetching"
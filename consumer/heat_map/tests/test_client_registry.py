@@ -0,0 +1,78 @@
+"""
+Contains functions for testing MongoClientRegistry which shares
+MongoDB clients within process
+"""
+import os
+from unittest import mock
+
+import pytest
+from pymongo.errors import ConnectionFailure
+
+from general_helper.mongodb.client_registry import MongoClientRegistry
+
+
+def test_client_is_created_once_per_server_and_options():
+    registry = MongoClientRegistry()
+    base_client, setup = mock.MagicMock(), mock.MagicMock()
+
+    client = registry.get_client('host', 1, base_client, setup=setup, maxPoolSize=5)
+
+    assert registry.get_client('host', 1, base_client, setup=setup, maxPoolSize=5) is client
+    base_client.assert_called_once_with('host', 1, maxPoolSize=5)
+    setup.assert_called_once_with(client)
+    registry.get_client('host', 1, base_client, setup=setup, maxPoolSize=10)
+    assert base_client.call_count == 2
+
+
+def test_health_is_checked_once_in_interval():
+    registry = MongoClientRegistry(health_check_interval=0)
+    client = registry.get_client('host', 1, mock.MagicMock())
+    client.admin.command.assert_called_once_with('ismaster')
+
+    registry = MongoClientRegistry(health_check_interval=60)
+    base_client = mock.MagicMock()
+    for _ in range(3):
+        client = registry.get_client('host', 1, base_client)
+    # connection stays lazy until the first interval passes
+    client.admin.command.assert_not_called()
+
+
+def test_clients_of_parent_process_are_dropped_after_fork():
+    registry = MongoClientRegistry()
+    base_client = mock.MagicMock(side_effect=lambda *args, **kwargs: mock.MagicMock())
+    client = registry.get_client('host', 1, base_client)
+
+    with mock.patch('os.getpid', return_value=os.getpid() + 1):
+        assert registry.get_client('host', 1, base_client) is not client
+        registry.close_all()
+    client.close.assert_not_called()
+
+    registry = MongoClientRegistry()
+    client = registry.get_client('host', 1, base_client)
+    registry.close_all()
+    client.close.assert_called_once_with()
+
+
+def test_client_failed_health_check_is_evicted():
+    registry = MongoClientRegistry(health_check_interval=0)
+    base_client = mock.MagicMock(side_effect=lambda *args, **kwargs: mock.MagicMock())
+    client = registry.get_client('host', 1, base_client)
+    client.admin.command.side_effect = ConnectionFailure
+
+    with pytest.raises(ConnectionFailure):
+        registry.get_client('host', 1, base_client)
+    client.close.assert_called_once_with()
+    assert registry.get_client('host', 1, base_client) is not client
+
+
+def test_failed_setup_is_retried_by_next_caller():
+    registry = MongoClientRegistry()
+    base_client = mock.MagicMock()
+    setup = mock.MagicMock(side_effect=[ConnectionFailure, None])
+
+    with pytest.raises(ConnectionFailure):
+        registry.get_client('host', 1, base_client, setup=setup)
+    registry.get_client('host', 1, base_client, setup=setup)
+    registry.get_client('host', 1, base_client, setup=setup)
+    assert setup.call_count == 2
+    base_client.assert_called_once_with('host', 1)
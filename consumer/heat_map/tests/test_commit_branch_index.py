@@ -0,0 +1,48 @@
+"""
+Contains functions for testing CommitBranchIndex and branch attribution built on it
+"""
+from heat_map.request_sender.bitbucket_request_sender import merge_branches_commits
+from heat_map.request_sender.github_request_sender import match_branch_to_commit, \
+    complete_commit_branch_map
+from heat_map.utils.commit_branch_index import CommitBranchIndex
+
+
+def test_branches_of_commit_in_order_of_adding():
+    index = CommitBranchIndex.from_branches({'master': ['a', 'b'], 'dev': ['b', 'c'],
+                                             'feature': ['b']})
+
+    assert index.branches_of('b') == ['master', 'dev', 'feature']
+    assert index.branches_of('c') == ['dev']
+    assert index.branches_of('unknown') == []
+    assert len(index) == 3 and 'a' in index
+
+
+def test_index_handles_many_branches():
+    index = CommitBranchIndex()
+    for number in range(2000):
+        index.add_commits(f'branch{number}', ['root'])
+    index.add('tip', 'branch1999')
+
+    assert len(index.branches_of('root')) == 2000
+    assert index.branches_of('tip') == ['branch1999']
+
+
+def test_complete_commit_branch_map_moves_pull_request_heads():
+    index = CommitBranchIndex.from_branches({'master': {'a', 'b'}, 'dev': {'b'}})
+
+    index = complete_commit_branch_map(index, {'pr_branch': {'b'}})
+
+    assert match_branch_to_commit(index, 'a') == ['master']
+    assert match_branch_to_commit(index, 'b') == ['pr_branch']
+    assert match_branch_to_commit(index, 'c') == 'unknown'
+    assert complete_commit_branch_map(None, {}) is None
+
+
+def test_merge_branches_commits_keeps_old_branches():
+    old_commits = [{'hash': 'a', 'branches': ['master']}]
+    new_commits = [[{'hash': 'b'}, {'hash': 'a'}], [{'hash': 'b'}]]
+
+    repo_commits = merge_branches_commits(['dev', 'master'], new_commits, old_commits)
+
+    assert repo_commits['a']['branches'] == ['master', 'dev']
+    assert repo_commits['b']['branches'] == ['master', 'dev']
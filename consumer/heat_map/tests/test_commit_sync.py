@@ -0,0 +1,136 @@
+"""
+Contains functions for testing incremental update of all commits of repository
+"""
+from unittest import mock
+
+from heat_map.request_sender.github_request_sender import GithubRequestSender
+from heat_map.request_sender.gitlab_request_sender import GitLabRequestSender
+from heat_map.utils.commit_sync import sync_all_commits, to_iso_date
+from heat_map.utils.request_status_codes import STATUS_CODE_OK
+
+
+def commit(hash_of_commit, date):
+    return {'hash': hash_of_commit, 'author': 'author', 'message': 'message', 'date': date}
+
+
+def github_commit(hash_of_commit, date):
+    return {'sha': hash_of_commit,
+            'commit': {'author': {'name': 'author', 'date': to_iso_date(date)},
+                       'message': 'message'}}
+
+
+def test_full_sync_requests_every_branch():
+    histories = {'master': [commit('b', 2), commit('a', 1)], 'dev': [commit('c', 3), commit('a', 1)]}
+    requested = []
+
+    def get_new_commits(branch_name, newest_commit):
+        requested.append((branch_name, newest_commit))
+        return histories[branch_name]
+
+    result = sync_all_commits({'master': 'b', 'dev': 'c'}, get_new_commits)
+
+    assert requested == [('master', None), ('dev', None)]
+    assert [(item['hash'], item['branches']) for item in result['data']] == \
+        [('c', ['dev']), ('b', ['master']), ('a', ['master', 'dev'])]
+    assert {branch: item['hash'] for branch, item in result['metadata'].items()} == \
+        {'master': 'b', 'dev': 'c'}
+
+
+def test_update_requests_only_moved_branches():
+    old = sync_all_commits({'master': 'b', 'dev': 'c'}, lambda branch, newest: {
+        'master': [commit('b', 2), commit('a', 1)], 'dev': [commit('c', 3)]}[branch])
+    get_new_commits = mock.Mock(return_value=[commit('d', 4)])
+
+    result = sync_all_commits({'master': 'd', 'dev': 'c', 'new': 'd'}, get_new_commits, old)
+
+    assert [call[0][0] for call in get_new_commits.call_args_list] == ['master', 'new']
+    assert get_new_commits.call_args_list[0][0][1]['hash'] == 'b'
+    assert result['data'][0]['hash'] == 'd'
+    assert result['data'][0]['branches'] == ['master', 'new']
+    assert len(result['data']) == 4
+    assert result['metadata']['master']['hash'] == 'd'
+
+
+def test_update_fails_if_branch_fails():
+    assert sync_all_commits({'master': 'b'}, lambda branch, newest: None) is None
+
+
+def mock_transport(base_url, responses):
+    """
+    Creates transport which answers GET of url under base_url
+    by response of its path with sorted query
+
+    :param base_url: string
+    :param responses: dict - path to deserialized body, missing paths are answered by 404
+    :return: mock.Mock
+    """
+
+    def get(url, params=None, **kwargs):  # pylint: disable=unused-argument
+        query = '&'.join(f'{key}={value}' for key, value in sorted((params or {}).items())
+                         if key != 'per_page')
+        path = url[len(base_url):] + ('?' + query if query else '')
+        if path not in responses:
+            return mock.Mock(status_code=404, headers={}, links={})
+        return mock.Mock(status_code=STATUS_CODE_OK, headers={}, links={},
+                         json=mock.Mock(return_value=responses[path]))
+
+    return mock.Mock(get=mock.Mock(side_effect=get))
+
+
+# master had commits a and b, then branch feature with commit x dated before b was merged by m
+OLD_COMMITS = {'data': [dict(commit('b', 1530000100), branches=['master']),
+                        dict(commit('a', 1530000000), branches=['master'])],
+               'metadata': {'master': commit('b', 1530000100)}}
+
+
+def test_github_update_gets_merged_commits_older_than_known_head():
+    sender = GithubRequestSender('owner', 'repo')
+    sender.transport = mock_transport(sender.base_url + sender.repos_api_url, {
+        '/branches': [{'name': 'master', 'commit': {'sha': 'm'}}],
+        '/compare/b...master': {'total_commits': 2, 'commits': [
+            github_commit('x', 1530000050), github_commit('m', 1530000200)]}
+    })
+
+    result = sender.get_updated_all_commits(OLD_COMMITS)
+
+    assert [(item['hash'], item['branches']) for item in result['data']] == \
+        [('m', ['master']), ('b', ['master']), ('x', ['master']), ('a', ['master'])]
+    assert result['metadata']['master']['hash'] == 'm'
+
+    sender.transport.get.reset_mock()
+    assert sender.get_updated_all_commits(result) == result
+    assert sender.transport.get.call_count == 1
+
+
+def test_github_update_gets_all_branch_commits_if_compare_is_truncated():
+    sender = GithubRequestSender('owner', 'repo')
+    sender.transport = mock_transport(sender.base_url + sender.repos_api_url, {
+        '/branches': [{'name': 'master', 'commit': {'sha': 'm'}}],
+        '/compare/b...master': {'total_commits': 300, 'commits': [
+            github_commit('m', 1530000200)]},
+        '/commits?sha=master': [github_commit('m', 1530000200), github_commit('b', 1530000100),
+                                github_commit('x', 1530000050), github_commit('a', 1530000000)]
+    })
+
+    result = sender.get_updated_all_commits(OLD_COMMITS)
+
+    assert [item['hash'] for item in result['data']] == ['m', 'b', 'x', 'a']
+    assert result['metadata']['master']['hash'] == 'm'
+
+
+def test_gitlab_update_gets_merged_commits_older_than_known_head():
+    def gitlab_commit(hash_of_commit, date):
+        return {'id': hash_of_commit, 'committer_name': 'author', 'message': 'message',
+                'created_at': to_iso_date(date)[:-1] + '.000Z'}
+
+    sender = GitLabRequestSender('owner', 'repo')
+    sender.transport = mock_transport(sender.base_url + 'owner%2Frepo', {
+        '/repository/branches': [{'name': 'master', 'commit': {'id': 'm'}}],
+        '/repository/compare?from=b&to=master': {'compare_timeout': False, 'commits': [
+            gitlab_commit('x', 1530000050), gitlab_commit('m', 1530000200)]}
+    })
+
+    result = sender.get_updated_all_commits(OLD_COMMITS)
+
+    assert [item['hash'] for item in result['data']] == ['m', 'b', 'x', 'a']
+    assert result['metadata']['master']['hash'] == 'm'
@@ -0,0 +1,127 @@
+"""
+Contains functions for testing GithubGraphQLRequestSender against fake GraphQL API
+which pages refs and histories by cursors
+"""
+from unittest import mock
+
+import pytest
+
+from heat_map.request_sender.github_graphql_request_sender import \
+    GithubGraphQLRequestSender, format_git_timestamp
+from heat_map.utils.request_status_codes import STATUS_CODE_OK
+
+# size of pages returned by fake API regardless of requested size
+FAKE_PAGE_SIZE = 2
+
+
+def commit_node(oid, date):
+    return {'oid': oid, 'message': f'message {oid}', 'authoredDate': date,
+            'author': {'name': 'BoartK'}}
+
+
+HISTORIES = {
+    'feature': [commit_node('f1', '2018-06-12T10:00:00+02:00'),
+                commit_node('m2', '2018-06-11T09:00:00Z'),
+                commit_node('m1', '2018-06-11T08:30:00Z')],
+    'master': [commit_node('m3', '2018-06-11T10:00:00Z'),
+               commit_node('m2', '2018-06-11T09:00:00Z'),
+               commit_node('m1', '2018-06-11T08:30:00Z')],
+    'new_branch': [commit_node('m1', '2018-06-11T08:30:00Z')]
+}
+PULL_REQUESTS = [{'headRefName': 'pr_branch', 'headRefOid': 'f1',
+                  'headRepositoryOwner': {'login': 'BoartK'}}]
+
+
+def page(nodes, after):
+    start = int(after or 0)
+    end = start + FAKE_PAGE_SIZE
+    return {'pageInfo': {'hasNextPage': end < len(nodes), 'endCursor': str(end)},
+            'nodes': nodes[start:end]}
+
+
+def fake_graphql(query, variables):
+    if 'refs(' in query:
+        refs = page(sorted(HISTORIES), variables['after'])
+        refs['nodes'] = [
+            dict({'name': name},
+                 **({'target': {'history': page(HISTORIES[name], None)}}
+                    if variables['withHistory'] else {}))
+            for name in refs['nodes']]
+        return {'defaultBranchRef': {'name': 'master'}, 'refs': refs}
+    if 'pullRequests(' in query:
+        return {'pullRequests': page(PULL_REQUESTS, variables['after'])}
+    if 'ref0:' in query:
+        repository = {}
+        i = 0
+        while f'ref{i}' in variables:
+            name = variables[f'ref{i}'].replace('refs/heads/', '')
+            repository[f'ref{i}'] = {'target': {'history': page(
+                HISTORIES[name], variables[f'after{i}'])}} if name in HISTORIES else None
+            i += 1
+        return repository
+    if 'object(' in query:
+        commits = {node['oid']: node for nodes in HISTORIES.values() for node in nodes}
+        return {'object': commits.get(variables['oid'])}
+    return {'databaseId': 136896178, 'name': 'test1', 'createdAt': '2018-06-11T08:22:58Z',
+            'owner': {'login': 'BoartK'}}
+
+
+@pytest.fixture
+def graphql_sender():
+    sender = GithubGraphQLRequestSender('BoartK', 'test1')
+
+    def http_post(url, json=None, **kwargs):  # pylint: disable=unused-argument
+        assert url == 'https://api.github.com/graphql'
+        response = mock.Mock(status_code=STATUS_CODE_OK)
+        response.json.return_value = {
+            'data': {'repository': fake_graphql(json['query'], json['variables'])}}
+        return response
+
+    with mock.patch.object(sender, '_http_post', side_effect=http_post) as mocked:
+        sender.mocked_post = mocked
+        yield sender
+
+
+def test_format_git_timestamp_converts_offset_to_utc():
+    assert format_git_timestamp('2018-06-12T10:00:00+02:00') == '2018-06-12T08:00:00Z'
+    assert format_git_timestamp('2018-06-12T10:00:00-01:30') == '2018-06-12T11:30:00Z'
+    assert format_git_timestamp('2018-06-12T10:00:00Z') == '2018-06-12T10:00:00Z'
+
+
+def test_get_repo(graphql_sender):
+    repo = graphql_sender.get_repo()
+
+    assert repo['id'] == 136896178
+    assert repo['url'] == 'https://api.github.com/repos/BoartK/test1'
+
+
+def test_get_branches_follows_cursor(graphql_sender):
+    assert graphql_sender.get_branches() == [
+        {'name': 'feature'}, {'name': 'master'}, {'name': 'new_branch'}]
+
+
+def test_get_commits_by_branch_gets_full_history(graphql_sender):
+    commits = graphql_sender.get_commits_by_branch('master')
+
+    assert [commit['hash'] for commit in commits] == ['m3', 'm2', 'm1']
+    assert graphql_sender.get_commits_by_branch('missing') is None
+
+
+def test_get_all_commits_merges_branches(graphql_sender):
+    result = graphql_sender.get_all_commits()
+    branches = {commit['hash']: commit['branches'] for commit in result['data']}
+
+    assert [commit['hash'] for commit in result['data']] == ['f1', 'm3', 'm2', 'm1']
+    assert branches['m1'] == ['feature', 'master', 'new_branch']
+    assert branches['f1'] == ['feature']
+    assert {branch: commit['hash'] for branch, commit in result['metadata'].items()} == \
+        {'feature': 'f1', 'master': 'm3', 'new_branch': 'm1'}
+    # two pages of refs and one batch continuing histories of two branches
+    assert graphql_sender.mocked_post.call_count == 3
+
+
+def test_get_commit_by_hash_moves_pull_request_head(graphql_sender):
+    commit = graphql_sender.get_commit_by_hash('f1')
+
+    assert commit['branch'] == ['pr_branch']
+    assert commit['date'] == graphql_sender.get_commit_by_hash('m2')['date'] + 82800
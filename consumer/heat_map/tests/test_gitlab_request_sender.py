@@ -3,6 +3,8 @@ Contains functions for testing GitlabRequestSender class functionality
 from gitlab_request_sender.py
 """
 
+from unittest import mock
+
 import pytest
 from pytest_mock import mocker
 from heat_map.request_sender.gitlab_request_sender import GitLabRequestSender
@@ -441,3 +443,68 @@ def test_get_contributors_on_real_repo(real_repo, mocker):
 def test_get_contributors_on_non_existing_repo(non_existing_repo, mocker):
     _patch_requests(mocker, STATUS_CODE_NOT_FOUND)
     assert non_existing_repo.get_contributors() is None
+
+
+def gitlab_routes(number_of_commits):
+    """
+    Gets routes of fake GitLab API with one page per url
+    """
+    commits = [{'id': f'sha{number}', 'committer_name': 'partsey', 'message': 'message',
+                'created_at': '2018-07-03T06:32:41.364Z', 'author_name': 'partsey',
+                'committed_date': '2018-07-03T06:32:41.364Z'}
+               for number in range(number_of_commits)]
+    return {
+        BRANCHES_URL: [{'name': 'master'}, {'name': BRANCH}],
+        COMMITS_URL: commits,
+        COMMITS_URL + '?ref_name=master': commits[1:],
+        COMMITS_URL + '?ref_name=' + BRANCH: commits[:1],
+        COMMITS_BY_HASH_URL: commits[0],
+        COMMITS_URL + '/sha0/refs': [{'name': BRANCH}],
+        COMMITS_BY_HASH_URL + '/refs': [{'name': 'master'}]
+    }
+
+
+def mocked_http_get(routes):
+    def http_get(url, params=None, **kwargs):  # pylint: disable=unused-argument
+        response = mock.Mock(status_code=STATUS_CODE_OK if url in routes
+                             else STATUS_CODE_NOT_FOUND, headers={})
+        response.json.return_value = routes.get(url)
+        return response
+    return mock.Mock(side_effect=http_get)
+
+
+def test_get_commits_walk_mode_does_not_request_refs_per_commit():
+    sender = GitLabRequestSender('partsey', 'my-awesome-project')
+    http_get = mocked_http_get(gitlab_routes(1000))
+
+    with mock.patch.object(sender, '_http_get', http_get):
+        commits = sender.get_commits()
+
+    assert len(commits) == 1000
+    assert commits[0]['branch'] == BRANCH and commits[1]['branch'] == 'master'
+    # commits, branches and commits of every branch
+    assert http_get.call_count == 4
+
+
+def test_get_commits_refs_mode_matches_walk_mode():
+    routes = gitlab_routes(3)
+    routes.update({COMMITS_URL + f'/sha{number}/refs': [{'name': 'master'}]
+                   for number in (1, 2)})
+    walk_sender = GitLabRequestSender('partsey', 'my-awesome-project')
+    refs_sender = GitLabRequestSender('partsey', 'my-awesome-project', branch_attribution='refs')
+
+    with mock.patch.object(walk_sender, '_http_get', mocked_http_get(routes)), \
+            mock.patch.object(refs_sender, '_http_get', mocked_http_get(routes)):
+        assert walk_sender.get_commits() == refs_sender.get_commits()
+
+
+def test_get_commit_by_hash_requests_commit_once():
+    sender = GitLabRequestSender('partsey', 'my-awesome-project')
+    http_get = mocked_http_get(gitlab_routes(1))
+
+    with mock.patch.object(sender, '_http_get', http_get):
+        assert sender.get_commit_by_hash(COMMIT_HASH)['branch'] == 'master'
+        assert sender.get_commit_by_hash(COMMIT_HASH)['branch'] == 'master'
+
+    # commit twice, refs once
+    assert http_get.call_count == 3
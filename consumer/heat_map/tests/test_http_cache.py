@@ -0,0 +1,119 @@
+"""
+Contains functions for testing ResponseCache which serves not modified
+responses of conditional requests from disk
+"""
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+import requests
+
+from heat_map.utils.http_cache import ResponseCache, cache_key
+from heat_map.utils.http_transport import HttpTransport
+from heat_map.utils.request_status_codes import STATUS_CODE_OK
+
+
+class ETagHandler(BaseHTTPRequestHandler):
+    """
+    Answers GET with json body and ETag, or 304 if ETag matches If-None-Match,
+    /fresh responses declare they stay fresh for a minute
+    """
+    protocol_version = 'HTTP/1.1'
+    etag = '"v1"'
+    requests = []
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        ETagHandler.requests.append((self.path, self.headers.get('If-None-Match')))
+        if self.headers.get('If-None-Match') == self.etag:
+            self.send_response(304)
+            self.send_header('ETag', self.etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = b'[{"name": "master"}]'
+        self.send_response(STATUS_CODE_OK)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('ETag', self.etag)
+        self.send_header('Link', '<http://next>; rel="next"')
+        self.send_header('Cache-Control',
+                         'private, max-age=60' if self.path == '/fresh' else 'private, max-age=0')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+@pytest.fixture
+def etag_server():
+    ETagHandler.requests = []
+    server = HTTPServer(('127.0.0.1', 0), ETagHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_port}'
+    server.shutdown()
+    server.server_close()
+
+
+def test_not_modified_response_is_served_from_cache(etag_server, tmp_path):
+    transport = HttpTransport(cache=ResponseCache(str(tmp_path)))
+
+    first = transport.get(etag_server + '/branches', headers={'Authorization': 'token 1'})
+    second = transport.get(etag_server + '/branches', headers={'Authorization': 'token 1'})
+
+    assert first.json() == second.json() == [{'name': 'master'}]
+    assert second.status_code == STATUS_CODE_OK
+    assert second.links['next']['url'] == 'http://next'
+    assert ETagHandler.requests == [('/branches', None), ('/branches', '"v1"')]
+    assert transport.get_cache_stats() == {'not_modified': 1, 'misses': 1}
+
+
+def test_response_within_max_age_is_revalidated(etag_server, tmp_path):
+    transport = HttpTransport(cache=ResponseCache(str(tmp_path)))
+
+    for _ in range(3):
+        assert transport.get(etag_server + '/fresh').json() == [{'name': 'master'}]
+
+    assert ETagHandler.requests == [('/fresh', None), ('/fresh', '"v1"'), ('/fresh', '"v1"')]
+    assert transport.get_cache_stats() == {'not_modified': 2, 'misses': 1}
+
+
+def test_responses_are_cached_per_token(etag_server, tmp_path):
+    transport = HttpTransport(cache=ResponseCache(str(tmp_path)))
+
+    transport.get(etag_server + '/fresh', headers={'Authorization': 'token 1'})
+    transport.get(etag_server + '/fresh', headers={'Authorization': 'token 2'})
+
+    assert ETagHandler.requests == [('/fresh', None), ('/fresh', None)]
+    assert cache_key('url', {'page': 1}, 'token 1') != cache_key('url', {'page': 1}, 'token 2')
+
+
+def test_entry_keeps_validators_and_body_in_one_file(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    response = requests.Response()
+    response.status_code = 200
+    response.headers['ETag'] = '"v1"'
+    response._content = b'{"a": 1}\n{"b": 2}'  # pylint: disable=protected-access
+
+    cache.store('key', response)
+
+    assert os.listdir(str(tmp_path)) == ['key.entry']
+    entry, body = cache.load('key')
+    assert entry['headers'] == {'ETag': '"v1"'}
+    assert body == response.content
+
+
+def test_trim_removes_old_and_least_recently_used_entries(tmp_path):
+    for index, name in enumerate(['old.entry', 'used.entry', 'new.entry']):
+        path = tmp_path / name
+        path.write_bytes(b'x' * 10)
+        os.utime(str(path), (time.time() - 100 + index * 10,) * 2)
+
+    ResponseCache(str(tmp_path), max_bytes=20, max_age=95)
+    assert sorted(os.listdir(str(tmp_path))) == ['new.entry', 'used.entry']
+
+    ResponseCache(str(tmp_path), max_bytes=10)
+    assert os.listdir(str(tmp_path)) == ['new.entry']
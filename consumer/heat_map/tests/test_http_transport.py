@@ -0,0 +1,85 @@
+"""
+Contains functions for testing HttpTransport class
+which provides pooled keep-alive sessions for request senders
+"""
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest import mock
+
+import pytest
+
+from heat_map.request_sender.github_request_sender import GithubRequestSender
+from heat_map.request_sender.gitlab_request_sender import GitLabRequestSender
+from heat_map.utils.http_transport import HttpTransport, PoolStats, SHARED_TRANSPORT
+from heat_map.utils.request_scheduler import INTERACTIVE
+from heat_map.utils.request_status_codes import STATUS_CODE_OK
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """
+    Answers every GET with small json body over keep-alive connection
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        body = b'[{"name": "master"}]'
+        self.send_response(STATUS_CODE_OK)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+@pytest.fixture
+def local_server():
+    server = HTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_port}'
+    server.shutdown()
+    server.server_close()
+
+
+def test_transport_reuses_connection(local_server):
+    transport = HttpTransport()
+    for _ in range(3):
+        assert transport.get(local_server + '/branches').json() == [{'name': 'master'}]
+    transport.close()
+
+    assert transport.get_stats() == {
+        'requests': 3,
+        'pool_hits': 2,
+        'pool_misses': 1,
+        'reuse_ratio': 2 / 3
+    }
+
+
+def test_pool_stats_empty():
+    assert PoolStats().as_dict() == {
+        'requests': 0,
+        'pool_hits': 0,
+        'pool_misses': 0,
+        'reuse_ratio': 0.0
+    }
+
+
+def test_senders_share_transport():
+    assert GithubRequestSender('owner', 'repo').transport is SHARED_TRANSPORT
+    assert GitLabRequestSender('owner', 'repo').transport is SHARED_TRANSPORT
+
+
+def test_sender_routes_through_transport():
+    transport = mock.Mock()
+    transport.get.return_value.status_code = STATUS_CODE_OK
+    transport.get.return_value.headers = {}
+    transport.get.return_value.json.return_value = [{'name': 'master'}]
+    sender = GithubRequestSender('owner', 'repo', token='token 123')
+    sender.transport = transport
+
+    assert sender.get_branches() == [{'name': 'master'}]
+    transport.get.assert_called_once_with('https://api.github.com/repos/owner/repo/branches',
+                                          params={'per_page': 100}, priority=INTERACTIVE,
+                                          headers={'Authorization': 'token 123'})
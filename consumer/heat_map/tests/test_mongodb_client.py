@@ -0,0 +1,134 @@
+"""
+Contains functions for testing MongoDBClient which stores repository
+and its commits in separate collections
+"""
+from unittest import mock
+
+from helper.mongodb_client import MongoDBClient, get_changed_commits, to_counter_updates, \
+    to_commit_update
+
+OLD_COMMITS = {
+    'data': [{'hash': 'a', 'author': 'x', 'message': 'm', 'date': 1, 'branches': ['master']}],
+    'metadata': {'master': {'hash': 'a', 'date': 1}}
+}
+NEW_COMMITS = {
+    'data': [{'hash': 'b', 'author': 'x', 'message': 'm', 'date': 2, 'branches': ['dev']},
+             {'hash': 'a', 'author': 'x', 'message': 'm', 'date': 1,
+              'branches': ['master', 'dev']}],
+    'metadata': {'master': {'hash': 'a', 'date': 1}, 'dev': {'hash': 'b', 'date': 2}}
+}
+
+
+def get_client():
+    base_client = mock.MagicMock()
+    collections = {}
+    base_client.return_value.heatmap_db.__getitem__.side_effect = \
+        lambda name: collections.setdefault(name, mock.MagicMock())
+    client = MongoDBClient(base_client=base_client)
+    # pylint: disable=protected-access
+    return client, client._collection, client._commits_collection
+
+
+def test_get_changed_commits():
+    assert get_changed_commits(NEW_COMMITS['data'], OLD_COMMITS['data']) == [
+        (NEW_COMMITS['data'][0], ['dev']), (NEW_COMMITS['data'][1], ['dev'])]
+    assert get_changed_commits(OLD_COMMITS['data'], OLD_COMMITS['data']) == []
+    assert len(get_changed_commits(NEW_COMMITS['data'])) == 2
+
+
+def test_set_commits_upserts_only_delta():
+    client, repos, commits = get_client()
+    commits.bulk_write.return_value.upserted_ids = {0: 'id'}
+
+    assert client.set_commits('key', NEW_COMMITS, OLD_COMMITS) == 2
+
+    updates = commits.bulk_write.call_args[0][0]
+    assert [update._filter for update in updates] == [  # pylint: disable=protected-access
+        {'repo_key': 'key', 'hash': 'b'}, {'repo_key': 'key', 'hash': 'a'}]
+    assert updates[1]._doc['$addToSet'] == {  # pylint: disable=protected-access
+        'branches': {'$each': ['dev']}}
+    repos.update_one.assert_called_once_with(
+        {'key': 'key'}, {'$set': {'value.commits_metadata': NEW_COMMITS['metadata'],
+                                  'value.heatmap_materialized': True}},
+        upsert=True)
+
+    commits.bulk_write.reset_mock()
+    assert client.set_commits('key', OLD_COMMITS, OLD_COMMITS) == 0
+    commits.bulk_write.assert_not_called()
+
+
+def test_set_entry_keeps_commits_out_of_repository_document():
+    client, repos, commits = get_client()
+
+    client.set_entry('key', {'repo': {'id': 1}, 'branches': [], 'commits': OLD_COMMITS})
+
+    document = repos.replace_one.call_args[0][1]
+    assert document == {'key': 'key', 'value': {'repo': {'id': 1}, 'branches': [],
+                                                'commits_metadata': OLD_COMMITS['metadata']}}
+    assert len(commits.bulk_write.call_args[0][0]) == 1
+
+
+def test_get_entry_joins_commits():
+    client, repos, commits = get_client()
+    repos.find_one.return_value = {'key': 'key', 'value': {
+        'repo': {'id': 1}, 'commits_metadata': OLD_COMMITS['metadata']}}
+    commits.find.return_value.sort.return_value = OLD_COMMITS['data']
+
+    assert client.get_entry('key')['value'] == {'repo': {'id': 1}, 'commits': OLD_COMMITS}
+
+
+def test_counters_are_incremented_by_inserted_commits_only():
+    client, repos, _ = get_client()
+    # pylint: disable=protected-access
+    client._commits_collection.bulk_write.return_value.upserted_ids = {0: 'id'}
+
+    client.set_commits('key', NEW_COMMITS, OLD_COMMITS)
+
+    counters = client._heatmap_collection.bulk_write.call_args[0][0]
+    assert [(update._filter['bucket_seconds'], update._filter['date'], update._doc['$inc'])
+            for update in counters] == [(86400, 0, {'count': 1}), (3600, 0, {'count': 1})]
+
+    repos.find_one.return_value = None
+    client.set_commits('key', NEW_COMMITS, OLD_COMMITS)
+    client._heatmap_collection.delete_many.assert_not_called()
+
+
+def test_rebuild_overwrites_counters_and_deletes_only_empty_buckets():
+    client, _, commits = get_client()
+    # pylint: disable=protected-access
+    heatmap = client._heatmap_collection
+    commits.aggregate.return_value = [{'repo_key': 'key', 'bucket_seconds': 86400,
+                                       'author': 'x', 'date': 0, 'count': 2, 'first_date': 5}]
+    heatmap.find.return_value = [{'author': 'x', 'date': 0}, {'author': 'y', 'date': 0}]
+
+    client.rebuild_heatmap('key')
+
+    writes = [operation for call in heatmap.bulk_write.call_args_list for operation in call[0][0]]
+    sets = [operation for operation in writes if hasattr(operation, '_doc')]
+    assert sets[0]._doc == {'$set': {'count': 2, 'first_date': 5}}
+    assert sets[0]._upsert
+    deleted = [operation._filter for operation in writes if not hasattr(operation, '_doc')]
+    assert [(bucket['bucket_seconds'], bucket['author']) for bucket in deleted] == [
+        (86400, 'y'), (3600, 'y')]
+    heatmap.delete_many.assert_not_called()
+
+
+def test_to_counter_updates_groups_commits_by_bucket():
+    updates = to_counter_updates('key', [
+        {'author': 'x', 'date': 90000}, {'author': 'x', 'date': '86400'},
+        {'author': 'y', 'date': 3599}])
+
+    # pylint: disable=protected-access
+    counters = {(update._filter['bucket_seconds'], update._filter['author'],
+                 update._filter['date']): update._doc for update in updates}
+    assert counters[(86400, 'x', 86400)] == {'$inc': {'count': 2}, '$min': {'first_date': 86400}}
+    assert counters[(3600, 'x', 86400)]['$inc'] == {'count': 1}
+    assert counters[(3600, 'y', 0)] == {'$inc': {'count': 1}, '$min': {'first_date': 3599}}
+    assert len(counters) == 5
+
+
+def test_commit_dates_are_stored_as_int():
+    update = to_commit_update('key', {'hash': 'a', 'author': 'x', 'date': '86400'}, ['master'])
+
+    # pylint: disable=protected-access
+    assert update._doc['$setOnInsert'] == {'author': 'x', 'date': 86400}
@@ -0,0 +1,110 @@
+"""
+Contains functions for testing iterators over pages of GitHub and GitLab API responses
+"""
+import asyncio
+from unittest import mock
+
+import pytest
+
+from heat_map.request_sender.async_request_sender_base import AsyncResponse
+from heat_map.request_sender.github_request_sender import GithubRequestSender
+from heat_map.request_sender.gitlab_request_sender import GitLabRequestSender
+from heat_map.utils.pagination import PaginationError, iter_pages, aiter_pages, \
+    github_next_page, gitlab_next_page
+from heat_map.utils.request_status_codes import STATUS_CODE_OK, STATUS_CODE_NOT_FOUND
+
+GITHUB_URL = 'https://api.github.com/repos/owner/repo/commits'
+
+
+def github_response(page, last_page, status_code=STATUS_CODE_OK):
+    headers = {}
+    if page < last_page:
+        headers['Link'] = (f'<{GITHUB_URL}?sha=master&per_page=2&page={page + 1}>; rel="next", '
+                           f'<{GITHUB_URL}?sha=master&per_page=2&page={last_page}>; rel="last"')
+    response = mock.Mock(status_code=status_code, headers=headers)
+    response.json.return_value = [{'page': page}]
+    return response
+
+
+def gitlab_response(page, last_page):
+    response = mock.Mock(status_code=STATUS_CODE_OK,
+                         headers={'X-Next-Page': str(page + 1) if page < last_page else ''})
+    response.json.return_value = [{'name': f'branch{page}'}]
+    return response
+
+
+def github_http_get(last_page, failed_page=None):
+    def http_get(url, params=None, **kwargs):  # pylint: disable=unused-argument
+        page = int(url.rsplit('page=', 1)[1]) if 'page=' in url else 1
+        status_code = STATUS_CODE_NOT_FOUND if page == failed_page else STATUS_CODE_OK
+        return github_response(page, last_page, status_code)
+    return http_get
+
+
+@pytest.mark.parametrize('prefetch', [True, False])
+def test_iter_pages_follows_github_link_header(prefetch):
+    http_get = mock.Mock(side_effect=github_http_get(3))
+
+    pages = [response.json() for response in iter_pages(
+        http_get, GITHUB_URL, {'sha': 'master'}, github_next_page, prefetch=prefetch)]
+
+    assert pages == [[{'page': 1}], [{'page': 2}], [{'page': 3}]]
+    assert http_get.call_args_list[1] == mock.call(
+        f'{GITHUB_URL}?sha=master&per_page=2&page=2', params=None)
+
+
+def test_iter_pages_raises_on_failed_page():
+    pages = iter_pages(github_http_get(3, failed_page=2), GITHUB_URL, None, github_next_page)
+
+    assert next(pages).json() == [{'page': 1}]
+    with pytest.raises(PaginationError):
+        next(pages)
+
+
+def test_gitlab_next_page_keeps_params():
+    assert gitlab_next_page(gitlab_response(1, 2), 'url', {'per_page': 100}) == \
+        ('url', {'per_page': 100, 'page': '2'})
+    assert gitlab_next_page(gitlab_response(2, 2), 'url', {'per_page': 100}) is None
+
+
+def test_aiter_pages_follows_github_link_header():
+    async def http_get(url, params=None, **kwargs):
+        response = github_http_get(2)(url, params, **kwargs)
+        return AsyncResponse(response.status_code, response.headers, b'[]')
+
+    async def collect():
+        return [response.status_code async for response in
+                aiter_pages(http_get, GITHUB_URL, None, github_next_page)]
+
+    loop = asyncio.new_event_loop()
+    try:
+        assert loop.run_until_complete(collect()) == [STATUS_CODE_OK, STATUS_CODE_OK]
+    finally:
+        loop.close()
+
+
+def test_gitlab_sender_gets_branches_of_all_pages():
+    sender = GitLabRequestSender('owner', 'repo')
+
+    def http_get(url, params=None, **kwargs):  # pylint: disable=unused-argument
+        return gitlab_response(int(params.get('page', 1)), 3)
+
+    with mock.patch.object(sender, '_http_get', side_effect=http_get):
+        assert sender.get_branches() == [{'name': 'branch1'}, {'name': 'branch2'},
+                                         {'name': 'branch3'}]
+
+
+def test_github_sender_streams_commits_of_branch():
+    sender = GithubRequestSender('owner', 'repo')
+
+    def http_get(url, params=None, **kwargs):  # pylint: disable=unused-argument
+        response = github_http_get(2)(url, params, **kwargs)
+        page = response.json.return_value[0]['page']
+        response.json.return_value = [{'sha': f'sha{page}', 'commit': {
+            'author': {'name': 'owner', 'date': '2018-06-11T08:22:58Z'}, 'message': 'msg'}}]
+        return response
+
+    with mock.patch.object(sender, '_http_get', side_effect=http_get):
+        assert [commit['hash'] for commit in sender.iter_commits_by_branch('master')] == \
+            ['sha1', 'sha2']
+        assert len(sender.get_commits_by_branch('master')) == 2
@@ -0,0 +1,157 @@
+"""
+Contains functions for testing RequestScheduler which paces requests
+to provider APIs by rate limits
+"""
+import asyncio
+import threading
+import time
+from unittest import mock
+
+import pytest
+from requests.exceptions import ConnectionError as RequestsConnectionError
+
+from heat_map.utils.request_scheduler import RequestScheduler, TokenBucket, INTERACTIVE, \
+    BACKGROUND, MAX_RETRIES, DEFAULT_RATE, get_quota, get_retry_after
+from heat_map.utils.request_status_codes import STATUS_CODE_OK
+
+KEY = ('api.github.com', 'token 123')
+
+
+def response(status_code=STATUS_CODE_OK, **headers):
+    return mock.Mock(status_code=status_code, headers=headers)
+
+
+@pytest.fixture(autouse=True)
+def no_backoff():
+    with mock.patch('heat_map.utils.request_scheduler.backoff', return_value=0):
+        yield
+
+
+def test_retries_after_too_many_requests():
+    send = mock.Mock(side_effect=[response(429, **{'Retry-After': '0'}), response()])
+
+    assert RequestScheduler().request(KEY, send).status_code == STATUS_CODE_OK
+    assert send.call_count == 2
+
+
+def test_retries_connection_errors_of_background_requests_and_reraises():
+    send = mock.Mock(side_effect=RequestsConnectionError)
+
+    with pytest.raises(RequestsConnectionError):
+        RequestScheduler().request(KEY, send, BACKGROUND)
+    assert send.call_count == MAX_RETRIES + 1
+
+
+def test_interactive_request_fails_at_once_on_connection_error():
+    send = mock.Mock(side_effect=RequestsConnectionError)
+
+    with pytest.raises(RequestsConnectionError):
+        RequestScheduler().request(KEY, send, INTERACTIVE)
+    assert send.call_count == 1
+
+
+def test_does_not_retry_client_errors():
+    send = mock.Mock(return_value=response(404))
+
+    assert RequestScheduler().request(KEY, send).status_code == 404
+    assert send.call_count == 1
+
+
+def test_low_quota_slows_bucket_down():
+    bucket = TokenBucket()
+    bucket.set_quota(10, 100)
+    assert bucket.rate == pytest.approx(0.1)
+
+    bucket.set_quota(1000, 100)
+    assert bucket.rate == DEFAULT_RATE
+
+    bucket.set_quota(0, 5)
+    assert bucket.wait_time(time.monotonic()) > 4
+
+
+def test_interactive_requests_go_before_background():
+    scheduler = RequestScheduler()
+    limiter = scheduler._get_limiter(KEY)  # pylint: disable=protected-access
+    limiter.bucket.block(0.3)
+    order = []
+
+    def submit(name, priority):
+        scheduler.request(KEY, lambda: order.append(name) or response(), priority)
+
+    background = threading.Thread(target=submit, args=('background', BACKGROUND))
+    interactive = threading.Thread(target=submit, args=('interactive', INTERACTIVE))
+    background.start()
+    time.sleep(0.05)
+    interactive.start()
+    background.join()
+    interactive.join()
+
+    assert order == ['interactive', 'background']
+
+
+def test_rate_limit_headers():
+    assert get_quota({'X-RateLimit-Remaining': '42', 'X-RateLimit-Reset': '1530000000'}) == \
+        (42, 1530000000.0)
+    assert get_quota({'RateLimit-Remaining': '7', 'RateLimit-Reset': '1530000000'}) == \
+        (7, 1530000000.0)
+    assert get_quota({}) == (None, None)
+    assert get_retry_after({'Retry-After': '120'}) == 120
+    assert get_retry_after({'Retry-After': 'Wed, 21 Oct 2015 07:28:00 GMT'}) == 0
+
+
+def test_async_request_retries_rate_limited_response_without_blocking_loop():
+    send = mock.Mock(side_effect=[response(429, **{'Retry-After': '0'}), response()])
+
+    async def async_send():
+        return send()
+
+    async def run():
+        ticks = []
+
+        async def tick():
+            ticks.append(1)
+
+        result = await asyncio.gather(RequestScheduler().async_request(KEY, async_send), tick())
+        return result[0], ticks
+
+    loop = asyncio.new_event_loop()
+    try:
+        result, ticks = loop.run_until_complete(run())
+    finally:
+        loop.close()
+    assert result.status_code == STATUS_CODE_OK
+    assert send.call_count == 2
+    assert ticks == [1]
+
+
+def test_async_request_queued_behind_thread_is_woken_by_its_release():
+    scheduler = RequestScheduler()
+    limiter = scheduler._get_limiter(KEY)  # pylint: disable=protected-access
+    # thread becomes the first in queue and waits for the blocked bucket
+    limiter.bucket.block(0.2)
+    order = []
+    thread = threading.Thread(
+        target=scheduler.request,
+        args=(KEY, lambda: order.append('thread') or response(), INTERACTIVE))
+
+    async def async_send():
+        order.append('coroutine')
+        return response()
+
+    async def run():
+        thread.start()
+        while not limiter.waiting:
+            await asyncio.sleep(0.01)
+        # coroutine sleeps without timeout until thread leaves the queue
+        return await asyncio.wait_for(
+            scheduler.async_request(KEY, async_send, BACKGROUND), timeout=5)
+
+    loop = asyncio.new_event_loop()
+    try:
+        result = loop.run_until_complete(run())
+    finally:
+        loop.close()
+        thread.join()
+    assert result.status_code == STATUS_CODE_OK
+    assert order == ['thread', 'coroutine']
+    assert limiter.async_waiters == []
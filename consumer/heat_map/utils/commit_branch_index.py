@@ -0,0 +1,111 @@
+"""
+Contains CommitBranchIndex class - inverted index of commits hashes
+to branches they belong to, used for branch attribution of commits
+"""
+
+
+class CommitBranchIndex:
+    """
+    Inverted index of commit hash to branches which commit belongs to.
+    Every branch name gets int id in order of adding, branches of commit
+    are kept as one int bitmask of branch ids, so adding commit to branch
+    and getting branches of commit do not depend on number of other commits
+    """
+
+    def __init__(self):
+        # branch names by branch id
+        self.branches = []
+        self._branch_ids = {}
+        # bitmask of branch ids with key - hash of commit
+        self._commits = {}
+
+    @classmethod
+    def from_branches(cls, branches_hashes):
+        """
+        Builds index from hashes of commits of every branch
+
+        :param branches_hashes: dict - branch name to iterable of commits hashes
+        :return: CommitBranchIndex
+        """
+        index = cls()
+        for branch_name, hashes in branches_hashes.items():
+            index.add_commits(branch_name, hashes)
+        return index
+
+    @classmethod
+    def from_commits(cls, commits):
+        """
+        Builds index from parsed commits with key 'branches'
+
+        :param commits: iterable - of dicts with keys 'hash' and 'branches'
+        :return: CommitBranchIndex
+        """
+        index = cls()
+        for commit in commits:
+            for branch_name in commit.get('branches', []):
+                index.add(commit['hash'], branch_name)
+        return index
+
+    def add_branch(self, branch_name):
+        """
+        Gets id of branch, adds branch to index if it is new
+
+        :param branch_name: string
+        :return: int
+        """
+        branch_id = self._branch_ids.get(branch_name)
+        if branch_id is None:
+            branch_id = self._branch_ids[branch_name] = len(self.branches)
+            self.branches.append(branch_name)
+        return branch_id
+
+    def add(self, commit_hash, branch_name):
+        """
+        Adds commit to branch
+
+        :param commit_hash: string
+        :param branch_name: string
+        """
+        bit = 1 << self.add_branch(branch_name)
+        self._commits[commit_hash] = self._commits.get(commit_hash, 0) | bit
+
+    def add_commits(self, branch_name, hashes):
+        """
+        Adds commits to branch, branch is added even if it has no commits
+
+        :param branch_name: string
+        :param hashes: iterable - of commits hashes
+        """
+        bit = 1 << self.add_branch(branch_name)
+        commits = self._commits
+        for commit_hash in hashes:
+            commits[commit_hash] = commits.get(commit_hash, 0) | bit
+
+    def discard(self, commit_hash):
+        """
+        Removes commit from all branches
+
+        :param commit_hash: string
+        """
+        self._commits.pop(commit_hash, None)
+
+    def branches_of(self, commit_hash):
+        """
+        Gets names of branches which commit belongs to in order of adding branches
+
+        :param commit_hash: string
+        :return: list - of strings, empty if commit is unknown
+        """
+        mask = self._commits.get(commit_hash, 0)
+        branches = []
+        while mask:
+            lowest_bit = mask & -mask
+            branches.append(self.branches[lowest_bit.bit_length() - 1])
+            mask ^= lowest_bit
+        return branches
+
+    def __contains__(self, commit_hash):
+        return commit_hash in self._commits
+
+    def __len__(self):
+        return len(self._commits)
@@ -0,0 +1,143 @@
+"""
+Contains functions for building and incrementally updating all commits of repository
+in format {'data': [commits with branches], 'metadata': {branch: newest commit}},
+so refreshing stored repository fetches only commits not reachable from heads of its branches
+"""
+
+import asyncio
+from datetime import datetime
+
+from heat_map.utils.commit_branch_index import CommitBranchIndex
+
+ISO_TIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+def merge_branches_commits(branches_names, branches_commits, old_commits=None):
+    """
+    Merges lists of commits of every branch into dict of commits with key - hash of commit.
+    Adds key 'branches' with list of names of all branches commit belongs to,
+    branches of old commits are kept
+
+    :param branches_names: list - of branches names
+    :param branches_commits: list - of lists of parsed commits in order of branches_names
+    :param old_commits: list - of already merged commits with key 'branches', not modified
+    :return: dict
+    """
+
+    old_commits = old_commits or []
+    index = CommitBranchIndex.from_commits(old_commits)
+    repo_commits = {commit['hash']: dict(commit) for commit in old_commits}
+    for branch_name, list_of_branch_commits in zip(branches_names, branches_commits):
+        index.add_commits(branch_name, (commit['hash'] for commit in list_of_branch_commits))
+        for commit_in_branch in list_of_branch_commits:
+            repo_commits.setdefault(commit_in_branch['hash'], commit_in_branch)
+
+    for commit_hash, commit in repo_commits.items():
+        commit['branches'] = index.branches_of(commit_hash)
+
+    return repo_commits
+
+
+def to_iso_date(date):
+    """
+    Converts timestamp of parsed commit to ISO 8601 date of 'since' filters of APIs
+
+    :param date: int or str - timestamp
+    :return: str
+    """
+    return datetime.utcfromtimestamp(int(date)).strftime(ISO_TIME_FORMAT)
+
+
+def get_moved_branches(branch_heads, old_commits):
+    """
+    Gets branches which heads differ from their newest known commits
+
+    :param branch_heads: dict - branch name to hash of its head commit
+    :param old_commits: dict - {'data', 'metadata'}
+    :return: dict - branch name to its newest known commit or None for new branches
+    """
+    old_metadata = old_commits['metadata']
+    moved_branches = {}
+    for branch_name, head in branch_heads.items():
+        newest_commit = old_metadata.get(branch_name)
+        if newest_commit is None or newest_commit['hash'] != head:
+            moved_branches[branch_name] = newest_commit
+    return moved_branches
+
+
+def update_all_commits(branch_heads, old_commits, new_commits):
+    """
+    Merges new commits of moved branches into all commits of repository
+
+    :param branch_heads: dict - branch name to hash of its head commit
+    :param old_commits: dict - {'data', 'metadata'} to update
+    :param new_commits: dict - moved branch name to list of its new commits, the newest first
+    :return: dict - {'data', 'metadata'}
+    """
+    old_metadata = old_commits['metadata']
+    metadata = {}
+    for branch_name in branch_heads:
+        newest_commit = old_metadata.get(branch_name)
+        branch_commits = new_commits.get(branch_name)
+        metadata[branch_name] = branch_commits[0] if branch_commits else newest_commit
+
+    repo_commits = merge_branches_commits(list(new_commits), list(new_commits.values()),
+                                          old_commits['data'])
+
+    # branch moved back to already known commit
+    for branch_name, newest_commit in metadata.items():
+        if newest_commit is None or newest_commit['hash'] != branch_heads[branch_name]:
+            metadata[branch_name] = repo_commits.get(branch_heads[branch_name], newest_commit)
+
+    # sorts all commits in repository by date in reverse order
+    sorted_commits = sorted(repo_commits.values(), key=lambda x: x['date'], reverse=True)
+
+    return {'data': sorted_commits,
+            'metadata': {branch: commit for branch, commit in metadata.items() if commit}}
+
+
+def sync_all_commits(branch_heads, get_new_commits, old_commits=None):
+    """
+    Updates all commits of repository by new commits of branches which heads moved.
+    Branches which heads equal to their newest known commits are not requested,
+    commits of removed branches are kept
+
+    :param branch_heads: dict - branch name to hash of its head commit
+    :param get_new_commits: function - takes branch name and its newest known commit or None,
+        returns list of parsed commits not reachable from it, the newest first,
+        or None if they can't be got
+    :param old_commits: dict - {'data', 'metadata'} to update or None to get all commits
+    :return: dict - {'data', 'metadata'} or None if commits of any branch can't be got
+    """
+    old_commits = old_commits or {'data': [], 'metadata': {}}
+
+    new_commits = {}
+    for branch_name, newest_commit in get_moved_branches(branch_heads, old_commits).items():
+        new_commits[branch_name] = get_new_commits(branch_name, newest_commit)
+        if new_commits[branch_name] is None:
+            return None
+
+    return update_all_commits(branch_heads, old_commits, new_commits)
+
+
+async def async_sync_all_commits(branch_heads, get_new_commits, old_commits=None):
+    """
+    Coroutine version of sync_all_commits for async senders,
+    new commits of moved branches are requested concurrently
+
+    :param branch_heads: dict - branch name to hash of its head commit
+    :param get_new_commits: coroutine function - see sync_all_commits
+    :param old_commits: dict - {'data', 'metadata'} to update or None to get all commits
+    :return: dict - {'data', 'metadata'} or None if commits of any branch can't be got
+    """
+    old_commits = old_commits or {'data': [], 'metadata': {}}
+
+    moved_branches = get_moved_branches(branch_heads, old_commits)
+    branches_commits = await asyncio.gather(*(
+        get_new_commits(branch_name, newest_commit)
+        for branch_name, newest_commit in moved_branches.items()))
+    if None in branches_commits:
+        return None
+
+    return update_all_commits(branch_heads, old_commits,
+                              dict(zip(moved_branches, branches_commits)))
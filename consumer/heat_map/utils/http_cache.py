@@ -0,0 +1,258 @@
+"""
+Contains ResponseCache class that stores responses of provider APIs on disk
+with their ETag/Last-Modified validators, so repeated requests are sent
+as conditional requests and 304 Not Modified responses are served from disk
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from heat_map.utils.request_status_codes import STATUS_CODE_OK
+
+# directory of cached responses
+CACHE_DIR = os.path.join(tempfile.gettempdir(), 'heat_map_http_cache')
+STATUS_CODE_NOT_MODIFIED = requests.codes.get('not_modified', 304)
+# response headers kept with cached body, needed by pagination and validation
+CACHED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Link',
+                  'X-Next-Page', 'X-Page', 'X-Total', 'X-Total-Pages')
+# cache is trimmed to this number of bytes by removing least recently used entries
+MAX_CACHE_BYTES = 256 * 1024 * 1024
+# seconds entry is kept after it was last used
+MAX_ENTRY_AGE = 7 * 24 * 60 * 60
+# number of stored responses between trims of cache
+TRIM_INTERVAL = 100
+
+
+def cache_key(url, params=None, token=None):
+    """
+    Gets key of cached response of GET request
+
+    :param url: string
+    :param params: dict - of request parameters
+    :param token: string - authorization of request, responses differ per token
+    :return: string - sha256 hex digest
+    """
+    key = json.dumps([url, sorted((params or {}).items()), token or ''], default=str)
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def to_response(entry, body, url):
+    """
+    Builds requests.Response from cached entry
+
+    :param entry: dict - metadata of cached response
+    :param body: bytes - content of cached response
+    :param url: string
+    :return: requests.Response
+    """
+    response = requests.Response()
+    response.status_code = entry['status_code']
+    response.headers = CaseInsensitiveDict(entry['headers'])
+    response._content = body  # pylint: disable=protected-access
+    response.encoding = 'utf-8'
+    response.url = url
+    return response
+
+
+class CacheStats:
+    """
+    Thread safe counters of cached responses: revalidated by 304 Not Modified and downloaded
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.not_modified = 0
+        self.misses = 0
+
+    def record(self, counter):
+        """
+        Increments one of counters
+
+        :param counter: string - 'not_modified' or 'misses'
+        """
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def as_dict(self):
+        """
+        Gets counters as dict
+
+        :return: dict
+        :Example:
+        {
+            "not_modified": 7,
+            "misses": 1
+        }
+        """
+        with self._lock:
+            return {
+                'not_modified': self.not_modified,
+                'misses': self.misses
+            }
+
+
+class ResponseCache:
+    """
+    Disk store of successful GET responses which have ETag or Last-Modified validator.
+    Every entry is kept in one file <key>.entry: line of JSON with validators and headers
+    followed by content, so validators and content are always replaced together.
+    Entries unused for max_age seconds and the least recently used entries
+    above max_bytes are removed
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=MAX_CACHE_BYTES, max_age=MAX_ENTRY_AGE):
+        assert isinstance(directory, str), 'Inputted "directory" type is not str'
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._stored = 0
+        os.makedirs(directory, exist_ok=True)
+        self.trim()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.entry')
+
+    def _write(self, key, entry, body):
+        """
+        Writes entry and body to one file atomically, so concurrent readers never see
+        partial file or validators of other body
+        """
+        file_descriptor, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(file_descriptor, 'wb') as temp_file:
+            temp_file.write(json.dumps(entry).encode('utf-8') + b'\n')
+            temp_file.write(body)
+        os.replace(temp_path, self._path(key))
+
+    def load(self, key):
+        """
+        Gets cached entry and its body
+
+        :param key: string
+        :return: tuple - (dict, bytes) or None if response is not cached
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as entry_file:
+                entry = json.loads(entry_file.readline().decode('utf-8'))
+                body = entry_file.read()
+            # time of the last use orders entries for trimming
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return entry, body
+
+    def trim(self):
+        """
+        Removes entries unused for max_age seconds, then the least recently used
+        entries until cache takes at most max_bytes
+        """
+        files = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+
+        oldest = time.time() - self.max_age
+        size = sum(file_size for _, file_size, _ in files)
+        for mtime, file_size, path in sorted(files):
+            if mtime >= oldest and size <= self.max_bytes:
+                break
+            if mtime >= oldest and path.endswith('.tmp'):
+                # entry being written by other thread
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            size -= file_size
+
+    def store(self, key, response):
+        """
+        Stores successful response which has validator
+
+        :param key: string
+        :param response: requests.Response
+        """
+        if response.status_code != STATUS_CODE_OK or not (
+                response.headers.get('ETag') or response.headers.get('Last-Modified')):
+            return
+        entry = {
+            'status_code': response.status_code,
+            'headers': {name: response.headers[name] for name in CACHED_HEADERS
+                        if name in response.headers}
+        }
+        self._write(key, entry, response.content)
+
+        with self._lock:
+            self._stored += 1
+            trim = self._stored % TRIM_INTERVAL == 0
+        if trim:
+            self.trim()
+
+    def refresh(self, key, entry, body, response):
+        """
+        Updates validators of entry revalidated by 304 Not Modified response
+
+        :param key: string
+        :param entry: dict - cached entry
+        :param body: bytes - cached content
+        :param response: requests.Response - 304 response
+        """
+        for name in ('ETag', 'Last-Modified'):
+            if name in response.headers:
+                entry['headers'][name] = response.headers[name]
+        self._write(key, entry, body)
+
+    def get(self, send, url, params=None, headers=None):
+        """
+        Sends conditional request with validators of cached response and serves cached body
+        if it is not modified. Cached responses are always revalidated, even within
+        Cache-Control max-age, so branch heads and commits are never stale
+
+        :param send: function - sends GET request, takes url, params and headers
+        :param url: string
+        :param params: dict - of request parameters
+        :param headers: dict - of request headers
+        :return: requests.Response
+        """
+        headers = dict(headers or {})
+        key = cache_key(url, params, headers.get('Authorization'))
+        cached = self.load(key)
+
+        if cached is not None:
+            entry, body = cached
+            if 'ETag' in entry['headers']:
+                headers['If-None-Match'] = entry['headers']['ETag']
+            if 'Last-Modified' in entry['headers']:
+                headers['If-Modified-Since'] = entry['headers']['Last-Modified']
+
+        response = send(url, params=params, headers=headers)
+
+        if cached is not None and response.status_code == STATUS_CODE_NOT_MODIFIED:
+            self.stats.record('not_modified')
+            self.refresh(key, entry, body, response)
+            return to_response(entry, body, url)
+
+        self.stats.record('misses')
+        self.store(key, response)
+        return response
+
+    def get_stats(self):
+        """
+        Gets hit/304/miss counters of cache
+
+        :return: dict
+        """
+        return self.stats.as_dict()
@@ -0,0 +1,232 @@
+"""
+Contains HttpTransport class that provides pooled keep-alive HTTP session
+shared by all request senders, with pool-hit/miss counters
+and optional conditional-request response cache and rate-limit-aware scheduler
+"""
+
+import threading
+from functools import partial
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from heat_map.utils.http_cache import ResponseCache
+from heat_map.utils.request_scheduler import RequestScheduler, INTERACTIVE
+
+# number of per-host connection pools kept by transport
+POOL_CONNECTIONS = 10
+# number of keep-alive connections kept open per host
+POOL_MAXSIZE = 10
+DEFAULT_HEADERS = {
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive'
+}
+
+
+class PoolStats:
+    """
+    Thread safe counters of connection checkouts and of fresh connections
+    opened by the pools of HttpTransport
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.new_connections = 0
+
+    def record_checkout(self):
+        """
+        Counts connection taken from pool to send request
+        """
+        with self._lock:
+            self.checkouts += 1
+
+    def record_new_connection(self):
+        """
+        Counts fresh TCP(+TLS) connection opened by pool
+        """
+        with self._lock:
+            self.new_connections += 1
+
+    def as_dict(self):
+        """
+        Gets counters as dict
+
+        :return: dict
+        :Example:
+        {
+            "requests": 10,
+            "pool_hits": 9,
+            "pool_misses": 1,
+            "reuse_ratio": 0.9
+        }
+        """
+        with self._lock:
+            checkouts = self.checkouts
+            misses = min(self.new_connections, checkouts)
+        hits = checkouts - misses
+        return {
+            'requests': checkouts,
+            'pool_hits': hits,
+            'pool_misses': misses,
+            'reuse_ratio': hits / checkouts if checkouts else 0.0
+        }
+
+
+def _counting_pool_class(pool_class, stats):
+    """
+    Creates subclass of urllib3 connection pool which reports
+    checkouts and new connections to given stats
+
+    :param pool_class: HTTPConnectionPool or HTTPSConnectionPool
+    :param stats: PoolStats
+    :return: class
+    """
+
+    class CountingConnection(pool_class.ConnectionCls):
+        """
+        Connection which counts every socket it opens
+        """
+
+        def connect(self):
+            stats.record_new_connection()
+            return super().connect()
+
+    class CountingPool(pool_class):
+        """
+        Connection pool which counts every connection checkout
+        """
+        ConnectionCls = CountingConnection
+
+        def _get_conn(self, timeout=None):
+            stats.record_checkout()
+            return super()._get_conn(timeout=timeout)
+
+    return CountingPool
+
+
+class CountingHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter which pools connections per host and reports pool usage to PoolStats
+    """
+
+    def __init__(self, stats, **kwargs):
+        # must be set before HTTPAdapter.__init__ calls init_poolmanager
+        self.stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):  # pylint: disable=arguments-differ
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _counting_pool_class(HTTPConnectionPool, self.stats),
+            'https': _counting_pool_class(HTTPSConnectionPool, self.stats)
+        }
+
+
+def get_limit_key(url, headers=None):
+    """
+    Gets key of rate limit the request counts against - provider host and token
+
+    :param url: string
+    :param headers: dict - of request headers
+    :return: tuple
+    """
+    headers = headers or {}
+    token = headers.get('Authorization') or headers.get('PRIVATE-TOKEN') or ''
+    return urlsplit(url).netloc, token
+
+
+class HttpTransport:
+    """
+    Pooled keep-alive HTTP transport used by request senders
+    instead of module-level requests functions.
+    GET requests go through ResponseCache and all requests are paced
+    by RequestScheduler if they are given
+    """
+
+    def __init__(self, pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE,
+                 cache=None, scheduler=None):
+        assert isinstance(pool_connections, int), 'Inputted "pool_connections" type is not int'
+        assert isinstance(pool_maxsize, int), 'Inputted "pool_maxsize" type is not int'
+        self.cache = cache
+        self.scheduler = scheduler
+        self.stats = PoolStats()
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        adapter = CountingHTTPAdapter(self.stats,
+                                      pool_connections=pool_connections,
+                                      pool_maxsize=pool_maxsize)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def _send(self, method, url, priority=INTERACTIVE, **kwargs):
+        """
+        Sends request through scheduler of transport if it is given
+
+        :param method: function - requests.Session method
+        :param url: string
+        :param priority: int - INTERACTIVE or BACKGROUND
+        :param kwargs: - other optional parameters of method
+        :return: requests.Response
+        """
+        send = partial(method, url, **kwargs)
+        if self.scheduler is None:
+            return send()
+        return self.scheduler.request(get_limit_key(url, kwargs.get('headers')), send, priority)
+
+    def get(self, url, params=None, priority=INTERACTIVE, **kwargs):
+        """
+        Sends GET request through pooled session
+
+        :param url: string
+        :param params: dict - of request parameters
+        :param priority: int - INTERACTIVE or BACKGROUND
+        :param kwargs: - other optional parameters of requests.Session.get
+        :return: requests.Response
+        """
+        if self.cache is None:
+            return self._send(self.session.get, url, priority, params=params, **kwargs)
+        headers = kwargs.pop('headers', None)
+        return self.cache.get(partial(self._send, self.session.get, priority=priority, **kwargs),
+                              url, params, headers)
+
+    def post(self, url, json=None, priority=INTERACTIVE, **kwargs):
+        """
+        Sends POST request through pooled session
+
+        :param url: string
+        :param json: - body of request serialized to JSON
+        :param priority: int - INTERACTIVE or BACKGROUND
+        :param kwargs: - other optional parameters of requests.Session.post
+        :return: requests.Response
+        """
+        return self._send(self.session.post, url, priority, json=json, **kwargs)
+
+    def get_stats(self):
+        """
+        Gets pool-hit/miss counters of transport
+
+        :return: dict
+        """
+        return self.stats.as_dict()
+
+    def get_cache_stats(self):
+        """
+        Gets hit/304/miss counters of response cache of transport
+
+        :return: dict or None if transport has no cache
+        """
+        return self.cache.get_stats() if self.cache is not None else None
+
+    def close(self):
+        """
+        Closes all pooled connections
+        """
+        self.session.close()
+
+
+# ! ! ! used to Import ! ! !
+# transport shared by all request senders of the process
+SHARED_TRANSPORT = HttpTransport(cache=ResponseCache(), scheduler=RequestScheduler())
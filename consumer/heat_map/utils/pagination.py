@@ -0,0 +1,131 @@
+"""
+Contains iterators over pages of paginated API responses which follow
+GitHub Link headers and GitLab X-Next-Page headers, the request of the next page
+is sent while the current page is handed to the caller
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from requests.utils import parse_header_links
+
+from heat_map.utils.request_status_codes import STATUS_CODE_OK
+
+# max number of items per page allowed by GitHub and GitLab API
+PER_PAGE = 100
+
+
+class PaginationError(Exception):
+    """
+        Exception class for page which response status is not OK
+    """
+    pass
+
+
+def github_next_page(response, url, params):  # pylint: disable=unused-argument
+    """
+    Gets request of the next page from Link header of GitHub API response,
+    url of the link keeps all parameters of the request
+
+    :param response: requests.Response or AsyncResponse
+    :param url: string - url of the current page
+    :param params: dict - parameters of the current page
+    :return: tuple - (url, params) or None if the current page is the last one
+    """
+    for link in parse_header_links(response.headers.get('Link', '')):
+        if link.get('rel') == 'next':
+            return link['url'], None
+    return None
+
+
+def gitlab_next_page(response, url, params):
+    """
+    Gets request of the next page from X-Next-Page header of GitLab API response
+
+    :param response: requests.Response or AsyncResponse
+    :param url: string - url of the current page
+    :param params: dict - parameters of the current page
+    :return: tuple - (url, params) or None if the current page is the last one
+    """
+    next_page = response.headers.get('X-Next-Page')
+    if not next_page:
+        return None
+    return url, dict(params or {}, page=next_page)
+
+
+def _check_page(response, url, params):
+    """
+    Raises PaginationError if response status of the page is not OK
+
+    :return: response
+    """
+    if response.status_code != STATUS_CODE_OK:
+        raise PaginationError(
+            f'Page {url} with parameters {params} failed with status {response.status_code}')
+    return response
+
+
+def iter_pages(http_get, url, params, next_page, prefetch=True, **kwargs):
+    """
+    Yields responses of all pages starting from url
+
+    :param http_get: function - sends GET request, takes url, params and kwargs
+    :param url: string - url of the first page
+    :param params: dict - parameters of the first page
+    :param next_page: function - github_next_page or gitlab_next_page
+    :param prefetch: bool - send request of the next page in background thread
+    :param kwargs: - other optional parameters of http_get
+    :return: generator - of responses
+    :raise PaginationError
+    """
+
+    def fetch(request):
+        return _check_page(http_get(request[0], params=request[1], **kwargs), *request)
+
+    request = (url, params)
+    if not prefetch:
+        while request is not None:
+            response = fetch(request)
+            request = next_page(response, *request)
+            yield response
+        return
+
+    with ThreadPoolExecutor(max_workers=1) as prefetcher:
+        future = prefetcher.submit(fetch, request)
+        while future is not None:
+            response = future.result()
+            request = next_page(response, *request)
+            # prefetch next page while the current one is parsed
+            future = prefetcher.submit(fetch, request) if request is not None else None
+            yield response
+
+
+async def aiter_pages(http_get, url, params, next_page, **kwargs):
+    """
+    Asynchronously yields responses of all pages starting from url,
+    see iter_pages
+
+    :param http_get: coroutine function - sends GET request, takes url, params and kwargs
+    :param url: string - url of the first page
+    :param params: dict - parameters of the first page
+    :param next_page: function - github_next_page or gitlab_next_page
+    :param kwargs: - other optional parameters of http_get
+    :return: async generator - of responses
+    :raise PaginationError
+    """
+
+    async def fetch(request):
+        return _check_page(await http_get(request[0], params=request[1], **kwargs), *request)
+
+    request = (url, params)
+    task = asyncio.ensure_future(fetch(request))
+    try:
+        while task is not None:
+            response = await task
+            request = next_page(response, *request)
+            # prefetch next page while the current one is parsed
+            task = asyncio.ensure_future(fetch(request)) if request is not None else None
+            yield response
+    finally:
+        if task is not None:
+            task.cancel()
@@ -0,0 +1,341 @@
+"""
+Contains RequestScheduler class which paces requests to provider APIs
+with token buckets per (provider, token), follows rate limit headers,
+honours Retry-After, retries failed requests with jittered exponential backoff
+(connection errors of background requests only)
+and lets interactive requests go before background ones
+"""
+
+import asyncio
+import heapq
+import itertools
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.exceptions import RequestException
+
+# priorities of requests, lower goes first
+INTERACTIVE = 0
+BACKGROUND = 1
+
+# requests per second and burst size of bucket until API reports its quota
+DEFAULT_RATE = 20.0
+DEFAULT_BURST = 20
+# remaining quota below which requests are spread evenly until quota reset
+LOW_QUOTA = 100
+MAX_RETRIES = 5
+# seconds of the first backoff and max backoff
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+# max seconds to wait for quota reset or Retry-After, longer waits fail fast
+MAX_RETRY_AFTER = 300.0
+
+STATUS_CODE_FORBIDDEN = requests.codes.get('forbidden', 403)
+STATUS_CODE_TOO_MANY_REQUESTS = requests.codes.get('too_many_requests', 429)
+# server errors worth retrying
+RETRY_STATUS_CODES = (500, 502, 503, 504)
+# rate limit headers of GitHub and Bitbucket (X-RateLimit-*) and GitLab (RateLimit-*)
+REMAINING_HEADERS = ('X-RateLimit-Remaining', 'RateLimit-Remaining')
+RESET_HEADERS = ('X-RateLimit-Reset', 'RateLimit-Reset')
+
+
+def backoff(attempt):
+    """
+    Gets jittered exponential backoff delay
+
+    :param attempt: int - number of failed attempt, starts from 0
+    :return: float - seconds
+    """
+    return min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+
+def _get_header(headers, names):
+    for name in names:
+        if headers.get(name) is not None:
+            return headers[name]
+    return None
+
+
+def get_retry_after(headers):
+    """
+    Gets delay requested by Retry-After header in seconds or in HTTP-date
+
+    :param headers: dict - of response headers
+    :return: float - seconds or None if header is absent
+    """
+    retry_after = headers.get('Retry-After')
+    if retry_after is None:
+        return None
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+def get_quota(headers):
+    """
+    Gets remaining quota and time of its reset from rate limit headers
+
+    :param headers: dict - of response headers
+    :return: tuple - (int remaining, float reset timestamp) or (None, None)
+    """
+    remaining = _get_header(headers, REMAINING_HEADERS)
+    reset = _get_header(headers, RESET_HEADERS)
+    try:
+        return int(remaining), float(reset)
+    except (TypeError, ValueError):
+        return None, None
+
+
+class TokenBucket:
+    """
+    Token bucket refilled with rate tokens per second up to burst tokens
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        # requests are paused until this moment, set by Retry-After or exhausted quota
+        self.blocked_until = 0.0
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now):
+        """
+        Gets seconds until token may be taken
+
+        :param now: float - time.monotonic()
+        :return: float
+        """
+        self._refill(now)
+        return max(self.blocked_until - now, (1 - self.tokens) / self.rate, 0.0)
+
+    def take(self):
+        """
+        Takes one token
+        """
+        self.tokens -= 1
+
+    def block(self, seconds):
+        """
+        Pauses taking tokens
+
+        :param seconds: float
+        """
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def set_quota(self, remaining, seconds_to_reset):
+        """
+        Slows bucket down to spread low remaining quota until its reset
+
+        :param remaining: int - number of requests left
+        :param seconds_to_reset: float
+        """
+        if remaining <= 0:
+            self.block(min(seconds_to_reset, MAX_RETRY_AFTER))
+        elif remaining < LOW_QUOTA:
+            self.rate = min(DEFAULT_RATE, remaining / max(seconds_to_reset, 1.0))
+        else:
+            self.rate = DEFAULT_RATE
+        self.tokens = min(self.tokens, remaining)
+
+
+def _wake(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class _Limiter:
+    """
+    Token bucket of one (provider, token) with queue of waiting requests by priority
+    """
+
+    def __init__(self):
+        self.bucket = TokenBucket()
+        self.condition = threading.Condition()
+        self.waiting = []
+        # (loop, future) of coroutines waiting for their turn, woken once by notify_all
+        self.async_waiters = []
+
+    def notify_all(self):
+        """
+        Wakes threads and coroutines waiting for queue change, condition must be held
+        """
+        self.condition.notify_all()
+        for loop, future in self.async_waiters:
+            loop.call_soon_threadsafe(_wake, future)
+        del self.async_waiters[:]
+
+
+class RequestScheduler:
+    """
+    Thread safe scheduler which all request senders submit requests to
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._limiters = {}
+        self._tickets = itertools.count()
+
+    def _get_limiter(self, key):
+        with self._lock:
+            limiter = self._limiters.get(key)
+            if limiter is None:
+                limiter = self._limiters[key] = _Limiter()
+            return limiter
+
+    def _acquire(self, limiter, priority):
+        """
+        Waits until the request is the first by priority and its bucket has token
+        """
+        ticket = (priority, next(self._tickets))
+        with limiter.condition:
+            heapq.heappush(limiter.waiting, ticket)
+            limiter.notify_all()
+            try:
+                while True:
+                    if limiter.waiting[0] == ticket:
+                        wait = limiter.bucket.wait_time(time.monotonic())
+                        if wait <= 0:
+                            limiter.bucket.take()
+                            return
+                        limiter.condition.wait(wait)
+                    else:
+                        limiter.condition.wait()
+            finally:
+                limiter.waiting.remove(ticket)
+                heapq.heapify(limiter.waiting)
+                limiter.notify_all()
+
+    async def _async_acquire(self, limiter, priority):
+        """
+        Waits without blocking event loop until the request is the first by priority
+        and its bucket has token, shares queue with requests of threads.
+        Coroutine sleeps until queue changes or, when it is the first, until token is refilled
+        """
+        loop = asyncio.get_event_loop()
+        ticket = (priority, next(self._tickets))
+        with limiter.condition:
+            heapq.heappush(limiter.waiting, ticket)
+            limiter.notify_all()
+        try:
+            while True:
+                with limiter.condition:
+                    wait = None
+                    if limiter.waiting[0] == ticket:
+                        wait = limiter.bucket.wait_time(time.monotonic())
+                        if wait <= 0:
+                            limiter.bucket.take()
+                            return
+                    future = loop.create_future()
+                    waiter = (loop, future)
+                    limiter.async_waiters.append(waiter)
+                try:
+                    await asyncio.wait([future], timeout=wait)
+                finally:
+                    with limiter.condition:
+                        if waiter in limiter.async_waiters:
+                            limiter.async_waiters.remove(waiter)
+        finally:
+            with limiter.condition:
+                limiter.waiting.remove(ticket)
+                heapq.heapify(limiter.waiting)
+                limiter.notify_all()
+
+    def _get_delay(self, limiter, response, attempt):
+        """
+        Updates bucket from rate limit headers of response
+        and gets delay before retry or None if response is final
+        """
+        remaining, reset = get_quota(response.headers)
+        if remaining is not None:
+            with limiter.condition:
+                limiter.bucket.set_quota(remaining, reset - time.time())
+
+        limited = response.status_code == STATUS_CODE_TOO_MANY_REQUESTS or (
+            response.status_code == STATUS_CODE_FORBIDDEN and remaining == 0)
+        if not limited and response.status_code not in RETRY_STATUS_CODES:
+            return None
+
+        delay = get_retry_after(response.headers)
+        if delay is None and limited and remaining == 0:
+            delay = max(0.0, reset - time.time())
+        if delay is None:
+            delay = backoff(attempt)
+        return delay if delay <= MAX_RETRY_AFTER else None
+
+    def request(self, key, send, priority=INTERACTIVE):
+        """
+        Sends request when its bucket allows, retries rate limit and server error responses.
+        Connection errors are retried for background requests only,
+        so interactive requests to unreachable host fail at once
+
+        :param key: tuple - (provider, token)
+        :param send: function - sends request and returns requests.Response
+        :param priority: int - INTERACTIVE or BACKGROUND
+        :return: requests.Response - last response
+        :raise RequestException - if interactive request or all attempts failed to connect
+        """
+        limiter = self._get_limiter(key)
+        attempt = 0
+        while True:
+            self._acquire(limiter, priority)
+            try:
+                response = send()
+            except RequestException:
+                if priority != BACKGROUND or attempt >= MAX_RETRIES:
+                    raise
+                time.sleep(backoff(attempt))
+                attempt += 1
+                continue
+
+            delay = self._get_delay(limiter, response, attempt)
+            if delay is None or attempt >= MAX_RETRIES:
+                return response
+            with limiter.condition:
+                limiter.bucket.block(delay)
+            attempt += 1
+
+    async def async_request(self, key, send, priority=INTERACTIVE, errors=(OSError,)):
+        """
+        Coroutine version of request for asynchronous senders,
+        requests of the same key share bucket and queue with synchronous ones
+
+        :param key: tuple - (provider, token)
+        :param send: coroutine function - sends request and returns response
+            with status_code and headers
+        :param priority: int - INTERACTIVE or BACKGROUND
+        :param errors: tuple - of connection error types of send,
+            retried for background requests only
+        :return: - last response
+        :raise errors - if interactive request or all attempts failed to connect
+        """
+        limiter = self._get_limiter(key)
+        attempt = 0
+        while True:
+            await self._async_acquire(limiter, priority)
+            try:
+                response = await send()
+            except errors:
+                if priority != BACKGROUND or attempt >= MAX_RETRIES:
+                    raise
+                await asyncio.sleep(backoff(attempt))
+                attempt += 1
+                continue
+
+            delay = self._get_delay(limiter, response, attempt)
+            if delay is None or attempt >= MAX_RETRIES:
+                return response
+            with limiter.condition:
+                limiter.bucket.block(delay)
+            attempt += 1
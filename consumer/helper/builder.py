@@ -4,14 +4,20 @@ This module provides a builder that returns instance of provider class
 from heat_map.request_sender.bitbucket_request_sender \
     import BitbucketRequestSender, BitbucketServerRequestSender
 from heat_map.request_sender.github_request_sender import GithubRequestSender
+from heat_map.request_sender.github_graphql_request_sender import GithubGraphQLRequestSender
 from heat_map.request_sender.gitlab_request_sender import GitLabRequestSender
 from heat_map.request_sender.gitlab_v3_request_sender_base import GitLabV3RequestSender
+from heat_map.request_sender.async_bitbucket_request_sender import AsyncBitbucketRequestSender
+from heat_map.request_sender.async_github_request_sender import AsyncGithubRequestSender
+from heat_map.request_sender.async_gitlab_request_sender import AsyncGitLabRequestSender
+from heat_map.request_sender.async_request_sender_base import SHARED_LOOP
 from general_helper.logger.log_error_decorators import try_except_decor
 
 
 class Builder:
     """
     This is a class builder that returns instance of provider depending on its git_client
+    and engine
     """
     clients = {
         'bitbucket': {
@@ -26,6 +32,27 @@ class Builder:
             '4': GithubRequestSender
         }
     }
+    async_clients = {
+        'bitbucket': {
+            '2': AsyncBitbucketRequestSender
+        },
+        'gitlab': {
+            '4': AsyncGitLabRequestSender
+        },
+        'github': {
+            '4': AsyncGithubRequestSender
+        }
+    }
+    graphql_clients = {
+        'github': {
+            '4': GithubGraphQLRequestSender
+        }
+    }
+    engines = {
+        'sync': clients,
+        'async': async_clients,
+        'graphql': graphql_clients
+    }
 
     @try_except_decor
     def __init__(self, **request_dict):
@@ -34,6 +61,7 @@ class Builder:
         self.repo = request_dict.get('repo', '')
         self.owner = request_dict.get('owner', '')
         self.token = request_dict.get('token', '')
+        self.engine = request_dict.get('engine', 'sync') or 'sync'
         self.provider = None
 
     @try_except_decor
@@ -43,7 +71,10 @@ class Builder:
         Note that GitHub provider takes token as a positional parameter
         :return: instance of provider class
         """
-        client = Builder.clients.get(self.git_client)
+        clients = Builder.engines.get(self.engine)
+        if not clients:
+            raise Exception(f"Couldn't match engine by the  given name {self.engine}")
+        client = clients.get(self.git_client)
         if not client:
             raise Exception(f"Couldn't match provider by the  given name {self.git_client}")
         client_version = client.get(self.version)
@@ -53,7 +84,11 @@ class Builder:
         args = [self.owner, self.repo]
         if self.git_client == "github":
             args.append(self.token)
-        self.provider = client_version(*args)
+        kwargs = {}
+        if self.engine == 'async':
+            # async senders reuse session of the shared event loop they are run on
+            kwargs['session'] = SHARED_LOOP.session
+        self.provider = client_version(*args, **kwargs)
         #
         # if self.git_client == 'bitbucket':
         #     if self.version == '1':
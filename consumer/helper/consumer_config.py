@@ -5,3 +5,7 @@ HOST = 'heatmaptraining_rabbit_1'  #'localhost'
 PORT = 5672  #8080
 REQUEST_QUEUE = "request"
 RESPONSE_QUEUE = "response"
+# number of worker threads executing requests in parallel
+WORKERS = 4
+# max number of unacknowledged requests delivered to consumer at once
+PREFETCH_COUNT = 4
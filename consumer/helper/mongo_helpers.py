@@ -5,6 +5,7 @@ Contains helper functions
 from functools import wraps
 import json
 from helper.mongodb_client import MongoDBClient
+from heat_map.utils.request_scheduler import BACKGROUND
 
 
 def mongo_store(worker_f):
@@ -29,6 +30,8 @@ def mongo_store(worker_f):
 
         if body['action'] == 'pull_repo':
 
+            # pulls yield API quota to interactive requests
+            body['priority'] = BACKGROUND
             mongo_client = MongoDBClient()
             key_nodes = {
                 'username': body['username'],
@@ -41,13 +44,18 @@ def mongo_store(worker_f):
             mongo_key = '-'.join(key_nodes.values())
             mongo_response = mongo_client.get_entry(mongo_key)
             if mongo_response:
-                # works only for bitbucket
+                # works for Bitbucket Cloud, GitHub and GitLab,
+                # only commits newer than stored heads of branches are requested
                 # NOTE: updating only commits info !!
-                mongo_response = mongo_response.get('value')
+                old_commits = mongo_response['value']['commits']
 
                 body['action'] = 'get_updated_all_commits'
-                body['old_commits'] = mongo_response['commits']
-                mongo_response['commits'] = worker_f(**body)
+                body['old_commits'] = old_commits
+                updated_commits = worker_f(**body)
+                # stored commits are kept if update failed,
+                # otherwise only new commits and new branches of commits are written
+                if updated_commits is not None:
+                    mongo_client.set_commits(mongo_key, updated_commits, old_commits)
                 # just to notify the user
                 response = {'message': f'Successfully updated repository!'}
             else:
@@ -58,10 +66,9 @@ def mongo_store(worker_f):
                                     ('get_contributors', 'contributors')]:
                     body['action'] = action
                     mongo_response[key] = worker_f(**body)
+                mongo_client.set_entry(mongo_key, mongo_response)
                 response = {'message': f'Successfully pulled repository down!'}
 
-            mongo_client.set_entry(mongo_key, mongo_response)
-
         else:
             response = worker_f(**body)
 
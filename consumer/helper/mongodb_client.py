@@ -1,51 +1,327 @@
 """
     Provides class MongoDBRequestSender
 """
-from pymongo.errors import ConnectionFailure
+from pymongo.errors import OperationFailure
 
-from pymongo import MongoClient
-from helper.mongodb_client_config import MONGO_HOST, MONGO_PORT
+from pymongo import MongoClient, ASCENDING, DESCENDING, UpdateOne, DeleteOne
+from general_helper.mongodb.client_registry import REGISTRY
+from helper.mongodb_client_config import MONGO_HOST, MONGO_PORT, MONGO_CLIENT_OPTIONS, \
+    REPOS_COLLECTION, COMMITS_COLLECTION, BULK_WRITE_BATCH, HEATMAP_COLLECTION, \
+    HEATMAP_BUCKET_SECONDS
+
+# fields of commit document besides repository key, hash and branches
+COMMIT_FIELDS = ('author', 'message', 'date')
+
+
+def get_changed_commits(commits, old_commits=None):
+    """
+    Gets commits which are new or belong to branches they didn't belong to before
+
+    :param commits: list - of commits with key 'branches'
+    :param old_commits: list - of stored commits with key 'branches'
+    :return: list - of (commit, list of new branches names) tuples
+    """
+    old_branches = {commit['hash']: set(commit.get('branches', []))
+                    for commit in old_commits or []}
+    changed_commits = []
+    for commit in commits:
+        branches = commit.get('branches', [])
+        known_branches = old_branches.get(commit['hash'])
+        if known_branches is None:
+            changed_commits.append((commit, branches))
+            continue
+        new_branches = [branch for branch in branches if branch not in known_branches]
+        if new_branches:
+            changed_commits.append((commit, new_branches))
+    return changed_commits
+
+
+def to_commit_update(key, commit, branches):
+    """
+    Gets upsert of commit document, fields are set only when commit is inserted,
+    branches are added atomically to branches of stored commit
+
+    :param key: str - key of repository
+    :param commit: dict - parsed commit
+    :param branches: list - of branches names to add
+    :return: UpdateOne
+    """
+    fields = {field: commit[field] for field in COMMIT_FIELDS if field in commit}
+    if 'date' in fields:
+        # dates of Bitbucket commits are parsed as strings, int dates are matched
+        # by range queries served by index of commits by date
+        fields['date'] = int(fields['date'])
+    return UpdateOne(
+        {'repo_key': key, 'hash': commit['hash']},
+        {
+            '$setOnInsert': fields,
+            '$addToSet': {'branches': {'$each': branches}}
+        },
+        upsert=True)
+
+
+def get_heatmap_pipeline(key, bucket_seconds):
+    """
+    Gets aggregation pipeline counting commits of repository by author and date bucket
+
+    :param key: str - key of repository
+    :param bucket_seconds: int - seconds in date bucket
+    :return: list - of pipeline stages
+    """
+    date = '$date'
+    return [
+        {'$match': {'repo_key': key}},
+        {'$group': {
+            '_id': {
+                'author': '$author',
+                'date': {'$subtract': [date, {'$mod': [date, bucket_seconds]}]}
+            },
+            'count': {'$sum': 1},
+            'first_date': {'$min': date}
+        }},
+        {'$project': {'_id': 0, 'repo_key': key, 'bucket_seconds': {'$literal': bucket_seconds},
+                      'author': '$_id.author', 'date': '$_id.date', 'count': 1,
+                      'first_date': 1}}
+    ]
+
+
+def to_counter_updates(key, commits):
+    """
+    Gets increments of heatmap counters by commits, counters of every bucket size
+    are incremented once per (author, date bucket)
+
+    :param key: str - key of repository
+    :param commits: list - of inserted commits
+    :return: list - of UpdateOne
+    """
+    counters = {}
+    for commit in commits:
+        date = int(commit['date'])
+        for bucket_seconds in HEATMAP_BUCKET_SECONDS:
+            counter_key = (bucket_seconds, commit['author'], date - date % bucket_seconds)
+            count, first_date = counters.get(counter_key, (0, date))
+            counters[counter_key] = (count + 1, min(first_date, date))
+
+    return [
+        UpdateOne(
+            {'repo_key': key, 'bucket_seconds': bucket_seconds, 'author': author, 'date': date},
+            {'$inc': {'count': count}, '$min': {'first_date': first_date}},
+            upsert=True)
+        for (bucket_seconds, author, date), (count, first_date) in counters.items()
+    ]
+
+
+def to_counter_sets(key, counters):
+    """
+    Gets idempotent upserts of heatmap counters recounted from all commits,
+    so concurrent rebuilds of the same repository write the same counters
+
+    :param key: str - key of repository
+    :param counters: list - of dicts with keys bucket_seconds, author, date,
+        count and first_date
+    :return: list - of UpdateOne
+    """
+    return [
+        UpdateOne(
+            {'repo_key': key, 'bucket_seconds': counter['bucket_seconds'],
+             'author': counter['author'], 'date': counter['date']},
+            {'$set': {'count': counter['count'], 'first_date': counter['first_date']}},
+            upsert=True)
+        for counter in counters
+    ]
+
+
+def convert_commit_dates(client):
+    """
+    Converts string dates of commits stored by previous versions to int
+
+    :param client: MongoClient
+    """
+    commits_collection = client.heatmap_db[COMMITS_COLLECTION]
+    updates = [UpdateOne({'_id': commit['_id']}, {'$set': {'date': int(commit['date'])}})
+               for commit in commits_collection.find({'date': {'$type': 'string'}},
+                                                     {'_id': 1, 'date': 1})]
+    for start in range(0, len(updates), BULK_WRITE_BATCH):
+        commits_collection.bulk_write(updates[start:start + BULK_WRITE_BATCH], ordered=False)
+
+
+def prepare_database(client):
+    """
+    Creates indexes and converts data stored by previous versions,
+    called once for every client created by registry
+
+    :param client: MongoClient
+    """
+    create_indexes(client)
+    convert_commit_dates(client)
+
+
+def create_indexes(client):
+    """
+    Creates unique indexes of repositories and commits, and index of commits by date
+
+    :param client: MongoClient
+    """
+    database = client.heatmap_db
+    database[COMMITS_COLLECTION].create_index([('repo_key', ASCENDING), ('hash', ASCENDING)],
+                                              unique=True)
+    database[COMMITS_COLLECTION].create_index([('repo_key', ASCENDING), ('date', DESCENDING)])
+    database[HEATMAP_COLLECTION].create_index([('repo_key', ASCENDING),
+                                               ('bucket_seconds', ASCENDING),
+                                               ('author', ASCENDING), ('date', ASCENDING)],
+                                              unique=True)
+    try:
+        database[REPOS_COLLECTION].create_index('key', unique=True)
+    except OperationFailure:
+        # duplicates of key stored by previous versions
+        print('Repos collection has duplicated keys, unique index is not created')
 
 
 class MongoDBClient:
     """
     Provides interface for hashing and sending requests
-    to MongoDB database
+    to MongoDB database.
+    Repository is stored as document in repos collection without commits
+    and documents of its commits in commits collection.
+    Counters of commits by author and date bucket are kept up to date
+    with commits in heatmap collection
     """
 
     def __init__(self, base_client=MongoClient, host=MONGO_HOST, port=MONGO_PORT):
 
-        # declare connection
-        self._client = base_client(host, port)
-        print('connecting to mongo')
-        # connects to mongo for 30 seconds
-        try:
-            # The ismaster command is cheap and does not require auth.
-            self._client.admin.command('ismaster')
-        except ConnectionFailure:
-            print("Server not available")
-
-        print('Successfully connected MongoDB!')
+        # client and its pool of connections are shared by all jobs of process
+        self._client = REGISTRY.get_client(host, port, base_client, setup=prepare_database,
+                                           **MONGO_CLIENT_OPTIONS)
 
         self._database = self._client.heatmap_db
-        self._collection = self._database.repos_collection
+        self._collection = self._database[REPOS_COLLECTION]
+        self._commits_collection = self._database[COMMITS_COLLECTION]
+        self._heatmap_collection = self._database[HEATMAP_COLLECTION]
+
+    def get_commits(self, key):
+        """
+        Gets commits of repository sorted by date in reverse order
+
+        :param key: str
+        :return: list of dicts
+        """
+        assert isinstance(key, str), 'MongoDBClient.get_commits(key): key is not of type str'
+
+        return list(self._commits_collection.find({'repo_key': key}, {'_id': 0, 'repo_key': 0})
+                    .sort('date', DESCENDING))
 
     def get_entry(self, key):
         """
-        Tries to find response in repos collection
+        Tries to find response in repos collection,
+        commits of repository are added to value of document
 
         :param key: str
         :return: None or document from mongo
         """
         assert isinstance(key, str), 'MongoDBClient.get_entry(key): key is not of type str'
 
-        return self._collection.find_one({"key": key})
+        # the latest one of documents stored by previous versions with duplicated keys
+        document = self._collection.find_one({"key": key}, sort=[('_id', DESCENDING)])
+        if document is None:
+            return None
+
+        # documents stored by previous versions keep commits inside, they are moved
+        # to commits collection, so further updates write only changed commits
+        if 'commits' in document['value']:
+            self._collection.delete_many({'key': key, '_id': {'$ne': document['_id']}})
+            self.set_entry(key, dict(document['value']))
+            return document
+
+        metadata = document['value'].pop('commits_metadata')
+        document['value']['commits'] = None if metadata is None else {
+            'data': self.get_commits(key),
+            'metadata': metadata
+        }
+        return document
+
+    def _write(self, collection, updates):
+        """
+        Sends updates by batches of bulk_write
+
+        :param collection: Collection
+        :param updates: list - of write operations
+        :return: list - of indexes of updates which inserted documents
+        """
+        upserted = []
+        for start in range(0, len(updates), BULK_WRITE_BATCH):
+            result = collection.bulk_write(updates[start:start + BULK_WRITE_BATCH],
+                                           ordered=False)
+            upserted.extend(start + index for index in result.upserted_ids)
+        return upserted
+
+    def rebuild_heatmap(self, key):
+        """
+        Recounts heatmap counters of repository from all its commits
+
+        :param key: str
+        """
+        assert isinstance(key, str), 'MongoDBClient.rebuild_heatmap(key): key is not of type str'
+
+        # counters are overwritten in place and only buckets without commits are deleted,
+        # so readers never see empty heatmap and overlapping rebuilds don't conflict
+        for bucket_seconds in HEATMAP_BUCKET_SECONDS:
+            counters = list(self._commits_collection.aggregate(
+                get_heatmap_pipeline(key, bucket_seconds)))
+            self._write(self._heatmap_collection, to_counter_sets(key, counters))
+
+            buckets = {(counter['author'], counter['date']) for counter in counters}
+            stored_buckets = self._heatmap_collection.find(
+                {'repo_key': key, 'bucket_seconds': bucket_seconds},
+                {'_id': 0, 'author': 1, 'date': 1})
+            self._write(self._heatmap_collection, [
+                DeleteOne({'repo_key': key, 'bucket_seconds': bucket_seconds,
+                           'author': bucket['author'], 'date': bucket['date']})
+                for bucket in stored_buckets if (bucket['author'], bucket['date']) not in buckets
+            ])
+
+    def set_commits(self, key, commits, old_commits=None):
+        """
+        Writes commits which changed since old commits by bulk upserts,
+        increments heatmap counters by inserted commits
+        and replaces metadata of commits of repository
+
+        :param key: str
+        :param commits: dict - {'data', 'metadata'} of all commits of repository
+        :param old_commits: dict - {'data', 'metadata'} of stored commits or None
+        :return: int - number of written commits
+        """
+        assert isinstance(key, str), 'MongoDBClient.set_commits(key, commits):' \
+                                     ' key is not of type str'
+        assert isinstance(commits, dict), 'MongoDBClient.set_commits(key, commits):' \
+                                          ' commits is not of type dict'
+
+        changed_commits = get_changed_commits(commits['data'], (old_commits or {}).get('data'))
+        updates = [to_commit_update(key, commit, branches) for commit, branches in changed_commits]
+        upserted = self._write(self._commits_collection, updates)
+
+        materialized = self._collection.find_one(
+            {'key': key, 'value.heatmap_materialized': True}, {'_id': 1})
+        if materialized:
+            # only commits inserted by this write are counted,
+            # so commits written by concurrent pulls are counted once
+            self._write(self._heatmap_collection, to_counter_updates(
+                key, [changed_commits[index][0] for index in upserted]))
+        else:
+            self.rebuild_heatmap(key)
+
+        self._collection.update_one({'key': key},
+                                    {'$set': {'value.commits_metadata': commits['metadata'],
+                                              'value.heatmap_materialized': True}},
+                                    upsert=True)
+        return len(updates)
 
     def set_entry(self, key, entry):
         """
-        Adds hash of the request to MongoDB database
-        :param body:
-        :param response:
+        Adds hash of the request to MongoDB database,
+        repository document is replaced and commits are upserted
+
+        :param key: str
+        :param entry: dict - with keys 'repo', 'commits', 'branches', 'contributors'
         :return:
         """
         assert isinstance(key, str), 'MongoDBClient.set_entry(key, entry): key is not of type str'
@@ -53,16 +329,15 @@ class MongoDBClient:
                                         ' entry is not of type dict'
 
         print()
-        print('inserting into collections with key :')
+        print('upserting into collections with key :')
         print(key)
         print()
 
-        print("Inserted successfully with id:")
-        print(
-            self._collection.insert_one(
-                {
-                    "key": key,
-                    "value": entry
-                }
-            ).inserted_id
-        )
+        value = {name: item for name, item in entry.items()
+                 if name not in ('commits', 'heatmap_materialized')}
+        commits = entry.get('commits')
+        value['commits_metadata'] = commits['metadata'] if commits else None
+        self._collection.replace_one({"key": key}, {"key": key, "value": value}, upsert=True)
+
+        if commits:
+            print("Upserted commits:", self.set_commits(key, commits))
@@ -4,3 +4,22 @@
 
 MONGO_HOST = 'heatmaptraining_mongo_1'  # 'localhost'
 MONGO_PORT = 27017
+# options of client shared by process, see general_helper.mongodb.client_registry,
+# connection is made on the first request
+MONGO_CLIENT_OPTIONS = {
+    'connect': False,
+    'maxPoolSize': 10,
+    'minPoolSize': 0,
+    'serverSelectionTimeoutMS': 30000
+}
+# repository metadata, branches and contributors, one document per repository key
+REPOS_COLLECTION = 'repos_collection'
+# commits, one document per (repository key, hash of commit)
+COMMITS_COLLECTION = 'commits_collection'
+# max number of write operations sent to MongoDB by one bulk_write
+BULK_WRITE_BATCH = 1000
+# materialised heatmap counters, one document per
+# (repository key, bucket size, author, start of date bucket)
+HEATMAP_COLLECTION = 'heatmap_collection'
+# sizes in seconds of date buckets counters are kept for: day and hour
+HEATMAP_BUCKET_SECONDS = (24 * 60 * 60, 60 * 60)
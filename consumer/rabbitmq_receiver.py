@@ -2,8 +2,11 @@
     Consumes requests from provider(sender), sends result to provider(sender)
 """
 
+import inspect
 import json
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 import pika
 import pika.exceptions
 
@@ -17,18 +20,24 @@ from general_helper.logger.log_error_decorators import try_except_decor
 # from helper.redis_request_sender import RedisRequestSender
 # from helper.mongodb_request_sender import MongoDBRequestSender
 from helper.builder import Builder
-from helper.consumer_config import HOST, PORT, REQUEST_QUEUE, RESPONSE_QUEUE
+from helper.consumer_config import HOST, PORT, REQUEST_QUEUE, RESPONSE_QUEUE, \
+    WORKERS, PREFETCH_COUNT
 from helper.mongo_helpers import mongo_store
+from heat_map.utils.http_transport import SHARED_TRANSPORT
+from heat_map.utils.request_scheduler import INTERACTIVE
+from heat_map.request_sender.async_request_sender_base import run_until_complete
 
 
 class RabbitMQReceiver:
     """
     This class consumes a request from the 'sender', receives an API response
-and     and sends the result back to the provider
+and     and sends the result back to the provider.
+    Requests are executed by pool of worker threads, while channel is used
+    only by the thread of connection
     """
 
     @try_except_decor
-    def __init__(self):
+    def __init__(self, workers=WORKERS, prefetch_count=PREFETCH_COUNT):
 
         LOG.debug('Connecting to RabbitMQ...')
         retries = 30
@@ -50,17 +59,24 @@ and     and sends the result back to the provider
                 time.sleep(1)
         LOG.debug('Successfully connected to RabbitMQ!')
 
+        self.connection = connection
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+
         channel.queue_declare(queue=REQUEST_QUEUE)
         channel.queue_declare(queue=RESPONSE_QUEUE)
 
         LOG.debug(' [*] Waiting for request...')
 
-        # declare consuming
-        # CHANNEL.basic_qos(prefetch_count=1)
+        # declare consuming, at most 'prefetch_count' requests
+        # are delivered and not acknowledged at once
+        channel.basic_qos(prefetch_count=prefetch_count)
         channel.basic_consume(self.callback, no_ack=False, queue=REQUEST_QUEUE)
 
         # start waiting for request from provider(sender)
-        channel.start_consuming()
+        try:
+            channel.start_consuming()
+        finally:
+            self.executor.shutdown(wait=True)
 
     @staticmethod
     @try_except_decor
@@ -75,18 +91,15 @@ and     and sends the result back to the provider
         :param body: encoded str - request string
         :return: (dict or list) - response to the required API request
         """
-
-        print('-----------body-----------')
-        print(body)
-        print('-----------body-----------')
-
         action = body.pop('action')
+        priority = body.pop('priority', INTERACTIVE)
         commit_hash = body.pop('hash')
         branch_name = body.pop('branch')
         if action == 'get_updated_all_commits':
             old_commits = body.pop('old_commits')
 
         with Builder(**body) as obj:
+            obj.priority = priority
             methods = {
                 # methods available for all git providers
                 'get_repo': obj.get_repo,
@@ -96,7 +109,7 @@ and     and sends the result back to the provider
                 'get_commit_by_hash': obj.get_commit_by_hash,
                 'get_contributors': obj.get_contributors,
 
-                # methods available for Bitbucket only
+                # methods available for Bitbucket Cloud, GitHub and GitLab only
                 'get_updated_all_commits':
                     obj.get_updated_all_commits if
                     hasattr(obj, 'get_updated_all_commits') else None,
@@ -112,29 +125,61 @@ and     and sends the result back to the provider
                 response = methods[action](old_commits)
             else:
                 response = methods[action]()
-            print('------------response----------------')
-            print(response)
-            print('------------response----------------')
+
+            # methods of async engine senders return coroutines run on the shared loop thread
+            if inspect.isawaitable(response):
+                response = run_until_complete(obj, response)
 
         return response
 
     @try_except_decor
     def callback(self, channel, method, props, body):
         """
-            Consumes request from provider(sender)
-        :param channel: unused param
-        :param method: unused param
-        :param props: unused param
+            Consumes request from provider(sender) and hands it to worker thread,
+            so slow requests do not block the next ones
+        :param channel: channel of the request
+        :param method: delivery of the request
+        :param props: properties of the request
         :param body: received message
         :return:
         """
 
         LOG.debug(f'[x] Received request: %s', body)
 
+        self.executor.submit(self.process, channel, method, props, body)
+
+    @try_except_decor
+    def process(self, channel, method, props, body):
+        """
+            Runs in worker thread, gets API response by 'worker' function and
+            schedules sending it to provider(sender) in the thread of connection
+        :param channel: channel of the request
+        :param method: delivery of the request
+        :param props: properties of the request
+        :param body: received message
+        :return:
+        """
+
         # uses 'worker' function to get API response
         # and sends it to provider(sender)
         response = self.worker(body)  # pylint: disable = too-many-function-args
 
+        # channel is not thread safe, it is used only by the thread of connection
+        self.connection.add_callback_threadsafe(
+            partial(self.reply, channel, method, props, response))
+
+    @try_except_decor
+    def reply(self, channel, method, props, response):
+        """
+            Runs in the thread of connection, sends response to provider(sender)
+            and acknowledges the request
+        :param channel: channel of the request
+        :param method: delivery of the request
+        :param props: properties of the request
+        :param response: response to the request
+        :return:
+        """
+
         # Sends the result back to the sender
         channel.basic_publish(exchange='',
                               routing_key=props.reply_to,
@@ -142,6 +187,8 @@ and     and sends the result back to the provider
                               body=json.dumps(response))
 
         LOG.debug(f'[x] Sent response: %s', response)
+        LOG.debug('HTTP connection pool stats: %s', SHARED_TRANSPORT.get_stats())
+        LOG.debug('HTTP response cache stats: %s', SHARED_TRANSPORT.get_cache_stats())
 
         # used to tell the server that message was properly handled
         channel.basic_ack(delivery_tag=method.delivery_tag)
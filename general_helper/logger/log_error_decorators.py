@@ -34,3 +34,32 @@ def try_except_decor(func):
             return None
 
     return wrapper
+
+
+def async_try_except_decor(func):
+    """
+        Decorator that awaits coroutine function in 'try-except' way,
+        returns function result or None with forwarding
+        error message to log center.
+
+    :param func: coroutine function to decorate
+    :return: function object - decorated coroutine function
+    """
+
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        """
+            Wrapper for decorator.
+
+        :param args:
+        :param kwargs:
+        :return:
+        """
+        try:
+            return await func(*args, **kwargs)
+
+        except Exception as exc:  # pylint: disable=broad-except
+            LOG.error('message from async_try_except_decor', exc_info=exc)
+            return None
+
+    return wrapper
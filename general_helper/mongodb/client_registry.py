@@ -0,0 +1,173 @@
+"""
+    Provides process-wide registry of MongoDB clients.
+    Every client keeps pool of connections, so one client per server and options
+    is shared by all requests and jobs of process instead of connecting on each of them
+"""
+
+import atexit
+import logging
+import os
+import threading
+import time
+
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+from general_helper.mongodb.client_registry_config import HEALTH_CHECK_INTERVAL
+
+LOG = logging.getLogger(__name__)
+
+
+class _Entry:
+    """
+    Client kept by registry with time of its last health check
+    """
+
+    def __init__(self, key, client):
+        self.key = key
+        self.client = client
+        # the first check is made after interval, so connection stays lazy
+        self.checked_at = time.monotonic()
+        # setup of client runs once, outside of lock of registry
+        self.initialised = False
+        self.setup_lock = threading.Lock()
+
+
+class MongoClientRegistry:
+    """
+    Creates clients lazily and keeps them until process exits.
+    Clients inherited from parent process are dropped after fork,
+    as pymongo clients are not fork-safe.
+    Client of server which fails health check is evicted, so the next caller
+    gets new client
+    """
+
+    def __init__(self, health_check_interval=HEALTH_CHECK_INTERVAL):
+        self.health_check_interval = health_check_interval
+        self._reset()
+
+    def _reset(self):
+        """
+        Forgets all clients, sockets of clients of parent process are not closed
+        """
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        # key of client to _Entry
+        self._clients = {}
+
+    def _get_entry(self, host, port, base_client, setup, options):
+        """
+        Gets registry entry of client, creates client if there is no such one.
+        Client is set up by the first caller while other callers of the same client wait,
+        callers of other clients are not blocked
+
+        :return: _Entry
+        """
+        if self._pid != os.getpid():
+            self._reset()
+
+        key = (base_client, host, port, tuple(sorted(options.items())))
+        with self._lock:
+            entry = self._clients.get(key)
+            if entry is None:
+                LOG.info('Creating MongoDB client of %s:%s', host, port)
+                entry = self._clients[key] = _Entry(key, base_client(host, port, **options))
+
+        if setup is not None and not entry.initialised:
+            with entry.setup_lock:
+                if not entry.initialised:
+                    setup(entry.client)
+                    entry.initialised = True
+        return entry
+
+    def _is_check_due(self, entry):
+        """
+        Checks whether client needs health check and marks it checked
+
+        :param entry: _Entry
+        :return: bool
+        """
+        now = time.monotonic()
+        with self._lock:
+            if now - entry.checked_at < self.health_check_interval:
+                return False
+            entry.checked_at = now
+        return True
+
+    def _evict(self, entry, exc):
+        """
+        Removes client which failed health check and closes it
+
+        :param entry: _Entry
+        :param exc: PyMongoError - error of health check
+        """
+        LOG.warning('MongoDB server %s:%s is not available, client is evicted: %s',
+                    entry.key[1], entry.key[2], exc)
+        with self._lock:
+            if self._clients.get(entry.key) is entry:
+                del self._clients[entry.key]
+        entry.client.close()
+
+    def get_client(self, host, port, base_client=MongoClient, setup=None, **options):
+        """
+        Gets shared client of server, health of server is checked once in interval
+
+        :param host: str
+        :param port: int
+        :param base_client: class - of client, e.g. MongoClient
+        :param setup: function - takes client, called once after client is created,
+            e.g. to create indexes
+        :param options: - keyword options of client, e.g. maxPoolSize
+        :return: client
+        :raise PyMongoError: if server failed health check, client is evicted
+        """
+        entry = self._get_entry(host, port, base_client, setup, options)
+        if self._is_check_due(entry):
+            try:
+                # The ismaster command is cheap and does not require auth.
+                entry.client.admin.command('ismaster')
+            except PyMongoError as exc:
+                self._evict(entry, exc)
+                raise
+        return entry.client
+
+    async def get_async_client(self, host, port, base_client, setup=None, **options):
+        """
+        Gets shared asynchronous client of server, e.g. motor AsyncIOMotorClient,
+        health of server is checked once in interval without blocking event loop
+
+        :param host: str
+        :param port: int
+        :param base_client: class - of asynchronous client
+        :param setup: function - takes client, called once after client is created
+        :param options: - keyword options of client
+        :return: client
+        :raise PyMongoError: if server failed health check, client is evicted
+        """
+        entry = self._get_entry(host, port, base_client, setup, options)
+        if self._is_check_due(entry):
+            try:
+                await entry.client.admin.command('ismaster')
+            except PyMongoError as exc:
+                self._evict(entry, exc)
+                raise
+        return entry.client
+
+    def close_all(self):
+        """
+        Closes all clients of process
+        """
+        if self._pid != os.getpid():
+            self._reset()
+            return
+        with self._lock:
+            clients = [entry.client for entry in self._clients.values()]
+            self._clients = {}
+        for client in clients:
+            client.close()
+
+
+# ! ! ! used to Import ! ! !
+# registry shared by process
+REGISTRY = MongoClientRegistry()
+atexit.register(REGISTRY.close_all)
@@ -0,0 +1,6 @@
+"""
+Contains configuration variables for MongoClientRegistry
+"""
+# seconds between health checks of shared client, checks are made
+# when client is taken from registry
+HEALTH_CHECK_INTERVAL = 30
@@ -20,7 +20,9 @@ from app.models.user import User
 
 
 DATABASE_URL = app.config['DATABASE_URL']
-ENGINE = create_engine(DATABASE_URL)
+# queries are run by threads of app.helpers.db_executor, one connection per thread
+ENGINE = create_engine(DATABASE_URL, pool_size=app.config['DATABASE_POOL_SIZE'],
+                       max_overflow=0)
 
 # Session to be used throughout app.
 SESSION = sessionmaker(bind=ENGINE, expire_on_commit=False)
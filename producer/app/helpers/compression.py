@@ -0,0 +1,65 @@
+"""
+Module contains helper functions for sending JSON responses
+compressed by encoding negotiated with Accept-Encoding header
+"""
+
+import gzip
+import json
+
+from sanic.response import raw
+
+try:
+    import brotli
+except ImportError:
+    # brotli is optional, responses are compressed by gzip without it
+    brotli = None
+
+# responses smaller than this number of bytes are not compressed
+MIN_COMPRESS_SIZE = 1024
+GZIP_LEVEL = 6
+
+
+def get_encoding(accept_encoding):
+    """
+    Chooses supported encoding accepted by client, brotli is preferred to gzip
+
+    :param accept_encoding: str - value of Accept-Encoding header
+    :return: str - 'br', 'gzip' or None
+    """
+    accepted = set()
+    for item in accept_encoding.split(','):
+        name, _, params = item.strip().partition(';')
+        if params.replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            continue
+        accepted.add(name.strip().lower())
+
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted or '*' in accepted:
+        return 'gzip'
+    return None
+
+
+def compressed_json(request, body, status=200):
+    """
+    Serializes body to JSON and compresses it if client accepts compression
+
+    :param request: sanic request
+    :param body: - serializable to JSON
+    :param status: int
+    :return: sanic response
+    """
+    data = json.dumps(body, separators=(',', ':')).encode('utf-8')
+    headers = {'Vary': 'Accept-Encoding'}
+
+    encoding = None
+    if len(data) >= MIN_COMPRESS_SIZE:
+        encoding = get_encoding(request.headers.get('Accept-Encoding', ''))
+    if encoding == 'br':
+        data = brotli.compress(data)
+    elif encoding == 'gzip':
+        data = gzip.compress(data, GZIP_LEVEL)
+    if encoding is not None:
+        headers['Content-Encoding'] = encoding
+
+    return raw(data, status=status, headers=headers, content_type='application/json')
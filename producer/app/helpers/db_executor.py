@@ -0,0 +1,31 @@
+"""
+Module contains bounded executor running synchronous SQLAlchemy queries
+outside of event loop of the server
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial, wraps
+
+from app import app
+
+# one thread per connection of engine pool, so queries don't wait for connections
+DB_EXECUTOR = ThreadPoolExecutor(max_workers=app.config['DATABASE_POOL_SIZE'])
+
+
+def run_in_db_executor(func):
+    """
+    Decorator which makes function with blocking database queries a coroutine
+    function with the same signature, awaiting it runs function in DB_EXECUTOR.
+    Results of function must be loaded before its session is closed
+
+    :param func: function
+    :return: coroutine function
+    """
+
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(DB_EXECUTOR, partial(func, *args, **kwargs))
+
+    return wrapper
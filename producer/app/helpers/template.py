@@ -2,9 +2,20 @@
 Module contains helper functions for rendering templates
 """
 
+import hashlib
 import os
-from sanic.response import html
-from jinja2 import Template
+from sanic.response import html, HTTPResponse
+from jinja2 import Environment, FileSystemLoader
+
+from app import app
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'templates')
+# loads and compiles every template once, with auto reload templates are
+# compiled again when modification time of their file changes
+ENVIRONMENT = Environment(loader=FileSystemLoader(TEMPLATES_DIR),
+                          auto_reload=app.config['TEMPLATES_AUTO_RELOAD'])
+# html name to (template, rendered body, ETag) of pages rendered without arguments
+PAGES = {}
 
 
 def render_template(html_name, **args):
@@ -14,7 +25,40 @@ def render_template(html_name, **args):
     :param args:
     :return: html template
     """
-    with open(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'templates', html_name), 'r') as file:
-        html_text = file.read()
-    template = Template(html_text)
-    return html(template.render(args))
+    return html(ENVIRONMENT.get_template(html_name).render(args))
+
+
+def get_page(html_name):
+    """
+    Gets page rendered once, page is rendered again if its template is reloaded
+
+    :param html_name: str
+    :return: tuple - (template, body as bytes, ETag)
+    """
+    page = PAGES.get(html_name)
+    if page is not None and not ENVIRONMENT.auto_reload:
+        return page
+
+    template = ENVIRONMENT.get_template(html_name)
+    if page is None or page[0] is not template:
+        body = template.render().encode('utf-8')
+        page = PAGES[html_name] = (template, body,
+                                   '"{}"'.format(hashlib.sha1(body).hexdigest()))
+    return page
+
+
+def render_page(request, html_name):
+    """
+    Sends page without arguments, 304 Not Modified is sent if client has the same page
+
+    :param request: sanic request
+    :param html_name: str
+    :return: sanic response
+    """
+    _, body, etag = get_page(html_name)
+    # browser revalidates page on every load, so changed page is shown at once
+    headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+    if_none_match = request.headers.get('If-None-Match', '')
+    if etag in (tag.strip() for tag in if_none_match.split(',')):
+        return HTTPResponse(status=304, headers=headers)
+    return html(body, headers=headers)
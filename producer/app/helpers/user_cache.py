@@ -0,0 +1,94 @@
+"""
+Module contains in-process cache of users loaded by auth,
+so authenticated requests don't query Postgres for the same user every time
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from app import app
+
+
+class UserCache:
+    """
+    LRU cache of users by username, entries expire after ttl seconds.
+    Thread safe, as users are invalidated by functions run in DB executor
+    """
+
+    def __init__(self, max_size, ttl, clock=time.monotonic):
+        assert isinstance(max_size, int), 'Inputted "max_size" type is not int'
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        # username to (user, time of expiration), the least recently used first
+        self._users = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, username):
+        """
+        Gets cached user
+
+        :param username: str
+        :return: User object or None if it is not cached or expired
+        """
+        with self._lock:
+            entry = self._users.get(username)
+            if entry is None or entry[1] <= self._clock():
+                self._users.pop(username, None)
+                self.misses += 1
+                return None
+            self._users.move_to_end(username)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, username, user):
+        """
+        Caches user, the least recently used user is evicted if cache is full
+
+        :param username: str
+        :param user: User object
+        """
+        with self._lock:
+            self._users[username] = (user, self._clock() + self.ttl)
+            self._users.move_to_end(username)
+            while len(self._users) > self.max_size:
+                self._users.popitem(last=False)
+
+    def invalidate(self, username):
+        """
+        Removes user from cache, called after user is changed
+
+        :param username: str
+        """
+        with self._lock:
+            self._users.pop(username, None)
+
+    def as_dict(self):
+        """
+        Gets counters of cache
+
+        :return: dict
+        :Example:
+        {
+            "hits": 98,
+            "misses": 2,
+            "hit_rate": 0.98,
+            "size": 2
+        }
+        """
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / requests if requests else 0.0,
+                'size': len(self._users)
+            }
+
+
+# ! ! ! used to Import ! ! !
+# cache shared by all requests of process
+USER_CACHE = UserCache(app.config['USER_CACHE_SIZE'], app.config['USER_CACHE_TTL'])
@@ -5,6 +5,8 @@ Module contains User model definition and helper functions for manipulating with
 from sqlalchemy import Column, String, Integer
 from app.models import Base
 from app import auth
+from app.helpers.db_executor import run_in_db_executor
+from app.helpers.user_cache import USER_CACHE
 from werkzeug.security import generate_password_hash, check_password_hash
 
 
@@ -34,6 +36,7 @@ class User(Base):
         return '<User: id={}, username={}>'.format(self.id, self.username)
 
 
+@run_in_db_executor
 def get_user_by_name(username):
     """
     Validate user username
@@ -47,6 +50,7 @@ def get_user_by_name(username):
         return session.query(User).filter_by(username=username).first()
 
 
+@run_in_db_executor
 def get_user_by_email(email):
     """
     Validate user email
@@ -60,6 +64,7 @@ def get_user_by_email(email):
         return session.query(User).filter_by(email=email).first()
 
 
+@run_in_db_executor
 def register_user(username, email, password):
     """
     Register the user, stores user record in a database
@@ -72,6 +77,27 @@ def register_user(username, email, password):
         user = User(username=username, email=email)
         user.set_password(password)
         session.add(user)
+    USER_CACHE.invalidate(username)
+
+
+@run_in_db_executor
+def change_password(username, password):
+    """
+    Changes password of the user, cached user is invalidated after change is committed
+
+    Returns False if there is no user with the specified username, else True
+
+    :param username: string
+    :param password: string
+    :return: bool
+    """
+    with scoped_session() as session:
+        user = session.query(User).filter_by(username=username).first()
+        if user is None:
+            return False
+        user.set_password(password)
+    USER_CACHE.invalidate(username)
+    return True
 
 
 @auth.serializer
@@ -84,13 +110,19 @@ def serialize(user):
 
 
 @auth.user_loader
-def load_user(token):
-    """Load user with token.
+async def load_user(token):
+    """Load user with token, Sanic-Auth awaits it.
 
     Return a User object
     """
     if token is not None:
-        return get_user_by_name(token['username'])
+        # users are cached for USER_CACHE_TTL seconds, see app.helpers.user_cache
+        user = USER_CACHE.get(token['username'])
+        if user is None:
+            user = await get_user_by_name(token['username'])
+            if user is not None:
+                USER_CACHE.set(token['username'], user)
+        return user
 
 # because of circular import
 from app.database import scoped_session
@@ -6,6 +6,7 @@ from sqlalchemy import Column, String, Integer
 from sqlalchemy.sql import select
 from app.models import Base
 from app.database import scoped_session
+from app.helpers.db_executor import run_in_db_executor
 
 
 class UserRequests(Base):
@@ -42,6 +43,7 @@ class UserRequests(Base):
         }
 
 
+@run_in_db_executor
 def save_repo_info(body):
     """Save user requests for registered user"""
     with scoped_session() as session:
@@ -60,25 +62,30 @@ def save_repo_info(body):
         session.add(user_requsts)
 
 
+@run_in_db_executor
 def get_repo_info_row(id):
     """Get user repo info for registered user"""
     with scoped_session() as session:
         return session.query(UserRequests).filter_by(id=id).first()
 
 
+@run_in_db_executor
 def get_repo_info(user_id):
     """Get user repo info for registered user"""
     with scoped_session() as session:
+        # loaded inside executor thread, before session is closed
         return session.query(UserRequests).filter_by(user_id=user_id).\
-            order_by(UserRequests.id.asc())
+            order_by(UserRequests.id.asc()).all()
 
 
+@run_in_db_executor
 def delete_repo_info(id):
     """Delete user repo info for registered user"""
     with scoped_session() as session:
         return session.query(UserRequests).filter_by(id=id).delete()
 
 
+@run_in_db_executor
 def update_repo_info(id, body):
     """Update user repo info for registered user"""
     with scoped_session() as session:
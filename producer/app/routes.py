@@ -1,25 +1,52 @@
 """
 Module for creating a producer on Sanic which sends JSON to RabbitMQ
 """
+import asyncio
 import json
+from inspect import isawaitable
 from app import app, auth
-from app.helpers.template import render_template
+from app.helpers.template import render_page
+from app.helpers.compression import compressed_json
 from sanic import response
-from rabbitmq_helpers.request_sender_client import RequestSenderClient
+from rabbitmq_helpers.async_request_sender_client import AsyncRequestSenderClient
 from rabbitmq_helpers.request_sender_client_config import HOST, PORT
-from mongodb_helpers.mongodb_client import MongoDBClient
-from plot_herpers.heatmap import CommitsHeatmap
+from redis_helpers.result_cache import ResultCache
+from mongodb_helpers.async_mongodb_client import AsyncMongoDBClient
+from mongodb_helpers.mongodb_client_config import HEAT_CHOICES, DATE_UNITS
+from plot_herpers.heatmap import CommitsHeatmap, WIRE_FORMATS, get_bucket_seconds, \
+    is_valid_tz, parse_filters
 from app.models.user import get_user_by_name, get_user_by_email, register_user
 from app.models.user_request import get_repo_info, save_repo_info, delete_repo_info,\
     update_repo_info, get_repo_info_row
 from general_helper.logger.log_config import LOG
 
+# one RabbitMQ connection shared by all requests of the app
+RPC_CLIENT = AsyncRequestSenderClient(host=HOST, port=PORT)
+# reads MongoDB without blocking event loop, client is shared by process
+MONGO_CLIENT = AsyncMongoDBClient()
+# results of RPC actions shared by all processes of the app
+RESULT_CACHE = ResultCache()
+
+
+@app.listener('before_server_start')
+async def connect_rpc_client(sanic_app, loop):  # pylint: disable=unused-argument
+    """Connects RPC client and result cache inside event loop of the server"""
+    await RPC_CLIENT.connect()
+    await RESULT_CACHE.connect()
+
+
+@app.listener('after_server_stop')
+async def close_rpc_client(sanic_app, loop):  # pylint: disable=unused-argument
+    """Closes RPC client and result cache connections"""
+    await RPC_CLIENT.close()
+    await RESULT_CACHE.close()
+
 
 @app.route('/', methods=['GET', 'POST'])
 @auth.login_required
 async def index(request):
     """Routing function for main page"""
-    return render_template('index.html')
+    return render_page(request, 'index.html')
 
 
 @app.route("/getinfo")
@@ -34,10 +61,16 @@ async def getinfo(request, user):
         'owner': request.raw_args.get('owner', ""),
         'hash': request.raw_args.get('hash', ""),
         'branch': request.raw_args.get('branch', ""),
-        'action': request.raw_args.get('action', "")
+        'action': request.raw_args.get('action', ""),
+        'engine': request.raw_args.get('engine', "")
     }
-    request_sender_rpc = RequestSenderClient(host=HOST, port=PORT)
-    data = request_sender_rpc.call(json.dumps(git_info))
+    try:
+        # get_repo, get_branches and get_contributors are cached by repository and action
+        data = await RESULT_CACHE.call(git_info, RPC_CLIENT.call)
+    except asyncio.TimeoutError:
+        return response.json({
+            'message': 'request timed out'
+        }, status=504)
     if json.loads(data) == None:
         return response.json({
             'message': 'no such url'
@@ -48,7 +81,24 @@ async def getinfo(request, user):
 @app.route("/getheatdict")
 @auth.login_required(user_keyword='user')
 async def getheatdict(request, user):
-    date_unit = 'D' or request.raw_args.get('date_unit', "")
+    heat = request.raw_args.get('heat', 'date')
+    date_unit = request.raw_args.get('date_unit', 'D')
+    tz = request.raw_args.get('tz', 'UTC')
+    wire_format = request.raw_args.get('format', 'dense')
+    if heat not in HEAT_CHOICES or date_unit not in DATE_UNITS or not is_valid_tz(tz) \
+            or wire_format not in WIRE_FORMATS:
+        return response.json({
+            'message': f'heat must be one of {HEAT_CHOICES}, date_unit one of {DATE_UNITS},'
+                       f' format one of {WIRE_FORMATS} and tz a time zone name'
+        }, status=400)
+    try:
+        # window and authors are selected inside MongoDB, so only they are read
+        filters = parse_filters(request.raw_args, tz)
+    except ValueError as error:
+        return response.json({
+            'message': f'since and until must be timestamps or ISO 8601 dates, authors and'
+                       f' exclude_authors comma separated names, top positive int: {error}'
+        }, status=400)
 
     key_nodes = {
         'username': user.username,
@@ -59,24 +109,49 @@ async def getheatdict(request, user):
     }
     mongo_key = '-'.join(key_nodes.values())
 
-    mongo_client = MongoDBClient()
-    repository_document = mongo_client.get_entry(mongo_key)
+    repository_document = await MONGO_CLIENT.get_repository(mongo_key)
 
     data_dict = None
     if repository_document:
-        commits_heatmap = CommitsHeatmap.from_repository_doc(repository_document, date_unit)
-        data_dict = commits_heatmap.get_data_dict()
+        # documents stored by previous versions keep commits inside
+        if 'commits' in repository_document['value']:
+            commits_heatmap = CommitsHeatmap.from_repository_doc(
+                repository_document, date_unit, heat, tz, **filters)
+        else:
+            # offsets of time zone are checked in window, which starts with the first commit
+            # of repository if since is not set
+            since = filters['since']
+            if since is None and tz != 'UTC':
+                since = await MONGO_CLIENT.get_first_commit_date(mongo_key)
+            # commits are pre-counted by author and date bucket inside MongoDB,
+            # or read from counters materialised by consumer
+            counts = await MONGO_CLIENT.get_heatmap_counts(
+                mongo_key, get_bucket_seconds(heat, date_unit, tz, since, filters['until']),
+                repository_document['value'].get('heatmap_materialized', False), **filters)
+            commits_heatmap = CommitsHeatmap.from_counts(
+                repository_document, counts, date_unit, heat, tz,
+                filters['since'], filters['until'])
+        data_dict = commits_heatmap.get_data_dict(wire_format)
+
+    # matrices of big repositories are mostly zeros, which compress well
+    return compressed_json(request, data_dict)
+
 
-    return response.json(data_dict)
+async def get_current_user(request):
+    """Gets logged in user or None, user is loaded without blocking event loop"""
+    user = auth.current_user(request)
+    if isawaitable(user):
+        user = await user
+    return user
 
 
 @app.route('/login', methods=['GET', 'POST'])
 async def login(request):
-    if auth.current_user(request):
+    if await get_current_user(request):
         return response.redirect('/')
     if request.method == 'POST':
         data = json.loads(request.body)
-        user = get_user_by_name(data.get('username'))
+        user = await get_user_by_name(data.get('username'))
         if user and user.check_password(data.get('password')):
             auth.login_user(request, user)
             return response.json({
@@ -86,7 +161,7 @@ async def login(request):
             'message': 'invalid username or password'
         }, status=400)
 
-    return render_template('login.html')
+    return render_page(request, 'login.html')
 
 
 @app.route('/logout')
@@ -97,8 +172,8 @@ async def logout(request):
 
 
 @app.route('/register', methods=['GET', 'POST'])
-def register(request):
-    if auth.current_user(request):
+async def register(request):
+    if await get_current_user(request):
         return response.redirect('/')
 
     if request.method == 'POST':
@@ -106,10 +181,10 @@ def register(request):
         email = request.form.get('email')
         password = request.form.get('password')
 
-        if not get_user_by_name(username) and not get_user_by_email(email):
-            register_user(username, email, password)
+        if not await get_user_by_name(username) and not await get_user_by_email(email):
+            await register_user(username, email, password)
             return response.redirect(app.url_for('login'))
-    return render_template('register.html')
+    return render_page(request, 'register.html')
 
 
 def handle_no_auth(request):
@@ -126,7 +201,7 @@ async def api_profile(request, user):
 @auth.login_required(user_keyword='user', handle_no_auth=handle_no_auth)
 async def get_repos(request, user):
     if request.method == 'GET':
-        res = [repo.to_dict() for repo in get_repo_info(user.id)]
+        res = [repo.to_dict() for repo in await get_repo_info(user.id)]
         return response.json(res)
 
     data = json.loads(request.body)
@@ -142,7 +217,7 @@ async def get_repos(request, user):
         'action': data.get('action', "")
     }
 
-    save_repo_info(git_info)
+    await save_repo_info(git_info)
     return response.json({
         'message': 'saved'
     }, status=201)
@@ -152,11 +227,11 @@ async def get_repos(request, user):
 @auth.login_required(user_keyword='user', handle_no_auth=handle_no_auth)
 async def interaction_with_row(request, user, id):
     if request.method == 'GET':
-        res = json.dumps(get_repo_info_row(id).to_dict())
+        res = json.dumps((await get_repo_info_row(id)).to_dict())
         return response.json(json.loads(res))
 
     if request.method == 'DELETE':
-        delete_count = delete_repo_info(id)
+        delete_count = await delete_repo_info(id)
         if delete_count:
             return response.json({
                 'message': 'deleted'
@@ -177,7 +252,7 @@ async def interaction_with_row(request, user, id):
             'branch': data.get('branch', ""),
             'action': data.get('action', "")
         }
-        update_count = update_repo_info(id, git_info)
+        update_count = await update_repo_info(id, git_info)
         if update_count:
             return response.json({
                 'message': 'updated'
@@ -37,7 +37,11 @@ document.addEventListener('DOMContentLoaded', function () {
                 + "&version=" + document.getElementById("version").value
                 + "&repo=" + document.getElementById("repo").value
                 + "&owner=" + document.getElementById("owner").value
-                + "&date_unit=" + document.getElementById("date_unit").value;
+                + "&heat=" + document.getElementById("heat").value
+                + "&date_unit=" + document.getElementById("date_unit").value
+                + "&format=coo"
+                + getHeatFilters()
+                + "&tz=" + encodeURIComponent(Intl.DateTimeFormat().resolvedOptions().timeZone || "UTC");
             getHeatDict(url);
         }
     }
@@ -193,15 +197,42 @@ function getRepoData(url) {
     });
 }
 
+function getHeatFilters() {
+    // empty filters are not sent, so whole history of all authors is plotted
+    var query = "";
+    ["since", "until", "authors", "top"].forEach(function (name) {
+        var value = document.getElementById(name).value;
+        if (value) {
+            query += "&" + name + "=" + encodeURIComponent(value);
+        }
+    });
+    return query;
+}
+
 function getHeatDict(url) {
     requestGet(url, function (response) {
-        var data = response.body;
+        var data = decodeHeatDict(response.body);
         plotHeatMap(data)
         var container = document.getElementById("repoValues");
         container.style.display = "none";
     });
 }
 
+function decodeHeatDict(data) {
+    // sparse 'coo' format contains only not zero cells of matrix
+    if (!data || data.format !== "coo") {
+        return data;
+    }
+    var z = [];
+    for (var row = 0; row < data.shape[0]; row++) {
+        z.push(new Array(data.shape[1]).fill(0));
+    }
+    for (var i = 0; i < data.values.length; i++) {
+        z[data.rows[i]][data.cols[i]] = data.values[i];
+    }
+    return {x: data.x, y: data.y, z: z};
+}
+
 function plotHeatMap(rawData){
     console.log("enter")
     console.log(typeof(rawData))
@@ -15,3 +15,10 @@ class Config:
     """
     DATABASE_URL = f'postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{HOST}:{PORT}/{HEAT_MAP_DB}'
     AUTH_LOGIN_ENDPOINT = 'login'
+    # connections to Postgres and threads queries run in, so they don't block event loop
+    DATABASE_POOL_SIZE = 10
+    # users loaded by auth are cached by username for this number of seconds
+    USER_CACHE_TTL = 60
+    USER_CACHE_SIZE = 1024
+    # templates are compiled once, True reloads templates changed on disk, for development
+    TEMPLATES_AUTO_RELOAD = False
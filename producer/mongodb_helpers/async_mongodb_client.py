@@ -0,0 +1,117 @@
+"""
+    Provides class AsyncMongoDBClient
+"""
+
+from pymongo import ASCENDING, DESCENDING
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from general_helper.mongodb.client_registry import REGISTRY
+from mongodb_helpers.mongodb_client import get_commits_match_stages, get_counters_query, \
+    get_heatmap_pipeline, get_top_authors_pipeline, is_bucket_aligned
+from mongodb_helpers.mongodb_client_config import MONGO_PORT, MONGO_HOST, MONGO_CLIENT_OPTIONS, \
+    REPOS_COLLECTION, COMMITS_COLLECTION, HEATMAP_COLLECTION, HEATMAP_BUCKET_SECONDS
+
+
+class AsyncMongoDBClient:
+    """
+    Provides interface of MongoDBClient reading repositories and heatmap counts
+    without blocking event loop of the server.
+    Motor client is shared by all requests of process and created on the first request
+    """
+
+    def __init__(self, base_client=AsyncIOMotorClient, host=MONGO_HOST, port=MONGO_PORT):
+        self._base_client = base_client
+        self._host = host
+        self._port = port
+
+    async def _get_database(self):
+        """
+        Gets database of shared client, health of server is checked once in interval
+
+        :return: motor database
+        """
+        client = await REGISTRY.get_async_client(self._host, self._port, self._base_client,
+                                                 **MONGO_CLIENT_OPTIONS)
+        return client.heatmap_db
+
+    async def get_repository(self, key):
+        """
+        Tries to find repository document in repos collection without its commits
+
+        :param key: str
+        :return: None or document from mongo
+        """
+        assert isinstance(key, str), 'AsyncMongoDBClient.get_repository(key): ' \
+                                     'key is not of type str'
+
+        database = await self._get_database()
+        # the latest one of documents stored by previous versions with duplicated keys
+        return await database[REPOS_COLLECTION].find_one({"key": key},
+                                                         sort=[('_id', DESCENDING)])
+
+    async def get_heatmap_counts(self, key, bucket_seconds=24 * 60 * 60, materialized=False,
+                                 **filters):
+        """
+        Counts commits of repository by author and date bucket inside MongoDB,
+        see MongoDBClient.get_heatmap_counts
+
+        :param key: str
+        :param bucket_seconds: int
+        :param materialized: bool
+        :param filters: since, until, authors, exclude_authors and top
+        :return: list of dicts
+        """
+        assert isinstance(key, str), 'AsyncMongoDBClient.get_heatmap_counts(key): ' \
+                                     'key is not of type str'
+        assert isinstance(bucket_seconds, int), 'Inputted "bucket_seconds" type is not int'
+
+        database = await self._get_database()
+        top = filters.pop('top', None)
+        if materialized and bucket_seconds in HEATMAP_BUCKET_SECONDS and is_bucket_aligned(
+                bucket_seconds, filters.get('since'), filters.get('until')):
+            collection = database[HEATMAP_COLLECTION]
+            if top is not None:
+                filters['authors'] = await self._get_top_authors(
+                    collection, [{'$match': get_counters_query(key, bucket_seconds, **filters)}],
+                    '$count', top)
+            return await collection.find(
+                get_counters_query(key, bucket_seconds, **filters),
+                {'_id': 0, 'author': 1, 'date': 1, 'count': 1, 'first_date': 1}
+            ).to_list(None)
+
+        collection = database[COMMITS_COLLECTION]
+        if top is not None:
+            filters['authors'] = await self._get_top_authors(
+                collection, get_commits_match_stages(key, **filters), 1, top)
+        return await collection.aggregate(
+            get_heatmap_pipeline(key, bucket_seconds, **filters)).to_list(None)
+
+    async def get_first_commit_date(self, key):
+        """
+        Gets date of the earliest commit of repository, see MongoDBClient.get_first_commit_date
+
+        :param key: str
+        :return: int timestamp or None if repository has no commits
+        """
+        assert isinstance(key, str), 'AsyncMongoDBClient.get_first_commit_date(key): ' \
+                                     'key is not of type str'
+
+        database = await self._get_database()
+        first_commit = await database[COMMITS_COLLECTION].find_one(
+            {'repo_key': key}, {'_id': 0, 'date': 1}, sort=[('date', ASCENDING)])
+        return None if first_commit is None else first_commit['date']
+
+    @staticmethod
+    async def _get_top_authors(collection, stages, count, top):
+        """
+        Gets names of the most active authors of selected commits or counters
+
+        :param collection: motor collection
+        :param stages: list - of pipeline stages selecting documents
+        :param count: int or str - number of commits in selected document
+        :param top: int
+        :return: list of str
+        """
+        authors = await collection.aggregate(
+            get_top_authors_pipeline(stages, count, top)).to_list(None)
+        return [author['_id'] for author in authors]
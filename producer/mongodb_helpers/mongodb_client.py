@@ -2,34 +2,238 @@
     Provides class MongoResponseBuilder
 """
 
-from pymongo import MongoClient
-from pymongo.errors import ConnectionFailure
+from pymongo import MongoClient, ASCENDING, DESCENDING
 
-from mongodb_helpers.mongodb_client_config import MONGO_PORT, MONGO_HOST
+from general_helper.mongodb.client_registry import REGISTRY
+from mongodb_helpers.mongodb_client_config import MONGO_PORT, MONGO_HOST, MONGO_CLIENT_OPTIONS, \
+    REPOS_COLLECTION, COMMITS_COLLECTION, HEATMAP_COLLECTION, HEATMAP_BUCKET_SECONDS
+
+
+def get_author_match(authors=None, exclude_authors=None):
+    """
+    Gets query condition on authors of commits
+
+    :param authors: list - of included authors or None to include all of them
+    :param exclude_authors: list - of excluded authors or None
+    :return: dict
+    """
+    condition = {}
+    if authors is not None:
+        condition['$in'] = list(authors)
+    if exclude_authors:
+        condition['$nin'] = list(exclude_authors)
+    return {'author': condition} if condition else {}
+
+
+def get_commits_match_stages(key, since=None, until=None, authors=None, exclude_authors=None):
+    """
+    Gets aggregation pipeline stages selecting commits of repository in window
+
+    :param key: str - key of repository
+    :param since: int - timestamp of the first included second or None
+    :param until: int - timestamp of the first excluded second or None
+    :param authors: list - of included authors or None
+    :param exclude_authors: list - of excluded authors or None
+    :return: list - of pipeline stages
+    """
+    match = dict({'repo_key': key}, **get_author_match(authors, exclude_authors))
+    # dates are stored as int by consumer, so window is served by index of commits by date
+    window = {}
+    if since is not None:
+        window['$gte'] = since
+    if until is not None:
+        window['$lt'] = until
+    if window:
+        match['date'] = window
+    return [{'$match': match}]
+
+
+def get_heatmap_pipeline(key, bucket_seconds, since=None, until=None, authors=None,
+                         exclude_authors=None):
+    """
+    Gets aggregation pipeline counting commits of repository by author and date bucket
+
+    :param key: str - key of repository
+    :param bucket_seconds: int - seconds in date bucket
+    :param since: int - timestamp of the first included second or None
+    :param until: int - timestamp of the first excluded second or None
+    :param authors: list - of included authors or None
+    :param exclude_authors: list - of excluded authors or None
+    :return: list - of pipeline stages
+    """
+    date = '$date'
+    return get_commits_match_stages(key, since, until, authors, exclude_authors) + [
+        {'$group': {
+            '_id': {
+                'author': '$author',
+                'date': {'$subtract': [date, {'$mod': [date, bucket_seconds]}]}
+            },
+            'count': {'$sum': 1},
+            'first_date': {'$min': date}
+        }},
+        {'$project': {'_id': 0, 'author': '$_id.author', 'date': '$_id.date', 'count': 1,
+                      'first_date': 1}}
+    ]
+
+
+def is_bucket_aligned(bucket_seconds, since=None, until=None):
+    """
+    Checks whether window starts and ends at bounds of date buckets,
+    only such windows select the same commits from counters and from commits collection
+
+    :param bucket_seconds: int - seconds in date bucket
+    :param since: int - timestamp of the first included second or None
+    :param until: int - timestamp of the first excluded second or None
+    :return: bool
+    """
+    return all(bound is None or bound % bucket_seconds == 0 for bound in (since, until))
+
+
+def get_counters_query(key, bucket_seconds, since=None, until=None, authors=None,
+                       exclude_authors=None):
+    """
+    Gets query of materialised counters of repository in window
+    aligned to date buckets, see is_bucket_aligned
+
+    :param key: str - key of repository
+    :param bucket_seconds: int - seconds in date bucket of counters
+    :param since: int - timestamp of the first included second or None
+    :param until: int - timestamp of the first excluded second or None
+    :param authors: list - of included authors or None
+    :param exclude_authors: list - of excluded authors or None
+    :return: dict
+    """
+    query = dict({'repo_key': key, 'bucket_seconds': bucket_seconds},
+                 **get_author_match(authors, exclude_authors))
+    window = {}
+    if since is not None:
+        window['$gte'] = since
+    if until is not None:
+        window['$lt'] = until
+    if window:
+        query['date'] = window
+    return query
+
+
+def get_top_authors_pipeline(stages, count, top):
+    """
+    Gets aggregation pipeline of the most active authors
+
+    :param stages: list - of pipeline stages selecting commits or counters
+    :param count: int or str - number of commits in selected document, 1 or '$count'
+    :param top: int - number of authors
+    :return: list - of pipeline stages
+    """
+    return stages + [
+        {'$group': {'_id': '$author', 'count': {'$sum': count}}},
+        {'$sort': {'count': DESCENDING, '_id': ASCENDING}},
+        {'$limit': top}
+    ]
 
 
 class MongoDBClient:
     """
     Provides interface for hashing and sending requests
-    to MongoDB database
+    to MongoDB database.
+    Repository is stored as document in repos collection without commits
+    and documents of its commits in commits collection
     """
 
     def __init__(self, base_client=MongoClient, host=MONGO_HOST, port=MONGO_PORT):
 
-        # declare connection
-        self._client = base_client(host, port)
-        print('connecting to mongo')
-        # connects to mongo for 30 seconds
-        try:
-            # The ismaster command is cheap and does not require auth.
-            self._client.admin.command('ismaster')
-        except ConnectionFailure:
-            print("Server not available")
-
-        print('Successfully connected MongoDB!')
+        # client and its pool of connections are shared by all requests of process
+        self._client = REGISTRY.get_client(host, port, base_client, **MONGO_CLIENT_OPTIONS)
 
         self._database = self._client.heatmap_db
-        self._collection = self._database.repos_collection
+        self._collection = self._database[REPOS_COLLECTION]
+        self._commits_collection = self._database[COMMITS_COLLECTION]
+        self._heatmap_collection = self._database[HEATMAP_COLLECTION]
+
+    def get_repository(self, key):
+        """
+        Tries to find repository document in repos collection without its commits
+
+        :param key: str
+        :return: None or document from mongo
+        """
+        assert isinstance(key, str), 'MongoDBClient.get_repository(key): key is not of type str'
+
+        # the latest one of documents stored by previous versions with duplicated keys
+        return self._collection.find_one({"key": key}, sort=[('_id', DESCENDING)])
+
+    def get_heatmap_counts(self, key, bucket_seconds=24 * 60 * 60, materialized=False,
+                           **filters):
+        """
+        Counts commits of repository by author and date bucket inside MongoDB,
+        counters materialised by consumer are read if they are kept for the bucket size
+        and window is aligned to buckets. Only commits matching filters are read
+
+        :param key: str
+        :param bucket_seconds: int - seconds in date bucket, buckets start at multiples of it
+        :param materialized: bool - whether counters of repository are materialised
+        :param filters: since, until, authors, exclude_authors and top - number of
+            the most active authors in window, see plot_herpers.heatmap.parse_filters
+        :return: list of dicts
+        :Example:
+        [
+            {
+                "author": "commit author",
+                "date": "start of date bucket as int timestamp",
+                "count": "number of commits",
+                "first_date": "date of the first commit in bucket as int timestamp"
+            },
+            ...
+        ]
+        """
+        assert isinstance(key, str), 'MongoDBClient.get_heatmap_counts(key): ' \
+                                     'key is not of type str'
+        assert isinstance(bucket_seconds, int), 'Inputted "bucket_seconds" type is not int'
+
+        top = filters.pop('top', None)
+        if materialized and bucket_seconds in HEATMAP_BUCKET_SECONDS and is_bucket_aligned(
+                bucket_seconds, filters.get('since'), filters.get('until')):
+            if top is not None:
+                filters['authors'] = self._get_top_authors(
+                    self._heatmap_collection,
+                    [{'$match': get_counters_query(key, bucket_seconds, **filters)}],
+                    '$count', top)
+            return list(self._heatmap_collection.find(
+                get_counters_query(key, bucket_seconds, **filters),
+                {'_id': 0, 'author': 1, 'date': 1, 'count': 1, 'first_date': 1}))
+
+        if top is not None:
+            filters['authors'] = self._get_top_authors(
+                self._commits_collection, get_commits_match_stages(key, **filters), 1, top)
+        return list(self._commits_collection.aggregate(
+            get_heatmap_pipeline(key, bucket_seconds, **filters)))
+
+    def get_first_commit_date(self, key):
+        """
+        Gets date of the earliest commit of repository, served by index of commits by date
+
+        :param key: str
+        :return: int timestamp or None if repository has no commits
+        """
+        assert isinstance(key, str), 'MongoDBClient.get_first_commit_date(key): ' \
+                                     'key is not of type str'
+
+        first_commit = self._commits_collection.find_one(
+            {'repo_key': key}, {'_id': 0, 'date': 1}, sort=[('date', ASCENDING)])
+        return None if first_commit is None else first_commit['date']
+
+    @staticmethod
+    def _get_top_authors(collection, stages, count, top):
+        """
+        Gets names of the most active authors of selected commits or counters
+
+        :param collection: pymongo collection
+        :param stages: list - of pipeline stages selecting documents
+        :param count: int or str - number of commits in selected document
+        :param top: int
+        :return: list of str
+        """
+        return [author['_id'] for author in
+                collection.aggregate(get_top_authors_pipeline(stages, count, top))]
 
     def get_entry(self, key):
         """
@@ -41,4 +245,16 @@ class MongoDBClient:
         assert isinstance(key, str), 'MongoDBClient.get_entry(key): key is not of type str'
         print('Looking for document with key: ', key)
 
-        return self._collection.find_one({"key": key})
+        document = self.get_repository(key)
+        # documents stored by previous versions keep commits inside
+        if document is None or 'commits' in document['value']:
+            return document
+
+        metadata = document['value'].pop('commits_metadata')
+        document['value']['commits'] = None if metadata is None else {
+            'data': list(self._commits_collection.find({'repo_key': key},
+                                                       {'_id': 0, 'repo_key': 0})
+                         .sort('date', DESCENDING)),
+            'metadata': metadata
+        }
+        return document
@@ -3,5 +3,26 @@ Contains configuration variables for MongoResponseBuilder
 """
 MONGO_HOST = 'heatmaptraining_mongo_1'  # 'localhost'
 MONGO_PORT = 27017
+# options of client shared by process, see general_helper.mongodb.client_registry,
+# connection is made on the first request
+MONGO_CLIENT_OPTIONS = {
+    'connect': False,
+    'maxPoolSize': 100,
+    'minPoolSize': 0,
+    'serverSelectionTimeoutMS': 30000
+}
 
-HEAT_CHOICES = ['hour', 'weekday', 'date']
+# kinds of heatmap: authors by hour of day, by weekday, by date buckets
+# and weekdays by hours of day
+HEAT_CHOICES = ['hour', 'weekday', 'date', 'punchcard']
+# date buckets of 'date' heatmap: hour, day, week starting on Monday, month
+DATE_UNITS = ['H', 'D', 'W', 'M']
+# repository metadata, branches and contributors, one document per repository key
+REPOS_COLLECTION = 'repos_collection'
+# commits, one document per (repository key, hash of commit)
+COMMITS_COLLECTION = 'commits_collection'
+# materialised heatmap counters kept up to date by consumer, one document per
+# (repository key, bucket size, author, start of date bucket)
+HEATMAP_COLLECTION = 'heatmap_collection'
+# sizes in seconds of date buckets counters are kept for: day and hour
+HEATMAP_BUCKET_SECONDS = (24 * 60 * 60, 60 * 60)
@@ -3,74 +3,442 @@ This module contains helper functions for data plotting structuring
 """
 
 # import datetime
+import functools
+
+import numpy as np
 import pandas as pd
 
+DAY_SECONDS = 24 * 60 * 60
+HOUR_SECONDS = 60 * 60
+# bucket commits are pre-counted in when heatmap needs time of day
+# and offsets of time zone are multiples of quarter hour, but not of hour
+QUARTER_HOUR_SECONDS = 15 * 60
+# commits are counted by exact timestamps in time zones with other offsets,
+# e.g. Africa/Monrovia at -0:44:30 until 1972
+RAW_BUCKET_SECONDS = 1
+# offsets of time zones are sampled daily in this period
+OFFSETS_SINCE = '1800-01-01'
+OFFSETS_UNTIL = '2040-01-01'
+# 1970-01-01 was Thursday, added to day number makes Monday-based week
+EPOCH_WEEKDAY = 3
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+# format of labels of date buckets
+DATE_UNIT_FORMATS = {'H': '%Y-%m-%d %H:00', 'D': '%Y-%m-%d', 'W': '%Y-%m-%d', 'M': '%Y-%m'}
+# 'dense' sends matrix z as list of rows, 'coo' sends only coordinates and values
+# of not zero cells of matrix
+WIRE_FORMATS = ['dense', 'coo']
+
+
+def is_valid_tz(tz):
+    """
+    Checks whether time zone name is known
+
+    :param tz: str - e.g. 'UTC' or 'Europe/Kiev'
+    :return: bool
+    """
+    try:
+        pd.Timestamp.utcnow().tz_convert(tz)
+    except (KeyError, ValueError, TypeError):
+        return False
+    return True
+
+
+@functools.lru_cache(maxsize=None)
+def get_offset_periods(tz):
+    """
+    Gets offsets of time zone from UTC and timestamps they start at,
+    sampled daily from OFFSETS_SINCE to OFFSETS_UNTIL. Result is cached per time zone
+
+    :param tz: str
+    :return: tuple - (np.ndarray of int64 starts of periods, np.ndarray of int64 offsets)
+    """
+    days = pd.date_range(OFFSETS_SINCE, OFFSETS_UNTIL, freq='D', tz='UTC').tz_localize(None)
+    local = days.tz_localize('UTC').tz_convert(tz).tz_localize(None)
+    offsets = np.asarray((local - days) // pd.Timedelta(seconds=1), dtype='int64')
+    changes = np.concatenate([[0], np.flatnonzero(np.diff(offsets)) + 1])
+    starts = np.asarray((days[changes] - pd.Timestamp(0)) // pd.Timedelta(seconds=1),
+                        dtype='int64')
+    return starts, offsets[changes]
+
+
+def get_offset_step(tz, since=None, until=None):
+    """
+    Gets the largest of hour, quarter hour and second which all offsets of time zone
+    from UTC in window are multiples of
+
+    :param tz: str
+    :param since: int - timestamp of the first second of window or None
+    :param until: int - timestamp of the first second after window or None
+    :return: int - seconds
+    """
+    starts, offsets = get_offset_periods(tz)
+    first = 0 if since is None else max(np.searchsorted(starts, since, side='right') - 1, 0)
+    last = len(starts) if until is None else np.searchsorted(starts, until, side='left')
+    window_offsets = offsets[first:max(last, first + 1)]
+    for step in (HOUR_SECONDS, QUARTER_HOUR_SECONDS):
+        if (window_offsets % step == 0).all():
+            return step
+    return RAW_BUCKET_SECONDS
+
+
+def get_bucket_seconds(heat='date', date_unit='D', tz='UTC', since=None, until=None):
+    """
+    Gets size of buckets commits can be pre-counted in for heatmap,
+    day and hour buckets are materialised by consumer. Buckets must not be split
+    by offsets of time zone in window, otherwise commits are counted by exact timestamps
+
+    :param heat: str - kind of heatmap
+    :param date_unit: str
+    :param tz: str
+    :param since: int - timestamp of the first commit counted or None
+    :param until: int - timestamp of the first second after window or None
+    :return: int - seconds
+    """
+    if heat == 'date' and date_unit != 'H' and tz == 'UTC':
+        return DAY_SECONDS
+    return get_offset_step(tz, since, until)
+
+
+def to_local_seconds(timestamps, tz='UTC'):
+    """
+    Shifts UTC timestamps to local wall-clock seconds of time zone
+
+    :param timestamps: np.ndarray - of int timestamps
+    :param tz: str
+    :return: np.ndarray - of int64
+    """
+    timestamps = np.asarray(timestamps, dtype='int64')
+    if tz == 'UTC':
+        return timestamps
+    local = pd.to_datetime(timestamps, unit='s', utc=True).tz_convert(tz).tz_localize(None)
+    return np.asarray((local - pd.Timestamp(0)) // pd.Timedelta(seconds=1), dtype='int64')
+
+
+def to_buckets(local_seconds, date_unit='D'):
+    """
+    Gets number of date bucket of every local timestamp counted from 1970-01-01
+
+    :param local_seconds: np.ndarray - of int64 local timestamps
+    :param date_unit: str - 'H', 'D', 'W' or 'M'
+    :return: np.ndarray - of int64
+    """
+    if date_unit == 'H':
+        return local_seconds // HOUR_SECONDS
+    days = local_seconds // DAY_SECONDS
+    if date_unit == 'D':
+        return days
+    if date_unit == 'W':
+        return (days + EPOCH_WEEKDAY) // 7
+    dates = pd.to_datetime(days, unit='D')
+    return np.asarray((dates.year - 1970) * 12 + dates.month - 1, dtype='int64')
+
+
+def get_bucket_labels(first, last, date_unit='D'):
+    """
+    Gets labels of date buckets from first to last inclusive
+
+    :param first: int - number of the first bucket
+    :param last: int - number of the last bucket
+    :param date_unit: str
+    :return: list of str
+    """
+    buckets = np.arange(first, last + 1)
+    if date_unit == 'H':
+        starts = pd.to_datetime(buckets * HOUR_SECONDS, unit='s')
+    elif date_unit == 'D':
+        starts = pd.to_datetime(buckets, unit='D')
+    elif date_unit == 'W':
+        starts = pd.to_datetime(buckets * 7 - EPOCH_WEEKDAY, unit='D')
+    else:
+        starts = pd.to_datetime({'year': 1970 + buckets // 12, 'month': buckets % 12 + 1,
+                                 'day': 1})
+    return pd.DatetimeIndex(starts).strftime(DATE_UNIT_FORMATS[date_unit]).tolist()
+
+
+def count_matrix(row_codes, number_of_rows, column_codes, number_of_columns, weights):
+    """
+    Sums weights into matrix of rows by columns by one bincount over flat positions,
+    codes out of range of columns are skipped
+
+    :param row_codes: np.ndarray - of int row of every weight
+    :param number_of_rows: int
+    :param column_codes: np.ndarray - of int column of every weight
+    :param number_of_columns: int
+    :param weights: np.ndarray - numbers of commits
+    :return: np.ndarray of shape rows x columns
+    """
+    in_range = (column_codes >= 0) & (column_codes < number_of_columns)
+    positions = row_codes[in_range] * number_of_columns + column_codes[in_range]
+    return np.bincount(positions, weights=np.asarray(weights)[in_range],
+                       minlength=number_of_rows * number_of_columns) \
+        .reshape(number_of_rows, number_of_columns)
+
+
+def parse_date(value, tz='UTC'):
+    """
+    Parses int timestamp or ISO 8601 date, dates without offset are in time zone
+
+    :param value: str - e.g. '1530403200', '2018-07-01' or '2018-07-01T12:00+03:00'
+    :param tz: str
+    :return: int - timestamp
+    """
+    if value.lstrip('-').isdigit():
+        return int(value)
+    date = pd.Timestamp(value)
+    if date.tzinfo is None:
+        date = date.tz_localize(tz)
+    return int(date.timestamp())
+
+
+def parse_filters(args, tz='UTC'):
+    """
+    Parses filters of heatmap from query parameters since and until - dates of window,
+    authors and exclude_authors - comma separated names, top - number of the most
+    active authors in window
+
+    :param args: dict - query parameters
+    :param tz: str - time zone of dates without offset
+    :return: dict - with keys since, until (int timestamps, until is excluded),
+        authors, exclude_authors (lists of str) and top (int), None if not given
+    :raises ValueError: if any of parameters is invalid
+    """
+    filters = dict.fromkeys(['since', 'until', 'authors', 'exclude_authors', 'top'])
+    for name in ['since', 'until']:
+        if args.get(name):
+            filters[name] = parse_date(args[name], tz)
+    if filters['since'] is not None and filters['until'] is not None \
+            and filters['since'] >= filters['until']:
+        raise ValueError('since must be earlier than until')
+
+    for name in ['authors', 'exclude_authors']:
+        if args.get(name) is not None:
+            filters[name] = [author.strip() for author in args[name].split(',')
+                             if author.strip()]
+
+    if args.get('top'):
+        filters['top'] = int(args['top'])
+        if filters['top'] <= 0:
+            raise ValueError('top must be positive')
+    return filters
+
+
+def filter_counts(counts, since=None, until=None, authors=None, exclude_authors=None,
+                  top=None):
+    """
+    Selects numbers of commits by filters as MongoDB queries do,
+    used for documents with commits stored by previous versions
+
+    :param counts: pd.DataFrame - with columns author, date (int timestamp) and count
+    :return: pd.DataFrame
+    """
+    selected = pd.Series(True, index=counts.index)
+    if since is not None:
+        selected &= counts.date >= since
+    if until is not None:
+        selected &= counts.date < until
+    if authors is not None:
+        selected &= counts.author.isin(authors)
+    if exclude_authors:
+        selected &= ~counts.author.isin(exclude_authors)
+    counts = counts[selected]
+
+    if top is not None:
+        activity = counts.groupby('author')['count'].sum().reset_index()
+        activity = activity.sort_values(['count', 'author'], ascending=[False, True])
+        counts = counts[counts.author.isin(activity.author.head(top))]
+    return counts.reset_index(drop=True)
+
+
+def to_wire_format(x, y, matrix, wire_format='dense'):
+    """
+    Gets heatmap data dict with matrix in dense or sparse format
+
+    :param x: list - labels of columns
+    :param y: list - labels of rows
+    :param matrix: np.ndarray - of shape len(y) x len(x)
+    :param wire_format: str - 'dense' or 'coo'
+    :return: dict
+    :Example:
+    {
+        "format": "coo",
+        "x": ["2018-07-01", "2018-07-02", "2018-07-03"],
+        "y": ["author"],
+        "shape": [1, 3],
+        "rows": [0, 0],
+        "cols": [0, 2],
+        "values": [5, 1]
+    }
+    """
+    if wire_format == 'coo':
+        rows, columns = np.nonzero(matrix)
+        return {
+            'format': 'coo',
+            'x': x,
+            'y': y,
+            'shape': [len(y), len(x)],
+            'rows': rows.tolist(),
+            'cols': columns.tolist(),
+            'values': matrix[rows, columns].astype('int32').tolist()
+        }
+    return {
+        'x': x,
+        'y': y,
+        'z': matrix.astype('int32').tolist()
+    }
+
 
 class CommitsHeatmap:
     """
     CommitsHeatmap class
     """
 
-    def __init__(self, commits, start_date, end_date=pd.Timestamp.utcnow(), date_unit='D'):
+    def __init__(self, commits, start_date, end_date=None, date_unit='D',
+                 counts=None, heat='date', tz='UTC'):
         """
         Constructor
 
-        :param commits: list
+        :param commits: list - of commits or None if counts are given
         :param start_date: pd.Timestamp
-        :param date_unit: str
-        :param time_delta: pd.Timestamp
+        :param date_unit: str - 'H', 'D', 'W' or 'M' bucket of 'date' heatmap
+        :param end_date: pd.Timestamp - now if not given
+        :param counts: pd.DataFrame - number of commits with columns author,
+            date (int timestamp) and count
+        :param heat: str - 'date', 'hour', 'weekday' or 'punchcard'
+        :param tz: str - time zone commits are bucketed in
         """
         self.commits = commits
         self.start_date = start_date
         self.date_unit = date_unit
-        self.end_date = end_date
+        self.end_date = end_date if end_date is not None else pd.Timestamp.utcnow()
+        self.counts = counts
+        self.heat = heat
+        self.tz = tz
+
+    def get_counts(self):
+        """
+        Counts commits by author and commit date
 
-    def get_data_dict(self):
+        :return: pd.DataFrame - with columns author, date (int timestamp) and count
+        """
+        if self.counts is not None:
+            return self.counts
+
+        df = pd.DataFrame.from_records(self.commits)  # pylint: disable=invalid-name
+        # dates of Bitbucket commits are strings
+        df.date = pd.to_numeric(df.date).astype('int64')
+        return df.groupby(['author', 'date']).size().rename('count').reset_index()
+
+    def _get_date_matrix(self, author_codes, authors, local_seconds, weights):
+        """
+        Builds authors by date buckets heatmap from start date to end date.
+        Bucket of end date is always included, so commits of the current day are shown,
+        while heatmaps before vectorisation missed the day of end date
+        when time of end date was earlier than time of start date
+
+        :return: tuple - (labels of date buckets, matrix)
+        """
+        buckets = to_buckets(local_seconds, self.date_unit)
+        first, last = to_buckets(to_local_seconds(
+            [int(self.start_date.timestamp()), int(self.end_date.timestamp())], self.tz),
+                                 self.date_unit)
+        matrix = count_matrix(author_codes, len(authors), buckets - first, last - first + 1,
+                              weights)
+        return get_bucket_labels(first, last, self.date_unit), matrix
+
+    def get_data_dict(self, wire_format='dense'):
         """
         Returns dict with data for plotting
 
+        :param wire_format: str - 'dense' or 'coo', see to_wire_format
         :return: dict
         """
 
         print('---------repo creation date------------------')
         print('start date', self.start_date)
         print('---------------------------------------------')
-        print('------Commits----------')
-        print(self.commits)
-        print('--------------------------------------------')
 
-        df = pd.DataFrame.from_records(self.commits)  # pylint: disable=invalid-name
-        df.date = pd.to_datetime(df.date, utc=True, unit='s')
-        df.set_index('date', inplace=True)
-        df.index = df.index.floor('D')
+        counts = self.get_counts()
+        author_codes, authors = pd.factorize(counts.author, sort=True)
+        authors = authors.tolist()
+        local_seconds = to_local_seconds(counts.date.values, self.tz)
+        weights = counts['count'].values
 
-        date_range = pd.date_range(start=self.start_date, end=self.end_date, freq=self.date_unit)
-        date_range = date_range.floor('D')
+        if self.heat == 'date':
+            labels, matrix = self._get_date_matrix(author_codes, authors, local_seconds, weights)
+            return to_wire_format(labels, authors, matrix, wire_format)
 
-        grouped = df.groupby('author')
-        new_df = pd.DataFrame(index=date_range)
-        for name, group in grouped:
-            new_df[name] = group.groupby('date').size()
-        new_df.fillna(0, inplace=True)
+        hours = local_seconds // HOUR_SECONDS % 24
+        weekdays = (local_seconds // DAY_SECONDS + EPOCH_WEEKDAY) % 7
+        if self.heat == 'hour':
+            rows, columns = (author_codes, authors), (hours, list(range(24)))
+        elif self.heat == 'weekday':
+            rows, columns = (author_codes, authors), (weekdays, WEEKDAYS)
+        else:
+            rows, columns = (weekdays, WEEKDAYS), (hours, list(range(24)))
 
-        return {
-            'x': new_df.index.strftime('%Y-%m-%d').tolist(),
-            'y': new_df.columns.tolist(),
-            'z': new_df.T.values.astype('int32').tolist()
-        }
+        matrix = count_matrix(rows[0], len(rows[1]), columns[0], len(columns[1]), weights)
+        return to_wire_format(columns[1], rows[1], matrix, wire_format)
+
+    def set_window(self, since=None, until=None):
+        """
+        Limits heatmap dates to window
+
+        :param since: int - timestamp of the first included second or None
+        :param until: int - timestamp of the first excluded second or None
+        """
+        if since is not None:
+            self.start_date = pd.to_datetime(since, utc=True, unit='s')
+        if until is not None:
+            self.end_date = pd.to_datetime(until - 1, utc=True, unit='s')
 
     @classmethod
-    def from_repository_doc(cls, repository_document, date_unit='D'):
+    def from_repository_doc(cls, repository_document, date_unit='D', heat='date', tz='UTC',
+                            **filters):
         """
         Create CommitsHeatmap instance from mongo document
 
         :param repository_document:
         :param date_unit:
+        :param heat:
+        :param tz:
+        :param filters: see parse_filters
         :return:
         """
         repository_info = repository_document['value']
         commits = repository_info['commits']['data']
-        start_date_utc = min(repository_info['repo']['creation_date'], commits[-1]['date'])
+        start_date_utc = min(repository_info['repo']['creation_date'], int(commits[-1]['date']))
+        start_date = pd.to_datetime(start_date_utc, utc=True, unit='s')
+
+        heatmap = cls(commits, start_date, date_unit=date_unit, heat=heat, tz=tz)
+        if any(value is not None for value in filters.values()):
+            heatmap.counts = filter_counts(heatmap.get_counts(), **filters)
+            heatmap.set_window(filters.get('since'), filters.get('until'))
+        return heatmap
+
+    @classmethod
+    def from_counts(cls, repository_document, counts, date_unit='D', heat='date', tz='UTC',
+                    since=None, until=None):
+        """
+        Create CommitsHeatmap instance from numbers of commits
+        counted by author and date bucket inside MongoDB
+
+        :param repository_document: dict - mongo document of repository without commits
+        :param counts: list - of dicts with keys author, date, count and first_date
+        :param date_unit: str
+        :param heat: str
+        :param tz: str
+        :param since: int - timestamp of the first second of window or None
+        :param until: int - timestamp of the first second after window or None
+        :return: CommitsHeatmap
+        """
+        counts = pd.DataFrame.from_records(counts,
+                                           columns=['author', 'date', 'count', 'first_date'])
+        counts.date = counts.date.astype('int64')
+        start_date_utc = repository_document['value']['repo']['creation_date']
+        if not counts.empty:
+            start_date_utc = min(start_date_utc, int(counts.first_date.min()))
         start_date = pd.to_datetime(start_date_utc, utc=True, unit='s')
 
-        return cls(commits, start_date, date_unit=date_unit)
+        heatmap = cls(None, start_date, date_unit=date_unit, counts=counts, heat=heat, tz=tz)
+        heatmap.set_window(since, until)
+        return heatmap
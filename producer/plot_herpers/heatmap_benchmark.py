@@ -0,0 +1,131 @@
+"""
+Benchmark of CommitsHeatmap.get_data_dict on generated commits,
+compares vectorised builder with per-author loop it replaced
+
+Run from producer directory:
+    python -m plot_herpers.heatmap_benchmark --commits 1000000 --authors 5000
+"""
+
+import argparse
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from plot_herpers.heatmap import CommitsHeatmap
+
+# generated commits are spread over this many days before end date
+DAYS = 3 * 365
+END_DATE = pd.Timestamp('2018-08-01', tz='UTC')
+
+
+def generate_commits(number_of_commits, number_of_authors, seed=0):
+    """
+    Generates commits of random authors with random dates
+
+    :param number_of_commits: int
+    :param number_of_authors: int
+    :param seed: int
+    :return: list of dicts
+    """
+    random = np.random.RandomState(seed)
+    end = int(END_DATE.timestamp())
+    dates = random.randint(end - DAYS * 24 * 60 * 60, end, number_of_commits)
+    authors = random.randint(0, number_of_authors, number_of_commits)
+    return [{'author': f'author{author}', 'date': int(date)}
+            for author, date in zip(authors, np.sort(dates)[::-1])]
+
+
+def loop_data_dict(heatmap):
+    """
+    Builds data dict by assigning one column per author, as before vectorisation.
+    Its dates are start date stepped by days up to end date, so the day of end date
+    is missed when time of end date is earlier than time of start date
+
+    :param heatmap: CommitsHeatmap
+    :return: dict
+    """
+    df = pd.DataFrame.from_records(heatmap.commits)  # pylint: disable=invalid-name
+    df.date = pd.to_datetime(df.date, utc=True, unit='s')
+    df.set_index('date', inplace=True)
+    df.index = df.index.floor('D')
+
+    date_range = pd.date_range(start=heatmap.start_date, end=heatmap.end_date, freq='D')
+    date_range = date_range.floor('D')
+
+    new_df = pd.DataFrame(index=date_range)
+    with warnings.catch_warnings():
+        # newer pandas warns about frame fragmented by column assignments
+        warnings.simplefilter('ignore', pd.errors.PerformanceWarning)
+        for name, group in df.groupby('author'):
+            new_df[name] = group.groupby('date').size()
+    new_df.fillna(0, inplace=True)
+
+    return {
+        'x': new_df.index.strftime('%Y-%m-%d').tolist(),
+        'y': new_df.columns.tolist(),
+        'z': new_df.T.values.astype('int32').tolist()
+    }
+
+
+def matches_loop(loop_dict, data_dict):
+    """
+    Checks that heatmap equals heatmap of per-author loop, except for the day of end date
+    which is always the last column of heatmap, but may be missed by the loop
+
+    :param loop_dict: dict - see loop_data_dict
+    :param data_dict: dict - see CommitsHeatmap.get_data_dict
+    :return: bool
+    """
+    days = len(loop_dict['x'])
+    if len(data_dict['x']) - days not in (0, 1):
+        return False
+    return data_dict['x'][:days] == loop_dict['x'] and data_dict['y'] == loop_dict['y'] and \
+        [row[:days] for row in data_dict['z']] == loop_dict['z']
+
+
+def measure(func, *args):
+    """
+    Calls function and measures its runtime
+
+    :return: tuple - (result, seconds)
+    """
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    """
+    Prints runtime of building heatmap of generated commits
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--commits', type=int, default=1000000)
+    parser.add_argument('--authors', type=int, default=5000)
+    parser.add_argument('--loop', action='store_true',
+                        help='also measure per-author loop, slow on many authors')
+    args = parser.parse_args()
+
+    commits = generate_commits(args.commits, args.authors)
+    start_date = pd.to_datetime(commits[-1]['date'], utc=True, unit='s')
+    heatmap = CommitsHeatmap(commits, start_date, end_date=END_DATE)
+
+    counts, counts_time = measure(heatmap.get_counts)
+    print(f'{args.commits} commits, {args.authors} authors')
+    print(f'counting commits by author and date: {counts_time:.2f}s')
+
+    counted = CommitsHeatmap(None, start_date, end_date=END_DATE, counts=counts)
+    data_dict, matrix_time = measure(counted.get_data_dict)
+    print(f'building heatmap from counts: {matrix_time:.2f}s')
+    print(f'total: {counts_time + matrix_time:.2f}s, '
+          f'{len(data_dict["y"])} x {len(data_dict["x"])} matrix')
+
+    if args.loop:
+        loop_dict, loop_time = measure(loop_data_dict, heatmap)
+        assert matches_loop(loop_dict, data_dict), 'Per-author loop built different heatmap'
+        print(f'per-author loop: {loop_time:.2f}s')
+
+
+if __name__ == '__main__':
+    main()
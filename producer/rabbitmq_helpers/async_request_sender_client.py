@@ -0,0 +1,118 @@
+"""
+This is an asynchronous request sender client, shared by the whole app
+"""
+import asyncio
+import uuid
+import aio_pika
+from rabbitmq_helpers.request_sender_client_config import HOST, PORT, RPC_QUEUE, \
+    CALLBACK_QUEUE, RPC_TIMEOUT
+from general_helper.logger.log_config import LOG
+
+
+class AsyncRequestSenderClient:
+    """
+    This is an asynchronous request sender client class.
+    Uses one long-lived connection and exclusive server-named callback queue,
+    responses are matched to waiting calls by correlation_id,
+    so many concurrent calls share one connection
+    """
+
+    def __init__(self, host=HOST, port=PORT):
+        self.host = host
+        self.port = port
+        self.connection = None
+        self.channel = None
+        self.callback_queue = None
+        # futures of calls waiting for response with key - correlation_id
+        self.futures = {}
+        self.discarded_responses = 0
+
+    async def connect(self):
+        """
+        Connects to RabbitMQ, declares queues and starts consuming responses.
+        Must be called inside event loop of the app
+        """
+        LOG.debug('Connecting to RabbitMQ...')
+
+        retries = 30
+        while True:
+            try:
+                # declare connection, reconnects automatically when lost
+                self.connection = await aio_pika.connect_robust(host=self.host, port=self.port)
+                self.channel = await self.connection.channel()
+                break
+
+            except (ConnectionError, aio_pika.exceptions.AMQPError) as exc:
+                if retries == 0:
+                    LOG.debug('Failed to connect to RabbitMQ!')
+                    raise exc
+
+                retries -= 1
+                await asyncio.sleep(1)
+
+        LOG.debug('Successfully connected to RabbitMQ!')
+
+        # declare a queues
+        await self.channel.declare_queue(RPC_QUEUE)
+
+        # declare a callback queue
+        # only allow access by the current connection
+        self.callback_queue = await self.channel.declare_queue(CALLBACK_QUEUE, exclusive=True)
+        await self.callback_queue.consume(self.on_response, no_ack=True)
+
+    async def close(self):
+        """
+        Cancels waiting calls and closes connection
+        """
+        for future in self.futures.values():
+            future.cancel()
+        self.futures.clear()
+        if self.connection is not None:
+            await self.connection.close()
+            self.connection = None
+
+    async def on_response(self, message):
+        """
+        Resolves future of the call which response is received,
+        late responses of timed out calls are discarded
+        :param message: aio_pika.IncomingMessage
+        :return:
+        """
+        future = self.futures.pop(message.correlation_id, None)
+        if future is not None and not future.done():
+            future.set_result(message.body)
+        else:
+            self.discarded_responses += 1
+            LOG.debug('Discarded late response with correlation_id: %s', message.correlation_id)
+
+    async def call(self, message, timeout=RPC_TIMEOUT):
+        """
+        This is a call method that takes message
+        as a parameter and returns response without blocking event loop
+        :param message: str
+        :param timeout: int - seconds to wait for response
+        :return: response
+        :raise asyncio.TimeoutError
+        """
+        corr_id = str(uuid.uuid4())
+        future = asyncio.get_event_loop().create_future()
+        self.futures[corr_id] = future
+
+        await self.channel.default_exchange.publish(
+            aio_pika.Message(
+                body=message.encode(),
+                correlation_id=corr_id,
+                reply_to=self.callback_queue.name
+            ),
+            routing_key=RPC_QUEUE
+        )
+        LOG.debug(f'Sent request: %s', message)
+        LOG.debug('Waiting for response...')
+
+        try:
+            response = await asyncio.wait_for(future, timeout)
+        finally:
+            # late response to this call will be discarded
+            self.futures.pop(corr_id, None)
+        LOG.debug(f'Response received: %s', response)
+        return response
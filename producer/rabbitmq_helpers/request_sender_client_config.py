@@ -1,10 +1,13 @@
 """
-Contains configuration variables for RequestSenderClient
+Contains configuration variables for AsyncRequestSenderClient
 """
 HOST = 'heatmaptraining_rabbit_1'  # 'localhost'
 PORT = 5672  # 8080
 RPC_QUEUE = 'request'
-CALLBACK_QUEUE = 'response'
+# empty name makes server name exclusive callback queue for every client
+CALLBACK_QUEUE = ''
+# seconds to wait for response of the call
+RPC_TIMEOUT = 120
 REQUEST_SENDER_CHOICES = {
     'bitbucket_request_sender': 'BitbucketRequestSender',
     'github_request_sender': 'GithubRequestSender',
@@ -0,0 +1,186 @@
+"""
+This is a Redis cache of results of RPC actions, shared by all processes of the app
+"""
+import asyncio
+import hashlib
+import json
+import time
+import uuid
+
+import aioredis
+
+from redis_helpers.result_cache_config import REDIS_HOST, REDIS_PORT, REDIS_POOL_SIZE, \
+    CACHE_TTLS, STALE_TTL, LOCK_TTL, LOCK_POLL_INTERVAL
+from general_helper.logger.log_config import LOG
+
+# fields of request which result depends on
+KEY_FIELDS = ('git_client', 'version', 'owner', 'repo', 'action', 'hash', 'branch')
+# deletes lock only if it is still held by the same fetch
+RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def get_cache_key(body, token=''):
+    """
+    Gets key of result of request, results fetched with token are kept apart,
+    as they may contain private repositories
+
+    :param body: dict - request of /getinfo
+    :param token: str - token result is fetched with
+    :return: str
+    """
+    nodes = [body.get(field, '') for field in KEY_FIELDS]
+    nodes.append(hashlib.sha256(token.encode('utf-8')).hexdigest() if token else '')
+    return 'getinfo:' + hashlib.sha256(json.dumps(nodes).encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    """
+    Cache of results of get_repo, get_branches and get_contributors actions.
+    Results fetched without token are shared by all users, results fetched
+    with token only by requests with the same token.
+    Concurrent misses of the same result are coalesced into one call,
+    stale results are sent while they are refreshed in background
+    """
+
+    def __init__(self, host=REDIS_HOST, port=REDIS_PORT):
+        self.host = host
+        self.port = port
+        self.redis = None
+        # futures of fetches in progress in this process with key - cache key
+        self.fetches = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    async def connect(self):
+        """
+        Creates pool of connections to Redis, the app works without cache
+        if Redis is not available. Must be called inside event loop of the app
+        """
+        try:
+            self.redis = await aioredis.create_redis_pool((self.host, self.port),
+                                                          maxsize=REDIS_POOL_SIZE)
+            LOG.debug('Successfully connected to Redis!')
+        except (aioredis.RedisError, OSError) as exc:
+            LOG.debug('Redis is not available, results are not cached: %s', exc)
+
+    async def close(self):
+        """
+        Closes pool of connections
+        """
+        if self.redis is not None:
+            self.redis.close()
+            await self.redis.wait_closed()
+            self.redis = None
+
+    async def call(self, body, call):
+        """
+        Gets result of request from cache or by call
+
+        :param body: dict - request of /getinfo
+        :param call: coroutine function - takes request as JSON string, returns result
+        :return: str or bytes - JSON result
+        :raise asyncio.TimeoutError: if call times out
+        """
+        ttl = CACHE_TTLS.get(body.get('action'))
+        if ttl is None or self.redis is None:
+            return await call(json.dumps(body))
+
+        token = body.get('token', '')
+        # shared result is tried first, it was fetched without token so it is public
+        for key, key_body in [(get_cache_key(body), dict(body, token=''))] + \
+                ([(get_cache_key(body, token), body)] if token else []):
+            entry = await self._get(key)
+            if entry is None:
+                continue
+            if entry['fresh_until'] > time.time():
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+                asyncio.ensure_future(self._refresh(key, key_body, call, ttl))
+            return entry['data']
+
+        self.misses += 1
+        return await self._fetch(get_cache_key(body, token), body, call, ttl)
+
+    async def _get(self, key):
+        """
+        Reads cached entry, Redis errors are treated as misses
+
+        :param key: str
+        :return: dict - with keys data and fresh_until or None
+        """
+        try:
+            entry = await self.redis.get(key)
+        except (aioredis.RedisError, OSError) as exc:
+            LOG.debug('Problems with Redis get: %s', exc)
+            return None
+        return json.loads(entry) if entry is not None else None
+
+    async def _refresh(self, key, body, call, ttl):
+        """
+        Refreshes stale entry in background, errors are only logged
+        """
+        try:
+            await self._fetch(key, body, call, ttl)
+        except Exception as exc:  # pylint: disable=broad-except
+            LOG.debug('Failed to refresh cached result: %s', exc)
+
+    def _fetch(self, key, body, call, ttl):
+        """
+        Fetches result once for all concurrent misses of process
+
+        :return: future - of result
+        """
+        future = self.fetches.get(key)
+        if future is None:
+            future = self.fetches[key] = asyncio.ensure_future(
+                self._fetch_and_store(key, body, call, ttl))
+            future.add_done_callback(lambda _: self.fetches.pop(key, None))
+        # one cancelled waiter does not cancel fetch of others
+        return asyncio.shield(future)
+
+    async def _fetch_and_store(self, key, body, call, ttl):
+        """
+        Fetches result by call and caches it, while other process fetches
+        the same result it is waited for instead
+
+        :return: str or bytes - JSON result
+        """
+        lock_key, lock_token = key + ':lock', str(uuid.uuid4())
+        try:
+            locked = await self.redis.set(lock_key, lock_token, expire=LOCK_TTL,
+                                          exist=self.redis.SET_IF_NOT_EXIST)
+            waited = 0
+            while not locked and waited < LOCK_TTL:
+                await asyncio.sleep(LOCK_POLL_INTERVAL)
+                waited += LOCK_POLL_INTERVAL
+                entry = await self._get(key)
+                if entry is not None and entry['fresh_until'] > time.time():
+                    return entry['data']
+                locked = await self.redis.set(lock_key, lock_token, expire=LOCK_TTL,
+                                              exist=self.redis.SET_IF_NOT_EXIST)
+        except (aioredis.RedisError, OSError) as exc:
+            LOG.debug('Problems with Redis lock: %s', exc)
+
+        try:
+            data = await call(json.dumps(body))
+            # failed requests are not cached
+            if json.loads(data) is not None:
+                if isinstance(data, bytes):
+                    data = data.decode('utf-8')
+                entry = {'data': data, 'fresh_until': time.time() + ttl}
+                await self.redis.set(key, json.dumps(entry), expire=ttl + STALE_TTL)
+        except (aioredis.RedisError, OSError) as exc:
+            LOG.debug('Problems with Redis set: %s', exc)
+        finally:
+            try:
+                await self.redis.eval(RELEASE_LOCK_SCRIPT, keys=[lock_key], args=[lock_token])
+            except (aioredis.RedisError, OSError) as exc:
+                LOG.debug('Problems with Redis unlock: %s', exc)
+        return data
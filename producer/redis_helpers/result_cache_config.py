@@ -0,0 +1,18 @@
+"""
+Contains configuration variables for ResultCache
+"""
+REDIS_HOST = 'heatmaptraining_redis_1'  # 'localhost'
+REDIS_PORT = 6379
+REDIS_POOL_SIZE = 10
+# seconds results of actions stay fresh, only these actions are cached
+CACHE_TTLS = {
+    'get_repo': 60 * 60,
+    'get_branches': 5 * 60,
+    'get_contributors': 60 * 60
+}
+# seconds stale result is still sent while it is refreshed in background
+STALE_TTL = 24 * 60 * 60
+# seconds one process fetches missed result while others wait for it
+LOCK_TTL = 130
+# seconds between checks of result fetched by other process
+LOCK_POLL_INTERVAL = 0.2
@@ -0,0 +1,97 @@
+"""
+Contains functions for testing AsyncRequestSenderClient which matches
+responses of RPC calls to waiting calls by correlation_id
+"""
+import asyncio
+from unittest import mock
+
+from rabbitmq_helpers.async_request_sender_client import AsyncRequestSenderClient
+
+
+class FakeMessage:
+    """
+    Response delivered to callback queue
+    """
+
+    def __init__(self, correlation_id, body):
+        self.correlation_id = correlation_id
+        self.body = body
+
+
+def connected_client():
+    """
+    Creates client with mocked channel which keeps published messages
+
+    :return: tuple - (AsyncRequestSenderClient, list of published aio_pika.Message)
+    """
+    published = []
+
+    async def publish(message, routing_key):  # pylint: disable=unused-argument
+        published.append(message)
+
+    client = AsyncRequestSenderClient()
+    client.channel = mock.Mock()
+    client.channel.default_exchange.publish = publish
+    client.callback_queue = mock.Mock()
+    client.callback_queue.name = 'amq.gen-callback'
+    return client, published
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def test_concurrent_calls_receive_own_responses():
+    client, published = connected_client()
+
+    async def scenario():
+        calls = asyncio.gather(client.call('first'), client.call('second'))
+        await asyncio.sleep(0)
+        assert [message.reply_to for message in published] == ['amq.gen-callback'] * 2
+        # responses arrive in reverse order of requests
+        for message in reversed(published):
+            await client.on_response(FakeMessage(message.correlation_id,
+                                                 b'reply to ' + message.body))
+        return await calls
+
+    assert run(scenario()) == [b'reply to first', b'reply to second']
+    assert client.futures == {}
+    assert client.discarded_responses == 0
+
+
+def test_timed_out_call_is_removed_and_late_response_is_discarded():
+    client, published = connected_client()
+
+    async def scenario():
+        try:
+            await client.call('slow', timeout=0.01)
+        except asyncio.TimeoutError:
+            pass
+        else:
+            raise AssertionError('call did not time out')
+        assert client.futures == {}
+        await client.on_response(FakeMessage(published[0].correlation_id, b'late'))
+
+    run(scenario())
+    assert client.discarded_responses == 1
+
+
+def test_unknown_response_is_discarded():
+    client, _ = connected_client()
+
+    async def scenario():
+        pending = asyncio.ensure_future(client.call('request'))
+        await asyncio.sleep(0)
+        await client.on_response(FakeMessage('unknown-id', b'other'))
+        assert not pending.done()
+        assert len(client.futures) == 1
+        pending.cancel()
+        await asyncio.gather(pending, return_exceptions=True)
+        assert client.futures == {}
+
+    run(scenario())
+    assert client.discarded_responses == 1
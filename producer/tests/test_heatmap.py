@@ -0,0 +1,75 @@
+"""
+Contains functions for testing CommitsHeatmap which builds
+matrices of numbers of commits for plotting
+"""
+import pandas as pd
+
+from plot_herpers.heatmap import CommitsHeatmap, DAY_SECONDS, HOUR_SECONDS, \
+    QUARTER_HOUR_SECONDS, RAW_BUCKET_SECONDS, get_bucket_seconds, get_offset_periods
+from plot_herpers.heatmap_benchmark import generate_commits, loop_data_dict, matches_loop
+
+
+def test_date_heatmap_matches_per_author_loop():
+    commits = generate_commits(2000, 30)
+    start_date = pd.to_datetime(commits[-1]['date'], utc=True, unit='s')
+    heatmap = CommitsHeatmap(commits, start_date, end_date=pd.Timestamp('2018-08-01', tz='UTC'))
+
+    assert matches_loop(loop_data_dict(heatmap), heatmap.get_data_dict())
+
+
+def test_date_heatmap_includes_day_of_end_date():
+    commits = [{'author': 'author', 'date': int(pd.Timestamp('2018-07-03 09:00').timestamp())},
+               {'author': 'author', 'date': int(pd.Timestamp('2018-07-01 12:00').timestamp())}]
+    heatmap = CommitsHeatmap(commits, pd.Timestamp('2018-07-01 12:00', tz='UTC'),
+                             end_date=pd.Timestamp('2018-07-03 10:00', tz='UTC'))
+
+    data_dict = heatmap.get_data_dict()
+
+    assert data_dict['x'] == ['2018-07-01', '2018-07-02', '2018-07-03']
+    assert data_dict['z'] == [[1, 0, 1]]
+    # the loop missed commit of the day of end date
+    loop_dict = loop_data_dict(heatmap)
+    assert loop_dict['x'] == ['2018-07-01', '2018-07-02']
+    assert matches_loop(loop_dict, data_dict)
+
+
+def timestamp(date):
+    return int(pd.Timestamp(date, tz='UTC').timestamp())
+
+
+def test_bucket_seconds_follow_offsets_of_time_zone_in_window():
+    assert get_bucket_seconds('date', 'D', 'UTC') == DAY_SECONDS
+    assert get_bucket_seconds('hour', 'D', 'Europe/Kiev', timestamp('2018-01-01')) == \
+        HOUR_SECONDS
+    assert get_bucket_seconds('hour', 'D', 'Asia/Kolkata', timestamp('2018-01-01')) == \
+        QUARTER_HOUR_SECONDS
+    # Monrovia was at -0:44:30 until 1972, Amsterdam at +0:19:32 until 1937
+    assert get_bucket_seconds('hour', 'D', 'Africa/Monrovia', timestamp('1971-01-01')) == \
+        RAW_BUCKET_SECONDS
+    assert get_bucket_seconds('hour', 'D', 'Africa/Monrovia', timestamp('1973-01-01')) == \
+        HOUR_SECONDS
+    assert get_bucket_seconds('date', 'D', 'Europe/Amsterdam', timestamp('1930-01-01'),
+                              timestamp('1931-01-01')) == RAW_BUCKET_SECONDS
+    assert get_bucket_seconds('date', 'D', 'Europe/Amsterdam', timestamp('1970-01-01')) == \
+        HOUR_SECONDS
+
+
+def test_offsets_of_time_zone_are_cached():
+    get_offset_periods.cache_clear()
+    get_bucket_seconds('hour', 'D', 'Europe/Kiev', timestamp('2018-01-01'))
+    get_bucket_seconds('hour', 'D', 'Europe/Kiev', timestamp('2019-01-01'))
+
+    assert get_offset_periods.cache_info().misses == 1
+    assert get_offset_periods.cache_info().hits == 1
+
+
+def test_raw_counts_give_hours_of_irregular_offsets():
+    # 12:00 UTC is 11:15:30 in Monrovia in 1971
+    date = timestamp('1971-06-01 12:00')
+    repository_document = {'value': {'repo': {'creation_date': date}}}
+    counts = [{'author': 'author', 'date': date, 'count': 1, 'first_date': date}]
+
+    heatmap = CommitsHeatmap.from_counts(repository_document, counts, heat='hour',
+                                         tz='Africa/Monrovia')
+
+    assert heatmap.get_data_dict()['z'][0][11] == 1
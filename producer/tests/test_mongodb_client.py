@@ -0,0 +1,115 @@
+"""
+Contains functions for testing MongoDBClient which counts commits for heatmap
+from materialised counters or from commits collection
+"""
+from unittest import mock
+
+import pytest
+
+from mongodb_helpers.mongodb_client import MongoDBClient
+from mongodb_helpers.mongodb_client_config import HEATMAP_BUCKET_SECONDS
+
+KEY = 'user-github--repo-owner'
+HOUR = 60 * 60
+DAY = 24 * HOUR
+# commits every 5 hours during 10 days
+COMMITS = [{'repo_key': KEY, 'author': f'author{index % 3}',
+            'date': 1530000000 + index * 5 * HOUR} for index in range(48)]
+
+
+def matches(document, query):
+    """
+    Checks document against query of equality, $gte, $lt, $in and $nin conditions
+    """
+    for field, condition in query.items():
+        value = document.get(field)
+        if not isinstance(condition, dict):
+            condition = {'$eq': condition}
+        checks = {'$eq': lambda bound: value == bound, '$gte': lambda bound: value >= bound,
+                  '$lt': lambda bound: value < bound, '$in': lambda bound: value in bound,
+                  '$nin': lambda bound: value not in bound}
+        if not all(checks[operator](bound) for operator, bound in condition.items()):
+            return False
+    return True
+
+
+class FakeCollection:
+    """
+    Collection answering find and heatmap pipelines of MongoDBClient from list of documents
+    """
+
+    def __init__(self, documents):
+        self.documents = documents
+        self.used = False
+
+    def find(self, query, projection=None):  # pylint: disable=unused-argument
+        self.used = True
+        return [{field: document[field] for field in ('author', 'date', 'count', 'first_date')}
+                for document in self.documents if matches(document, query)]
+
+    def aggregate(self, pipeline):
+        self.used = True
+        documents = [document for document in self.documents
+                     if matches(document, pipeline[0]['$match'])]
+        bucket_seconds = pipeline[1]['$group']['_id']['date']['$subtract'][1]['$mod'][1]
+        counts = {}
+        for document in documents:
+            bucket = (document['author'], document['date'] - document['date'] % bucket_seconds)
+            count, first_date = counts.get(bucket, (0, document['date']))
+            counts[bucket] = (count + 1, min(first_date, document['date']))
+        return [{'author': author, 'date': date, 'count': count, 'first_date': first_date}
+                for (author, date), (count, first_date) in counts.items()]
+
+
+def materialise(commits):
+    """
+    Counts commits by bucket size, author and date bucket like consumer does
+    """
+    counters = {}
+    for commit in commits:
+        for bucket_seconds in HEATMAP_BUCKET_SECONDS:
+            counter_key = (bucket_seconds, commit['author'],
+                           commit['date'] - commit['date'] % bucket_seconds)
+            count, first_date = counters.get(counter_key, (0, commit['date']))
+            counters[counter_key] = (count + 1, min(first_date, commit['date']))
+    return [{'repo_key': KEY, 'bucket_seconds': bucket_seconds, 'author': author, 'date': date,
+             'count': count, 'first_date': first_date}
+            for (bucket_seconds, author, date), (count, first_date) in counters.items()]
+
+
+def fake_client(host, port, **options):  # pylint: disable=unused-argument
+    return mock.MagicMock()
+
+
+def get_client():
+    client = MongoDBClient(base_client=fake_client)
+    # pylint: disable=protected-access
+    client._commits_collection = FakeCollection(COMMITS)
+    client._heatmap_collection = FakeCollection(materialise(COMMITS))
+    return client
+
+
+def sort_counts(counts):
+    return sorted(counts, key=lambda count: (count['author'], count['date']))
+
+
+@pytest.mark.parametrize('bucket_seconds, since, until, aligned', [
+    (DAY, None, None, True),
+    (DAY, 1530000000 - 1530000000 % DAY + DAY, 1530000000 - 1530000000 % DAY + 5 * DAY, True),
+    (HOUR, 1530000000 + 7 * HOUR, 1530000000 + 100 * HOUR, True),
+    (DAY, 1530000000 + 7 * HOUR, None, False),
+    (HOUR, 1530000000 + 10 * HOUR + 1, 1530000000 + 100 * HOUR - 1, False),
+    (DAY, None, 1530000000 + 3 * DAY + 7 * HOUR, False),
+])
+def test_materialised_counters_match_commits_pipeline(bucket_seconds, since, until, aligned):
+    from_commits = get_client().get_heatmap_counts(KEY, bucket_seconds, False,
+                                                   since=since, until=until)
+    client = get_client()
+
+    from_counters = client.get_heatmap_counts(KEY, bucket_seconds, True, since=since, until=until)
+
+    assert from_commits
+    assert sort_counts(from_counters) == sort_counts(from_commits)
+    # pylint: disable=protected-access
+    assert client._heatmap_collection.used == aligned
+    assert client._commits_collection.used != aligned